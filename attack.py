@@ -1,20 +1,68 @@
 import pymunk
 import consts
+import utils
 from typing import Callable
 import input
+import hits
 from enum import Enum
 
+# moves are split in two. the definitions, AttackDef, Power, Cast and Hitbox, hold the frame data, damage, knockback and hitbox geometry. they never change once made, so one set of them is shared by every fighter with that move in the process.
+# each fighter only gets an Attack per move, holding the attack's mutable values and the fighter's own hitbox shapes.
+# hitbox shapes are only made the first time a cast goes active facing a side, so a fighter only ever holds shapes for the casts and sides it has actually used.
+
+class CapsuleParams():
+	__slots__ = ("offset", "dims")
+
+	def __init__(self, offset: tuple[float,float], dims: tuple[float,float]):
+		self.offset = offset
+		self.dims = dims
+
 class Hitbox():
-	def __init__(self, left_shapes: list[pymunk.Shape], right_shapes: list[pymunk.Shape]):
-		self.left_shapes = left_shapes
-		self.right_shapes = right_shapes
-		for shape in self.left_shapes:
-			shape.side_facing = consts.FIGHTER_SIDE_FACING_LEFT
-		for shape in self.right_shapes:
-			shape.side_facing = consts.FIGHTER_SIDE_FACING_RIGHT
+	__slots__ = ("capsules",)
+
+	def __init__(self, capsules: list[CapsuleParams]):
+		"""
+			capsules should represent the hitbox facing right. left facing shapes are made by negating the x (0 index) offset
+		"""
+		self.capsules = capsules
+
+	def make_shapes(self, body: pymunk.Body|None, side_facing: int, group: int = 0) -> list[pymunk.Shape]:
+		"""
+			### Parameters:
+				side_facing : the side the shapes face. left facing shapes are mirrored
+				group : collision group of the shapes
+			### Returns:
+				the shapes of the hitbox, on body
+		"""
+		hitbox_filter = pymunk.ShapeFilter(
+			group=group,
+			categories=0b1 << (consts.HITBOX_COLLISION_TYPE-1),
+			mask=0b1 << (consts.HURTBOX_COLLISION_TYPE-1))
+
+		direction = -1 if side_facing == consts.FIGHTER_SIDE_FACING_LEFT else 1
+		shapes: list[pymunk.Shape] = []
+		for capsule in self.capsules:
+			shapes += utils.add_capsule_shape(body, offset=(direction*capsule.offset[0], capsule.offset[1]), dims=capsule.dims)
+		for shape in shapes:
+			shape.collision_type = consts.HITBOX_COLLISION_TYPE
+			shape.filter = hitbox_filter
+			shape.sensor = True
+			shape.color = consts.HITBOX_COLOR
+			shape.side_facing = side_facing
+			# hitbox shapes spend most of their time outside of the space, where chipmunk doesn't track them on their body. if the garbage collector frees the body first, freeing the shape afterwards touches freed memory.
+			# holding on to the body's chipmunk handle makes sure it outlives the shape.
+			if body != None:
+				shape.body_handle = body._body
+		return shapes
 
 # to mimic brawlhalla, every attack move has a sequence of powers, and each power has a sequence of casts.
 class Cast():
+	__slots__ = (
+		"startup_frames", "active_frames", "base_dmg", "var_force", "fixed_force", "hitbox", "velocity", "is_velocity_on_active_frames_only", "knockback_dir",
+		"self_velocity_on_hit", "should_cancel_victim_velocity_on_hit_until_next_hit_in_attack", "additional_startup_frames", "extra_dmg_per_extra_startup_frame",
+		"is_using_charged_dmg", "is_active_until_cancelled",
+	)
+
 	#active_velocity is supposed to be used during active frames.
 	def __init__(
 			self, startup_frames: int, active_frames: int, base_dmg: float = 0, var_force: int = 0, fixed_force: int = 0, hitbox: Hitbox|None = None, 
@@ -47,14 +95,12 @@ class Cast():
 		self.is_using_charged_dmg = is_using_charged_dmg
 		self.is_active_until_cancelled = is_active_until_cancelled
 
-
-		# mutable values
-		self.is_active = False
-		self.has_hit = False
-		self.charged_frames = 0
-		self.is_cancelled = False
-
 class Power():
+	__slots__ = (
+		"casts", "cooldown_frames", "fixed_recovery_frames", "recovery_frames", "min_charge_frames", "stun_frames", "requires_hit", "requires_no_hit",
+		"cancel_power_on_hit", "cancel_power_on_ground", "requires_grounding", "requires_no_grounding",
+	)
+
 	def __init__(
 			self, casts: list[Cast], cooldown_frames: int = 0, fixed_recovery_frames: int = 0, recovery_frames: int = 0, min_charge_frames: int = 0, stun_frames = 0, 
 			requires_hit: bool = False, requires_no_hit: bool = False, cancel_power_on_hit: bool = False, cancel_power_on_ground: bool = False, 
@@ -73,10 +119,6 @@ class Power():
 		self.requires_grounding = requires_grounding
 		self.requires_no_grounding = requires_no_grounding
 
-		#mutable values
-		self.is_active = False
-		self.has_hit = False
-
 # the value of the enum is equal to the attack type's input value
 class AttackHitInput(Enum):
 	LIGHT=input.INPUT_LIGHT_HIT
@@ -87,7 +129,70 @@ class AttackMoveType(Enum):
 	SIDE=2
 	DOWN=3
 
-class Attack():
+# frame data of an attack, compiled once when the attack is made, so stepping an attack doesn't have to re-derive it from the casts and powers every frame.
+# frames are counted the way Attack.cast_frame counts them: 1 on the first frame of a cast.
+# only the velocities and the next power are looked up per frame. when the hitboxes go live, when a power's recovery and cooldown start, and when a cast ends
+# are still worked out in step_attack from startup_frames, end_frame and the attack's state, since charging, casts held until cancelled, hits and grounding
+# move them around while the attack runs.
+
+class CastTimeline():
+	__slots__ = (
+		"cast", "startup_frames", "end_frame", "is_chargeable", "charge_end_frame", "extra_dmg_per_charged_frame", "is_active_until_cancelled",
+		"velocities", "last_velocity_frame",
+	)
+
+	def __init__(self, cast: Cast):
+		self.cast = cast
+		self.startup_frames = cast.startup_frames
+		# the cast is over once it has run for more than this many frames, not counting frames spent charging
+		self.end_frame = max(cast.startup_frames-1, 0) + cast.active_frames
+		self.is_chargeable = cast.additional_startup_frames > 0
+		# charging can go on while the cast frame is below this
+		self.charge_end_frame = cast.startup_frames + cast.additional_startup_frames
+		self.extra_dmg_per_charged_frame = cast.extra_dmg_per_extra_startup_frame
+		self.is_active_until_cancelled = cast.is_active_until_cancelled
+		# velocity applied on every cast frame. frames past the end of the table use its last entry
+		active_velocity = cast.velocity
+		startup_velocity = None if cast.is_velocity_on_active_frames_only else cast.velocity
+		self.velocities = tuple(active_velocity if frame >= cast.startup_frames else startup_velocity for frame in range(cast.startup_frames + 1))
+		self.last_velocity_frame = len(self.velocities) - 1
+
+class PowerTimeline():
+	__slots__ = ("power", "casts", "cooldown_frames", "recover_frames", "is_last", "cancel_power_on_hit", "cancel_power_on_ground", "next_power")
+
+	def __init__(self, attack: "AttackDef", power_idx: int):
+		power = attack.powers[power_idx]
+		self.power = power
+		self.casts = [CastTimeline(cast) for cast in power.casts]
+		self.cooldown_frames = power.cooldown_frames
+		self.recover_frames = power.recovery_frames + power.fixed_recovery_frames
+		# the recovery of the last power goes to the fighter, the recovery of every other power is spent inside the attack
+		self.is_last = power_idx == len(attack.powers)-1
+		self.cancel_power_on_hit = power.cancel_power_on_hit
+		self.cancel_power_on_ground = power.cancel_power_on_ground
+		# index of the power that follows this one, or -1 if the attack ends. indexed by next_power_index(has_hit, is_fighter_grounded)
+		self.next_power = tuple(find_next_power(attack, power_idx, has_hit, is_grounded) for has_hit in (False, True) for is_grounded in (False, True))
+
+def next_power_index(has_hit: bool, is_fighter_grounded: bool) -> int:
+	return 2*has_hit + is_fighter_grounded
+
+def find_next_power(attack: "AttackDef", power_idx: int, has_hit: bool, is_fighter_grounded: bool) -> int:
+	for idx in range(power_idx+1, len(attack.powers)):
+		power = attack.powers[idx]
+		if power.requires_hit and not has_hit:
+			continue
+		if power.requires_no_hit and has_hit:
+			continue
+		if power.requires_grounding and not is_fighter_grounded:
+			continue
+		if power.requires_no_grounding and is_fighter_grounded:
+			continue
+		return idx
+	return -1
+
+class AttackDef():
+	__slots__ = ("powers", "name", "requires_fighter_grounding", "hit_input", "move_type", "is_jump_attack", "timeline")
+
 	def __init__(self, powers: list[Power], name: str, requires_fighter_grounding: bool, hit_input: AttackHitInput, move_type: AttackMoveType, is_jump_attack: bool = False):
 		""" 
 			### Arguments
@@ -101,13 +206,101 @@ class Attack():
 		self.hit_input = hit_input
 		self.move_type = move_type
 		self.is_jump_attack = is_jump_attack
+		self.timeline = [PowerTimeline(self, power_idx) for power_idx in range(len(self.powers))]
+
+class Attack():
+	STATE_FIELDS = (
+		"side_facing", "is_victim_velocity_cancelled_until_next_hit", "cooldown_timer", "recover_timer", "has_hit", "is_active",
+		"cast_frame", "power_idx", "cast_idx", "can_do_charging", "charged_dmg", "has_jump_attack_use", "cooldown_end_frame",
+		"is_power_active", "has_power_hit", "is_cast_active", "cast_charged_frames",
+	)
+	# the definition's values are copied over as well, since they are read every frame
+	__slots__ = (
+		"definition", "powers", "name", "requires_fighter_grounding", "hit_input", "move_type", "is_jump_attack", "timeline", "side_shapes", "step_results",
+		"body", "fighter", "hitbox_group", "idx",
+	) + STATE_FIELDS
+
+	def __init__(self, definition: AttackDef, body: pymunk.Body|None = None, fighter: object = None, idx: int = 0):
+		"""
+			a fighter's own copy of an attack: the mutable values, and hitbox shapes on the fighter's body
 
+			### Parameters:
+				body : the body hitbox shapes are made on. without one, the shapes are made without a body, which is only good for stepping attacks outside of a space
+				fighter : the fighter doing the attack, which its hitbox shapes point back to
+				idx : index of the attack in the fighter's attack list
+		"""
+		self.definition = definition
+		self.powers = definition.powers
+		self.name = definition.name
+		self.requires_fighter_grounding = definition.requires_fighter_grounding
+		self.hit_input = definition.hit_input
+		self.move_type = definition.move_type
+		self.is_jump_attack = definition.is_jump_attack
+		self.timeline = definition.timeline
+		# handed back by step_attack for frames with a velocity or recover frames to report. it is overwritten on the next step
+		self.step_results = StepAttackResults(is_active=True, velocity=None, recover_frames=0)
+
+		self.body = body
+		self.fighter = fighter
+		self.idx = idx
+		# collision group of the hitbox shapes. see Fighter.set_team
+		self.hitbox_group = 0
+		# hitbox shapes indexed by power, cast and side facing. None for the ones that haven't been made yet, see make_hitbox_shapes
+		self.side_shapes: list[list[list[tuple[pymunk.Shape, ...]|None]]] = [
+			[[None, None] if cast.hitbox != None else [(), ()] for cast in power.casts] for power in self.powers
+		]
+
+		self.reset()
+
+	def make_hitbox_shapes(self, power_idx: int, cast_idx: int, side_facing: int) -> tuple[pymunk.Shape, ...]:
+		"""
+			makes the hitbox shapes of a cast facing a side, the first time they are needed. they are kept for every activation after that
+		"""
+		power = self.powers[power_idx]
+		cast = power.casts[cast_idx]
+		shapes = tuple(cast.hitbox.make_shapes(self.body, side_facing, self.hitbox_group))
+		for shape in shapes:
+			shape.cast = cast
+			shape.power = power
+			shape.attack = self
+			shape.fighter = self.fighter
+		self.side_shapes[power_idx][cast_idx][side_facing] = shapes
+		return shapes
+
+	def make_all_hitbox_shapes(self):
+		"""
+			makes every hitbox shape that hasn't been made yet, for tools that want to see all of them up front
+		"""
+		for (power_idx, power_shapes) in enumerate(self.side_shapes):
+			for (cast_idx, side_shapes) in enumerate(power_shapes):
+				for side_facing in (consts.FIGHTER_SIDE_FACING_LEFT, consts.FIGHTER_SIDE_FACING_RIGHT):
+					if side_shapes[side_facing] == None:
+						self.make_hitbox_shapes(power_idx, cast_idx, side_facing)
+
+	def hitbox_shapes(self) -> list[pymunk.Shape]:
+		"""
+			every hitbox shape made so far, whether it's live or not
+		"""
+		return [shape for power_shapes in self.side_shapes for side_shapes in power_shapes for shapes in side_shapes if shapes != None for shape in shapes]
+
+	def current_hitbox_shapes(self) -> tuple[pymunk.Shape, ...]:
+		"""
+			hitbox shapes of the current cast, on the side the attack is facing. only these can be live
+		"""
+		return self.side_shapes[self.power_idx][self.cast_idx][self.side_facing] or ()
+
+	def reset(self):
+		"""
+			puts the attack back into the state it had right after construction. hitbox shapes are not removed from the space, that is left to the caller
+		"""
 		# mutable values down below
 		
 		self.side_facing = 0
 		self.is_victim_velocity_cancelled_until_next_hit = False
-		# cooldown timer should not start ticking down until all powers have been looped. an attack should not be activated while cooldown timer is greater than zero
+		# cooldown frames added up by the powers used so far in the current or last activation. the cooldown doesn't start until all powers have been looped. an attack should not be activated while it is on cooldown
 		self.cooldown_timer = 0
+		# game frame at which the cooldown of the last activation is over. stamped when the attack finishes, so idle attacks don't need to count down every frame
+		self.cooldown_end_frame = 0
 		# recover timer should only be used between powers, where the previous power has recovery frames. if the last power has recovery frames, it should be applied to the fighter's recover timer
 		self.recover_timer = 0
 		self.has_hit = False
@@ -120,19 +313,27 @@ class Attack():
 		# the extra damage gained from charged cast
 		self.charged_dmg = 0
 
-		# when is_attack_jump == true, attack can only be activated if has_jump_attack_use == True or fighter has spare jumps. switched to false when attack is activated. set to True when fighter hits back to the ground
+		# when is_attack_jump == true, attack can only be activated if has_jump_attack_use == True or fighter has spare jumps. switched to false when attack is activated. set to True when fighter hits back to the ground. only kept up to date for jump attacks
 		self.has_jump_attack_use = False
-		 
-		for power in self.powers:
-			for cast in power.casts:
-				if cast.hitbox != None:
-					for shape in cast.hitbox.left_shapes + cast.hitbox.right_shapes:
-						shape.cast = cast
-						shape.power = power
-						shape.attack = self
+
+		# values of the current power and cast. an activation never goes back to a power or cast it already left, so they only have to be kept for the current ones
+		# whether the current power's cooldown and recovery have been applied
+		self.is_power_active = False
+		# whether a hitbox of the current power has landed. a power only lands once, no matter how many of its hitboxes overlap
+		self.has_power_hit = False
+		# whether the current cast's hitboxes have been added
+		self.is_cast_active = False
+		# frames the current cast has spent charging
+		self.cast_charged_frames = 0
+
+	def cooldown_frames_left(self, frame: int) -> int:
+		"""
+			### Parameters:
+				frame : the game state's frame count
+		"""
+		return max(self.cooldown_end_frame - frame, 0)
 
 	def activate(self, side_facing: int):
-		print("activating attack {} facing {}".format(self.name, side_facing))
 		self.is_active = True
 		self.cast_frame = 0
 		self.power_idx = 0
@@ -144,19 +345,33 @@ class Attack():
 		self.is_victim_velocity_cancelled_until_next_hit = False
 		self.has_jump_attack_use = False
 		self.charged_dmg = 0
-		for p in self.powers:
-			p.is_active = False
-			p.has_hit = False
-			for c in p.casts:
-				c.is_active = False
-				c.has_hit = False
-				c.charged_frames = 0
-				c.is_cancelled = False
-		current_power = self.powers[self.power_idx]
-		current_cast = current_power.casts[self.cast_idx]
-		self.can_do_charging = current_cast.additional_startup_frames > 0
+		self.is_power_active = False
+		self.has_power_hit = False
+		self.is_cast_active = False
+		self.cast_charged_frames = 0
+		self.can_do_charging = self.timeline[0].casts[0].is_chargeable
+
+class Moveset():
+	__slots__ = ("attacks", "dispatch_candidates", "content_hash")
+
+	def __init__(self, attacks: list[AttackDef], content_hash: str|None = None):
+		"""
+			the attack definitions of a fighter, ordered on priority. made once and shared by every fighter with the same moves
+
+			### Parameters:
+				content_hash : sha256 of the moveset file the attacks were loaded from, or None for attacks made in code
+		"""
+		self.attacks = attacks
+		self.content_hash = content_hash
+		# for every dispatch key, the indices of the attacks AttackDispatch considers
+		self.dispatch_candidates = find_dispatch_candidates(attacks)
+
+	def make_attacks(self, body: pymunk.Body|None = None, fighter: object = None) -> list[Attack]:
+		return [Attack(definition, body, fighter, idx) for (idx, definition) in enumerate(self.attacks)]
 
 class AttackTriggerResults():
+	__slots__ = ("can_activate", "is_needing_fighter_jump")
+
 	def __init__(self, can_activate: bool, is_needing_fighter_jump: bool):
 		self.can_activate = can_activate
 		self.is_needing_fighter_jump = is_needing_fighter_jump
@@ -188,106 +403,154 @@ def is_attack_triggered(attack: Attack, is_fighter_grounded: bool, fighter_input
 		is_needing_fighter_jump = attack.is_jump_attack and not attack.has_jump_attack_use
 	)
 
+# the heavy and light hit inputs are next to each other, so both can be shifted down into the two lowest bits of a dispatch key
+assert input.INPUT_LIGHT_HIT == input.INPUT_HEAVY_HIT + 1
+DISPATCH_KEY_COUNT = 32
+
+def dispatch_key(tapped_hits: int, is_side_pressed: bool, is_down_pressed: bool, is_fighter_grounded: bool) -> int:
+	"""
+		### Parameters:
+			tapped_hits : the tapped heavy and light hit bits, shifted down so heavy is bit 0 and light is bit 1
+	"""
+	return tapped_hits | is_side_pressed << 2 | is_down_pressed << 3 | is_fighter_grounded << 4
+
+def find_dispatch_candidates(attacks: list[AttackDef]|list[Attack]) -> list[tuple[int, ...]]:
+	"""
+		for every combination of tapped hit inputs, held move inputs and grounding, the indices of the attacks whose input and grounding requirements are met, in the order of the attack list
+	"""
+	candidates = []
+	for key in range(DISPATCH_KEY_COUNT):
+		tapped_hits = key & 0b11
+		is_side_pressed = key >> 2 & 1 == 1
+		is_down_pressed = key >> 3 & 1 == 1
+		is_fighter_grounded = key >> 4 & 1 == 1
+		key_candidates = []
+		for (attack_idx, attack) in enumerate(attacks):
+			is_hit_tapped = tapped_hits >> (attack.hit_input.value - input.INPUT_HEAVY_HIT) & 1 == 1
+			is_move_met = (
+				attack.move_type == AttackMoveType.NEUTRAL or
+				(attack.move_type == AttackMoveType.SIDE and is_side_pressed) or
+				(attack.move_type == AttackMoveType.DOWN and is_down_pressed)
+			)
+			if is_hit_tapped and is_move_met and attack.requires_fighter_grounding == is_fighter_grounded:
+				key_candidates.append(attack_idx)
+		candidates.append(tuple(key_candidates))
+	return candidates
+
+class AttackDispatch():
+	__slots__ = ("candidates",)
+
+	def __init__(self, attacks: list[Attack], candidate_indices: list[tuple[int, ...]]|None = None):
+		"""
+			an index over a fighter's attacks, which finds the attack triggered by a frame's input without calling is_attack_triggered on every attack.
+			for every dispatch key, it keeps the attacks whose input and grounding requirements are met. only jump availability, which changes as attacks are used, is left to check per frame.
+
+			### Parameters:
+				candidate_indices : find_dispatch_candidates of the attacks, if it was already worked out for their moveset
+		"""
+		if candidate_indices == None:
+			candidate_indices = find_dispatch_candidates(attacks)
+		self.candidates: list[tuple[Attack, ...]] = [tuple(attacks[idx] for idx in indices) for indices in candidate_indices]
+
+	def find_triggered(self, fighter_input: input.Input, is_fighter_grounded: bool, spare_fighter_jumps: int) -> Attack|None:
+		"""
+			returns the first attack in the attack list that is_attack_triggered would let activate, or None
+		"""
+		current_bits = fighter_input.current_bits
+		tapped_hits = (current_bits & ~fighter_input.prev_bits & input.HIT_MASK) >> input.INPUT_HEAVY_HIT
+		if tapped_hits == 0:
+			return None
+		key = dispatch_key(tapped_hits, current_bits & input.MOVE_LEFT_RIGHT_MASK != 0, current_bits >> input.INPUT_MOVE_DOWN & 1 == 1, is_fighter_grounded)
+		for attack in self.candidates[key]:
+			if not attack.is_jump_attack or attack.has_jump_attack_use or spare_fighter_jumps > 0:
+				return attack
+		return None
+
 class StepAttackResults():
+	__slots__ = ("is_active", "velocity", "recover_frames")
+
 	def __init__(self, is_active: bool, velocity: tuple[float, float]|None, recover_frames: int):
 		self.is_active = is_active
 		self.velocity = velocity
 		self.recover_frames = recover_frames
 
-def step_attack(attack: Attack, space: pymunk.Space, fighter_input: input.Input, is_fighter_grounded: bool) -> StepAttackResults:
+# results that never change are shared, so stepping an attack doesn't allocate. none of the results handed out by step_attack should be modified by the caller
+INACTIVE_STEP_RESULTS = StepAttackResults(is_active=False, velocity=None, recover_frames=0)
+BUSY_STEP_RESULTS = StepAttackResults(is_active=True, velocity=None, recover_frames=0)
+
+def step_attack(attack: Attack, space: pymunk.Space|hits.HitQuery, fighter_input: input.Input, is_fighter_grounded: bool) -> StepAttackResults:
 	attack.has_jump_attack_use = attack.has_jump_attack_use or is_fighter_grounded
 	if attack.is_active == False:
-		attack.cooldown_timer = max(attack.cooldown_timer - 1, 0)
-		return StepAttackResults(is_active=False, velocity=None, recover_frames=0)
-	current_power = attack.powers[attack.power_idx]
-	current_cast = current_power.casts[attack.cast_idx]
-	
+		return INACTIVE_STEP_RESULTS
+
 	if attack.recover_timer > 0:
 		attack.recover_timer = max(attack.recover_timer - 1, 0)
-		return StepAttackResults(is_active=True, velocity=None, recover_frames=0)
-
-	attack.cast_frame += 1
-
-	is_hit_input_pressed =  fighter_input.is_pressed(attack.hit_input.value)
-	has_extra_startup_frames = current_cast.additional_startup_frames > 0
-	is_past_startup = attack.cast_frame > current_cast.startup_frames
-	can_do_more_charging =  attack.cast_frame < current_cast.startup_frames + current_cast.additional_startup_frames
-	attack.can_do_charging = is_hit_input_pressed and has_extra_startup_frames and can_do_more_charging
-	is_charging = attack.can_do_charging and is_past_startup
-
-	if is_charging:
-		attack.charged_dmg += current_cast.extra_dmg_per_extra_startup_frame
-		current_cast.charged_frames += 1
-		return StepAttackResults(is_active=True, velocity=None, recover_frames=0)
-
-	is_power_cancelled_early = (current_power.cancel_power_on_hit and attack.has_hit) or (current_power.cancel_power_on_ground and is_fighter_grounded)
-	is_cast_running_forever = current_cast.is_active_until_cancelled and fighter_input.is_pressed(attack.hit_input.value)
-
-	# the first active frame begins at the same frame as the last startup frame, which is why we subtract by 1, or 0 if no startup frames. any cast frames that were spent on charging aren't counted.
-	is_cast_out_of_frames = attack.cast_frame - current_cast.charged_frames > max(current_cast.startup_frames-1, 0) + current_cast.active_frames
-
-	is_cast_finished = is_power_cancelled_early or (is_cast_out_of_frames and not is_cast_running_forever)
-	if is_cast_finished:
-		if current_cast.hitbox != None:
-			if attack.side_facing == consts.FIGHTER_SIDE_FACING_LEFT:
-				for shape in current_cast.hitbox.left_shapes:
-					space.remove(shape)
-			elif attack.side_facing == consts.FIGHTER_SIDE_FACING_RIGHT:
-				for shape in current_cast.hitbox.right_shapes:
-					space.remove(shape)
+		return BUSY_STEP_RESULTS
+
+	power_timeline = attack.timeline[attack.power_idx]
+	cast_timeline = power_timeline.casts[attack.cast_idx]
+	cast_frame = attack.cast_frame + 1
+	attack.cast_frame = cast_frame
+
+	is_hit_input_pressed = fighter_input.is_pressed(attack.hit_input.value)
+	attack.can_do_charging = is_hit_input_pressed and cast_timeline.is_chargeable and cast_frame < cast_timeline.charge_end_frame
+	if attack.can_do_charging and cast_frame > cast_timeline.startup_frames:
+		attack.charged_dmg += cast_timeline.extra_dmg_per_charged_frame
+		attack.cast_charged_frames += 1
+		return BUSY_STEP_RESULTS
+
+	is_power_cancelled_early = (power_timeline.cancel_power_on_hit and attack.has_hit) or (power_timeline.cancel_power_on_ground and is_fighter_grounded)
+	# the first active frame begins at the same frame as the last startup frame, which is why end_frame is one less than startup plus active frames, or 0 if no startup frames. any cast frames that were spent on charging aren't counted.
+	is_cast_out_of_frames = cast_frame - attack.cast_charged_frames > cast_timeline.end_frame
+	is_cast_running_forever = cast_timeline.is_active_until_cancelled and is_hit_input_pressed
+
+	if is_power_cancelled_early or (is_cast_out_of_frames and not is_cast_running_forever):
+		# a cast cancelled during its startup never had its hitboxes added
+		if attack.is_cast_active:
+			for shape in attack.side_shapes[attack.power_idx][attack.cast_idx][attack.side_facing]:
+				space.remove(shape)
 
 		attack.cast_idx += 1
-		if is_power_cancelled_early or attack.cast_idx >= len(current_power.casts):
+		attack.is_cast_active = False
+		attack.cast_charged_frames = 0
+		if is_power_cancelled_early or attack.cast_idx >= len(power_timeline.casts):
 			attack.cast_idx = 0
-			attack.power_idx += 1
-			current_power = None
-			for (idx, power) in enumerate(attack.powers):
-				if idx < attack.power_idx:
-					continue
-				if power.requires_hit and not attack.has_hit:
-					continue
-				if power.requires_no_hit and attack.has_hit:
-					continue
-				if power.requires_grounding and not is_fighter_grounded:
-					continue
-				if power.requires_no_grounding and is_fighter_grounded:
-					continue
-				current_power = power
-				attack.power_idx = idx
-				break
-			if current_power == None:
+			next_power_idx = power_timeline.next_power[next_power_index(attack.has_hit, is_fighter_grounded)]
+			if next_power_idx < 0:
 				attack.power_idx = 0
 				attack.is_active = False
-				current_power = None
-				current_cast = None
-				return StepAttackResults(is_active=False, velocity=None, recover_frames=0)
-		
-		attack.cast_frame = 1
-		current_power = attack.powers[attack.power_idx]
-		current_cast = current_power.casts[attack.cast_idx]
-		attack.can_do_charging = current_cast.additional_startup_frames > 0
-
-	fighter_recover_frames=0
-	if current_power.is_active == False:
-		current_power.is_active = True
-		attack.cooldown_timer += current_power.cooldown_frames
-		total_recover_frames = current_power.recovery_frames + current_power.fixed_recovery_frames
-		if attack.power_idx == len(attack.powers)-1:
-			fighter_recover_frames = total_recover_frames
+				return INACTIVE_STEP_RESULTS
+			attack.power_idx = next_power_idx
+			attack.is_power_active = False
+			attack.has_power_hit = False
+			power_timeline = attack.timeline[next_power_idx]
+
+		cast_frame = 1
+		attack.cast_frame = cast_frame
+		cast_timeline = power_timeline.casts[attack.cast_idx]
+		attack.can_do_charging = cast_timeline.is_chargeable
+
+	fighter_recover_frames = 0
+	if attack.is_power_active == False:
+		attack.is_power_active = True
+		attack.cooldown_timer += power_timeline.cooldown_frames
+		if power_timeline.is_last:
+			fighter_recover_frames = power_timeline.recover_frames
 		else:
-			attack.recover_timer = total_recover_frames
-
-	if attack.cast_frame >= current_cast.startup_frames and current_cast.is_active == False:
-		current_cast.is_active = True
-		if current_cast.hitbox != None:
-			if attack.side_facing == consts.FIGHTER_SIDE_FACING_LEFT:
-				for shape in current_cast.hitbox.left_shapes:
-					space.add(shape)
-			elif attack.side_facing == consts.FIGHTER_SIDE_FACING_RIGHT:
-				for shape in current_cast.hitbox.right_shapes:
-					space.add(shape)
-	
-	attack_velocity = None
-	if (current_cast.is_active or not current_cast.is_velocity_on_active_frames_only) and current_cast.velocity != None:
-		attack_velocity = current_cast.velocity
-	return StepAttackResults(is_active=True, velocity=attack_velocity, recover_frames=fighter_recover_frames)
+			attack.recover_timer = power_timeline.recover_frames
+
+	if cast_frame >= cast_timeline.startup_frames and attack.is_cast_active == False:
+		attack.is_cast_active = True
+		shapes = attack.side_shapes[attack.power_idx][attack.cast_idx][attack.side_facing]
+		if shapes == None:
+			shapes = attack.make_hitbox_shapes(attack.power_idx, attack.cast_idx, attack.side_facing)
+		for shape in shapes:
+			space.add(shape)
+
+	attack_velocity = cast_timeline.velocities[min(cast_frame, cast_timeline.last_velocity_frame)]
+	if attack_velocity == None and fighter_recover_frames == 0:
+		return BUSY_STEP_RESULTS
+	results = attack.step_results
+	results.velocity = attack_velocity
+	results.recover_frames = fighter_recover_frames
+	return results
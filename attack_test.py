@@ -2,10 +2,14 @@ import unittest
 from attack import *
 import pymunk
 import input
+import attack_moves
 
 # Assuming that consts.FIGHTER_SIDE_FACING_LEFT and consts.FIGHTER_SIDE_FACING_RIGHT are 0 and 1 respectively
 DUMMY_SIDE_FACING = 0
 
+def make_attack(**kwargs) -> Attack:
+	return Attack(AttackDef(**kwargs))
+
 class TestAttack(unittest.TestCase):
 	
 	def setUp(self):
@@ -17,8 +21,8 @@ class TestAttack(unittest.TestCase):
 		tests = [
 			{
 				"name": "Test with 2 startup and 3 active frames",
-				"attack": Attack(
-						powers = [Power(casts=[Cast(startup_frames=2, active_frames=3, hitbox=Hitbox(left_shapes=[], right_shapes=[]))])], 
+				"attack": make_attack(
+						powers = [Power(casts=[Cast(startup_frames=2, active_frames=3, hitbox=Hitbox([]))])], 
 						name="dummy_attack", 
 						requires_fighter_grounding=True, hit_input=AttackHitInput.LIGHT, move_type=AttackMoveType.DOWN),
 				"input": input.Input(),
@@ -28,7 +32,7 @@ class TestAttack(unittest.TestCase):
 			},
 			{
 				"name": "Dummy sidelight",
-				"attack": Attack(
+				"attack": make_attack(
 					powers = [
 						Power(
 							casts = [
@@ -36,7 +40,7 @@ class TestAttack(unittest.TestCase):
 								Cast(startup_frames=3, active_frames=2, velocity=(100,10), is_velocity_on_active_frames_only=True),
 								Cast(
 									startup_frames=1, active_frames=4, velocity=(100,0), is_velocity_on_active_frames_only=False, base_dmg = 13, var_force=20, fixed_force=80,
-									hitbox=Hitbox( [], [], ),
+									hitbox=Hitbox([]),
 								)
 							],
 							cooldown_frames = 10, stun_frames = 18
@@ -55,11 +59,11 @@ class TestAttack(unittest.TestCase):
 			},
 			{
 				"name": "active forever",
-				"attack": Attack(
+				"attack": make_attack(
 						powers = [Power(casts=[
 							Cast(
 								startup_frames=2, active_frames=3, is_active_until_cancelled=True,
-								hitbox=Hitbox(left_shapes=[], right_shapes=[])
+								hitbox=Hitbox([])
 							)
 						])],
 						name="dummy_attack", 
@@ -101,15 +105,15 @@ class TestAttack(unittest.TestCase):
 		fourth_case_input = input.Input()
 		fourth_case_input.current[input.INPUT_LIGHT_HIT] = True
 
-		air_attack_with_jump_use = Attack(
-						powers = [Power(casts=[Cast(startup_frames=0, active_frames=1, hitbox=Hitbox(left_shapes=[], right_shapes=[]))])], 
+		air_attack_with_jump_use = make_attack(
+						powers = [Power(casts=[Cast(startup_frames=0, active_frames=1, hitbox=Hitbox([]))])], 
 						name="dummy_attack", 
 						requires_fighter_grounding=False, hit_input=AttackHitInput.HEAVY, move_type=AttackMoveType.NEUTRAL, is_jump_attack=True)
 		air_attack_with_jump_use.has_jump_attack_use = True
 
 
-		air_attack_without_jump_use = Attack(
-						powers = [Power(casts=[Cast(startup_frames=0, active_frames=1, hitbox=Hitbox(left_shapes=[], right_shapes=[]))])], 
+		air_attack_without_jump_use = make_attack(
+						powers = [Power(casts=[Cast(startup_frames=0, active_frames=1, hitbox=Hitbox([]))])], 
 						name="dummy_attack", 
 						requires_fighter_grounding=False, hit_input=AttackHitInput.HEAVY, move_type=AttackMoveType.NEUTRAL, is_jump_attack=True)
 		air_attack_without_jump_use.has_jump_attack_use = False
@@ -117,8 +121,8 @@ class TestAttack(unittest.TestCase):
 		tests = [
 			{
 				"name": "side_light_met",
-				"attack": Attack(
-						powers = [Power(casts=[Cast(startup_frames=2, active_frames=3, hitbox=Hitbox(left_shapes=[], right_shapes=[]))])], 
+				"attack": make_attack(
+						powers = [Power(casts=[Cast(startup_frames=2, active_frames=3, hitbox=Hitbox([]))])], 
 						name="dummy_attack", 
 						requires_fighter_grounding=True, hit_input=AttackHitInput.LIGHT, move_type=AttackMoveType.SIDE),
 				"spare_fighter_jumps": 0,
@@ -128,8 +132,8 @@ class TestAttack(unittest.TestCase):
 			},
 			{
 				"name": "down_light_not_met",
-				"attack": Attack(
-						powers = [Power(casts=[Cast(startup_frames=2, active_frames=3, hitbox=Hitbox(left_shapes=[], right_shapes=[]))])], 
+				"attack": make_attack(
+						powers = [Power(casts=[Cast(startup_frames=2, active_frames=3, hitbox=Hitbox([]))])], 
 						name="dummy_attack", 
 						requires_fighter_grounding=True, hit_input=AttackHitInput.LIGHT, move_type=AttackMoveType.DOWN),
 				"spare_fighter_jumps": 0,
@@ -139,8 +143,8 @@ class TestAttack(unittest.TestCase):
 			},
 			{
 				"name": "neutral_heavy_met",
-				"attack": Attack(
-						powers = [Power(casts=[Cast(startup_frames=2, active_frames=3, hitbox=Hitbox(left_shapes=[], right_shapes=[]))])], 
+				"attack": make_attack(
+						powers = [Power(casts=[Cast(startup_frames=2, active_frames=3, hitbox=Hitbox([]))])], 
 						name="dummy_attack", 
 						requires_fighter_grounding=True, hit_input=AttackHitInput.HEAVY, move_type=AttackMoveType.NEUTRAL),
 				"spare_fighter_jumps": 0,
@@ -150,8 +154,8 @@ class TestAttack(unittest.TestCase):
 			},
 			{
 				"name": "side_light_not_met",
-				"attack": Attack(
-						powers = [Power(casts=[Cast(startup_frames=2, active_frames=3, hitbox=Hitbox(left_shapes=[], right_shapes=[]))])], 
+				"attack": make_attack(
+						powers = [Power(casts=[Cast(startup_frames=2, active_frames=3, hitbox=Hitbox([]))])], 
 						name="dummy_attack", 
 						requires_fighter_grounding=True, hit_input=AttackHitInput.LIGHT, move_type=AttackMoveType.SIDE),
 				"spare_fighter_jumps": 0,
@@ -194,5 +198,101 @@ class TestAttack(unittest.TestCase):
 				got = is_attack_triggered(attack, is_fighter_grounded, fighter_input, spare_fighter_jumps)
 				self.assertEqual(want, got)
 
+	def test_compiled_timeline(self):
+		attack = make_attack(
+			powers = [
+				Power(casts=[Cast(startup_frames=3, active_frames=2, velocity=(5,0), is_velocity_on_active_frames_only=True)], recovery_frames=4, fixed_recovery_frames=1),
+				Power(casts=[Cast(startup_frames=0, active_frames=1)], requires_hit=True),
+				Power(casts=[Cast(startup_frames=0, active_frames=1)], requires_no_grounding=True),
+			],
+			name="dummy_attack",
+			requires_fighter_grounding=True, hit_input=AttackHitInput.LIGHT, move_type=AttackMoveType.NEUTRAL)
+		first_power = attack.timeline[0]
+		self.assertEqual(first_power.recover_frames, 5)
+		self.assertFalse(first_power.is_last)
+		self.assertTrue(attack.timeline[2].is_last)
+
+		first_cast = first_power.casts[0]
+		self.assertEqual(first_cast.end_frame, 4)
+		self.assertEqual(first_cast.velocities, (None, None, None, (5,0)))
+
+		self.assertEqual(first_power.next_power[next_power_index(has_hit=True, is_fighter_grounded=True)], 1)
+		self.assertEqual(first_power.next_power[next_power_index(has_hit=False, is_fighter_grounded=False)], 2)
+		self.assertEqual(first_power.next_power[next_power_index(has_hit=False, is_fighter_grounded=True)], -1)
+		self.assertEqual(attack.timeline[1].next_power[next_power_index(has_hit=True, is_fighter_grounded=True)], -1)
+
+	def test_dispatch_matches_scanning_attacks(self):
+		attacks = attack_moves.unarmed_moveset().make_attacks(pymunk.Body(mass=5, moment=float("inf")))
+		dispatch = AttackDispatch(attacks)
+		fighter_input = input.Input()
+		for current_bits in range(1 << input.INPUT_COUNT):
+			for prev_bits in (0, current_bits, current_bits ^ input.HIT_MASK):
+				fighter_input.current_bits = current_bits
+				fighter_input.prev_bits = prev_bits
+				for is_fighter_grounded in (False, True):
+					for spare_fighter_jumps in (0, 1):
+						for has_jump_attack_use in (False, True):
+							for attack in attacks:
+								attack.has_jump_attack_use = has_jump_attack_use
+							want = None
+							for attack in attacks:
+								if is_attack_triggered(attack, is_fighter_grounded, fighter_input, spare_fighter_jumps).can_activate:
+									want = attack
+									break
+							self.assertIs(dispatch.find_triggered(fighter_input, is_fighter_grounded, spare_fighter_jumps), want)
+
+	def test_definitions_are_shared(self):
+		moveset = attack_moves.unarmed_moveset()
+		self.assertIs(attack_moves.unarmed_moveset(), moveset)
+		(first, second) = (moveset.make_attacks(pymunk.Body(mass=5, moment=float("inf"))) for _ in range(2))
+		for (attack, other) in zip(first, second):
+			attack.make_all_hitbox_shapes()
+			other.make_all_hitbox_shapes()
+			self.assertIs(attack.definition, other.definition)
+			self.assertIs(attack.timeline, other.timeline)
+			# but every fighter has its own hitbox shapes, on its own body
+			self.assertTrue(set(attack.hitbox_shapes()).isdisjoint(other.hitbox_shapes()))
+			for shape in attack.hitbox_shapes():
+				self.assertIs(shape.attack, attack)
+				self.assertIn(shape.power, attack.definition.powers)
+		# attacks know where they are in the fighter's list, so finding one's index needs no search
+		for (idx, attack) in enumerate(first):
+			self.assertEqual(attack.idx, idx)
+
+	def test_hitbox_shapes_made_on_first_use(self):
+		body = pymunk.Body(mass=5, moment=float("inf"))
+		self.space.add(body)
+		attack = Attack(attack_moves.unarmed_moveset().attacks[0], body)
+		self.assertEqual(attack.hitbox_shapes(), [])
+		live_shapes = []
+		for _ in range(2):
+			attack.activate(consts.FIGHTER_SIDE_FACING_RIGHT)
+			while step_attack(attack, self.space, input.Input(), is_fighter_grounded=True).is_active:
+				live_shapes.append(tuple(self.space.shapes))
+			self.assertEqual(self.space.shapes, [])
+		live_shapes = set(shapes for shapes in live_shapes if len(shapes) > 0)
+		# the same shapes are used on every activation, and only the side that was faced got any
+		self.assertEqual(len(live_shapes), 1)
+		self.assertEqual(set(attack.hitbox_shapes()), set(live_shapes.pop()))
+		for shape in attack.hitbox_shapes():
+			self.assertEqual(shape.side_facing, consts.FIGHTER_SIDE_FACING_RIGHT)
+
+	def test_capsule_hitboxes_are_single_shapes(self):
+		body = pymunk.Body(mass=5, moment=float("inf"))
+		capsules = [attack_moves.CapsuleParams((10, 2), (20, 8)), attack_moves.CapsuleParams((0, 0), (6, 6)), attack_moves.CapsuleParams((0, 5), (4, 12))]
+		hitbox = attack_moves.Hitbox(capsules)
+		left_shapes = hitbox.make_shapes(body, consts.FIGHTER_SIDE_FACING_LEFT)
+		right_shapes = hitbox.make_shapes(body, consts.FIGHTER_SIDE_FACING_RIGHT)
+		self.assertEqual(len(right_shapes), len(capsules))
+		self.assertEqual(len(left_shapes), len(capsules))
+		(wide, round, tall) = right_shapes
+		self.assertIsInstance(wide, pymunk.Segment)
+		self.assertEqual((wide.a, wide.b, wide.radius), ((4, 2), (16, 2), 4))
+		self.assertIsInstance(round, pymunk.Circle)
+		self.assertEqual(round.radius, 3)
+		self.assertEqual((tall.a, tall.b, tall.radius), ((0, 1), (0, 9), 2))
+		# left facing shapes are mirrored
+		self.assertEqual((left_shapes[0].a, left_shapes[0].b), ((-16, 2), (-4, 2)))
+
 if __name__ == '__main__':
 	unittest.main()
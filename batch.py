@@ -0,0 +1,134 @@
+import numpy
+from game import GameState, step_game, step_fighters, begin_fighter_arrays_step, end_fighter_arrays_step, step_world, DEFAULT_FIGHTER_COUNT
+from fighter_arrays import FighterArrays
+
+class BatchGameState():
+	def __init__(self, match_count: int, teams: list[int]|None = None, fighter_count: int|None = None, use_fighter_arrays: bool = False):
+		"""
+			owns match_count independent matches that are all stepped in lockstep.
+			observations are written into preallocated numpy arrays that are overwritten in place on every step, so copy them if they need to be kept around.
+
+			### Parameters:
+				teams, fighter_count : the same for every match, see GameState
+				use_fighter_arrays : keep the per frame values of every fighter of every match in one set of arrays, so their end of frame bookkeeping is a single numpy operation per value for the whole batch. see fighter_arrays.py
+		"""
+		if fighter_count == None:
+			fighter_count = len(teams) if teams != None else DEFAULT_FIGHTER_COUNT
+		# (match_count, fighter_count), or None when every fighter keeps its own values
+		self.fighter_arrays: FighterArrays|None = None
+		if use_fighter_arrays:
+			self.fighter_arrays = FighterArrays((match_count, fighter_count))
+			self.matches = [GameState(teams=teams, fighter_count=fighter_count, fighter_arrays=self.fighter_arrays.match_view(match_idx)) for match_idx in range(match_count)]
+		else:
+			self.matches = [GameState(teams=teams, fighter_count=fighter_count) for _ in range(match_count)]
+		self.match_count = match_count
+		self.fighter_count = len(self.matches[0].fighters)
+		# attack ids are indices into a fighter's attack list. every fighter has the same moveset, so the names are shared.
+		self.attack_names = [attack.name for attack in self.matches[0].fighters[0].attacks]
+
+		shape = (match_count, self.fighter_count)
+		self.position = numpy.zeros(shape + (2,), dtype=numpy.float64)
+		self.velocity = numpy.zeros(shape + (2,), dtype=numpy.float64)
+		self.dmg_points = numpy.zeros(shape, dtype=numpy.float64)
+		self.recover_timer = numpy.zeros(shape, dtype=numpy.int32)
+		self.dodge_timer = numpy.zeros(shape, dtype=numpy.int32)
+		self.dodge_cooldown_timer = numpy.zeros(shape, dtype=numpy.int32)
+		self.midair_jumps_left = numpy.zeros(shape, dtype=numpy.int32)
+		self.side_facing = numpy.zeros(shape, dtype=numpy.int8)
+		self.is_grounded = numpy.zeros(shape, dtype=bool)
+		self.is_dodging = numpy.zeros(shape, dtype=bool)
+		# -1 when the fighter has no active attack
+		self.active_attack = numpy.full(shape, -1, dtype=numpy.int16)
+
+		self.observations = {
+			"position": self.position,
+			"velocity": self.velocity,
+			"dmg_points": self.dmg_points,
+			"recover_timer": self.recover_timer,
+			"dodge_timer": self.dodge_timer,
+			"dodge_cooldown_timer": self.dodge_cooldown_timer,
+			"midair_jumps_left": self.midair_jumps_left,
+			"side_facing": self.side_facing,
+			"is_grounded": self.is_grounded,
+			"is_dodging": self.is_dodging,
+			"active_attack": self.active_attack,
+		}
+		self._gather()
+
+	def step(self, inputs: numpy.ndarray) -> dict[str, numpy.ndarray]:
+		"""
+			steps every match by one frame.
+
+			### Parameters:
+				inputs : boolean array of shape (match_count, fighter_count, 8) in the layout of input.Input.current
+		"""
+		if inputs.shape != (self.match_count, self.fighter_count, 8):
+			raise ValueError("expected inputs of shape {}, got {}".format((self.match_count, self.fighter_count, 8), inputs.shape))
+		# packing into bitmasks and a single bulk conversion is much cheaper than indexing the numpy array per fighter
+		input_rows = numpy.packbits(inputs.astype(bool, copy=False), axis=-1, bitorder="little")[..., 0].tolist()
+		for game_state, match_inputs in zip(self.matches, input_rows):
+			for fighter, fighter_bits in zip(game_state.fighters, match_inputs):
+				fighter.input.current_bits = fighter_bits
+			if self.fighter_arrays == None:
+				step_game(game_state)
+			else:
+				step_fighters(game_state)
+		if self.fighter_arrays != None:
+			# step_game split in three, so the middle runs once over every match. matches don't touch each other, so this plays out the same as stepping them one by one
+			for game_state in self.matches:
+				begin_fighter_arrays_step(game_state)
+			self.fighter_arrays.step()
+			for game_state in self.matches:
+				end_fighter_arrays_step(game_state)
+				step_world(game_state)
+		self._gather()
+		return self.observations
+
+	def _gather(self):
+		# build flat python lists and hand them to numpy once per field, instead of writing into the arrays element by element
+		positions = []
+		velocities = []
+		dmg_points = []
+		recover_timers = []
+		dodge_timers = []
+		dodge_cooldown_timers = []
+		midair_jumps_left = []
+		side_facings = []
+		groundings = []
+		dodgings = []
+		active_attacks = []
+		# values that are in the fighter arrays already are copied over in one go further down
+		has_arrays = self.fighter_arrays != None
+		for game_state in self.matches:
+			for fighter in game_state.fighters:
+				body = fighter.body
+				positions.extend(body.position)
+				velocities.extend(body.velocity)
+				dmg_points.append(fighter.dmg_points)
+				midair_jumps_left.append(fighter.midair_jumps_left)
+				side_facings.append(fighter.side_facing)
+				groundings.append(fighter.is_grounded)
+				active_attacks.append(fighter.active_attack_idx)
+				if not has_arrays:
+					recover_timers.append(fighter.recover_timer)
+					dodge_timers.append(fighter.dodge_timer)
+					dodge_cooldown_timers.append(fighter.dodge_cooldown_timer)
+					dodgings.append(fighter.is_dodging)
+
+		self.position.reshape(-1)[:] = positions
+		self.velocity.reshape(-1)[:] = velocities
+		self.dmg_points.reshape(-1)[:] = dmg_points
+		self.midair_jumps_left.reshape(-1)[:] = midair_jumps_left
+		self.side_facing.reshape(-1)[:] = side_facings
+		self.is_grounded.reshape(-1)[:] = groundings
+		self.active_attack.reshape(-1)[:] = active_attacks
+		if has_arrays:
+			numpy.copyto(self.recover_timer, self.fighter_arrays.recover_timer, casting="unsafe")
+			numpy.copyto(self.dodge_timer, self.fighter_arrays.dodge_timer, casting="unsafe")
+			numpy.copyto(self.dodge_cooldown_timer, self.fighter_arrays.dodge_cooldown_timer, casting="unsafe")
+			numpy.copyto(self.is_dodging, self.fighter_arrays.is_dodging)
+		else:
+			self.recover_timer.reshape(-1)[:] = recover_timers
+			self.dodge_timer.reshape(-1)[:] = dodge_timers
+			self.dodge_cooldown_timer.reshape(-1)[:] = dodge_cooldown_timers
+			self.is_dodging.reshape(-1)[:] = dodgings
@@ -0,0 +1,36 @@
+import unittest
+import numpy
+from batch import *
+import input
+
+class TestBatchGameState(unittest.TestCase):
+
+	def test_matches_single_game_states(self):
+		match_count = 3
+		batch = BatchGameState(match_count)
+		singles = [GameState() for _ in range(match_count)]
+		rng = numpy.random.default_rng(7)
+
+		for _ in range(300):
+			inputs = rng.random((match_count, batch.fighter_count, 8)) < 0.1
+			observations = batch.step(inputs)
+			for game_state, match_inputs in zip(singles, inputs.tolist()):
+				game_state.step(match_inputs)
+
+		for match_idx, game_state in enumerate(singles):
+			for fighter_idx, fighter in enumerate(game_state.fighters):
+				self.assertEqual(tuple(observations["position"][match_idx, fighter_idx]), tuple(fighter.body.position))
+				self.assertEqual(tuple(observations["velocity"][match_idx, fighter_idx]), tuple(fighter.body.velocity))
+				self.assertEqual(observations["dmg_points"][match_idx, fighter_idx], fighter.dmg_points)
+				self.assertEqual(observations["recover_timer"][match_idx, fighter_idx], fighter.recover_timer)
+				self.assertEqual(observations["is_grounded"][match_idx, fighter_idx], fighter.is_grounded)
+				active = [idx for (idx, attack) in enumerate(fighter.attacks) if attack.is_active]
+				self.assertEqual(observations["active_attack"][match_idx, fighter_idx], active[0] if active else -1)
+
+	def test_rejects_wrong_input_shape(self):
+		batch = BatchGameState(2)
+		with self.assertRaises(ValueError):
+			batch.step(numpy.zeros((2, batch.fighter_count, 7), dtype=bool))
+
+if __name__ == '__main__':
+	unittest.main()
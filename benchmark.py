@@ -0,0 +1,339 @@
+import argparse
+import gc
+import json
+import multiprocessing
+import platform
+import random
+import sys
+import time
+import numpy
+import consts
+import input
+from attack import AttackMoveType
+from batch import BatchGameState
+from fighter_arrays import FighterArrays
+from game import GameState, step_game
+
+try:
+	import resource
+except ImportError:
+	# not available on windows, where peak rss is left out
+	resource = None
+
+# headless performance benchmarks over scripted input scenarios.
+# every scenario's inputs are generated up front as packed input bits, so only the simulation is measured. each scenario runs in a fresh process by default, so peak rss belongs to that scenario alone.
+#
+#	python benchmark.py --out results.json
+#	python benchmark.py --baseline results.json --threshold 0.1
+#
+# the second form exits with status 1 when any scenario regressed beyond the threshold against the stored results.
+
+# frames run before measuring, so caches are warm and lazily made values exist
+WARMUP_FRAMES = 120
+
+class Scenario():
+	def __init__(self, name: str, description: str, frame_count: int, fighter_count: int = 2, match_count: int = 1, use_fighter_arrays: bool = False):
+		"""
+			### Parameters:
+				match_count : matches stepped in lockstep through a BatchGameState. a frame is one step of every match
+				use_fighter_arrays : keep the fighters' per frame values in numpy arrays, see fighter_arrays.py
+		"""
+		self.name = name
+		self.description = description
+		self.frame_count = frame_count
+		self.fighter_count = fighter_count
+		self.match_count = match_count
+		self.use_fighter_arrays = use_fighter_arrays
+
+	def scripts(self, game_state: GameState, frame_count: int) -> list[list[int]]:
+		"""
+			### Returns:
+				for every fighter, its input bits for every frame
+		"""
+		raise NotImplementedError
+
+class IdleScenario(Scenario):
+	def scripts(self, game_state: GameState, frame_count: int) -> list[list[int]]:
+		return [[0] * frame_count for _ in game_state.fighters]
+
+class AttackSpamScenario(Scenario):
+	# frames between attacks, long enough to land, recover and come off cooldown
+	ATTACK_SPACING_FRAMES = 90
+	# frames between jumping and attacking, for attacks done in the air
+	JUMP_LEAD_FRAMES = 8
+	# fighters spawn in the air, so they get this long to land before the first attack
+	SETTLE_FRAMES = 60
+
+	def scripts(self, game_state: GameState, frame_count: int) -> list[list[int]]:
+		"""
+			every fighter goes through every attack in its moveset in order, over and over
+		"""
+		scripts = []
+		for fighter in game_state.fighters:
+			cycle = []
+			for attack in fighter.attacks:
+				segment = [0] * self.ATTACK_SPACING_FRAMES
+				held = 0
+				if attack.move_type == AttackMoveType.SIDE:
+					held = input.input_mask(input.INPUT_MOVE_RIGHT)
+				elif attack.move_type == AttackMoveType.DOWN:
+					held = input.input_mask(input.INPUT_MOVE_DOWN)
+				hit_frame = 0
+				if not attack.requires_fighter_grounding:
+					segment[0] = input.input_mask(input.INPUT_JUMP)
+					hit_frame = self.JUMP_LEAD_FRAMES
+				segment[hit_frame] = held | input.input_mask(attack.hit_input.value)
+				cycle += segment
+			script = [0] * self.SETTLE_FRAMES + [cycle[frame % len(cycle)] for frame in range(max(frame_count - self.SETTLE_FRAMES, 0))]
+			scripts.append(script[:frame_count])
+		return scripts
+
+class ChargedHeavyScenario(Scenario):
+	HOLD_FRAMES = 45
+	RELEASE_FRAMES = 45
+
+	def scripts(self, game_state: GameState, frame_count: int) -> list[list[int]]:
+		"""
+			every fighter charges a neutral heavy for as long as it can, lets go, and starts charging again
+		"""
+		cycle = [input.input_mask(input.INPUT_HEAVY_HIT)] * self.HOLD_FRAMES + [0] * self.RELEASE_FRAMES
+		return [[cycle[frame % len(cycle)] for frame in range(frame_count)] for _ in game_state.fighters]
+
+class RandomScenario(Scenario):
+	TOGGLE_CHANCE = 0.05
+
+	def scripts(self, game_state: GameState, frame_count: int) -> list[list[int]]:
+		"""
+			every fighter flips each of its inputs at random, seeded so every run gets the same inputs
+		"""
+		rng = random.Random(0)
+		scripts = []
+		for _ in game_state.fighters:
+			bits = 0
+			script = []
+			for _ in range(frame_count):
+				for idx in range(input.INPUT_COUNT):
+					if rng.random() < self.TOGGLE_CHANCE:
+						bits ^= 1 << idx
+				script.append(bits)
+			scripts.append(script)
+		return scripts
+
+# fighter counts of the scaling scenarios
+SCALING_FIGHTER_COUNTS = (2, 4, 8, 16, 32, 64)
+
+SCENARIOS: dict[str, Scenario] = {scenario.name: scenario for scenario in (
+	IdleScenario("idle", "two fighters standing still", frame_count=20000),
+	AttackSpamScenario("attack_spam", "two fighters going through every unarmed attack", frame_count=20000),
+	ChargedHeavyScenario("charged_heavy", "two fighters charging and releasing neutral heavies", frame_count=20000),
+	RandomScenario("ffa8", "8 fighter free for all with random inputs", frame_count=5000, fighter_count=8),
+	RandomScenario("parallel_1000", "1000 matches of random inputs stepped in lockstep", frame_count=60, match_count=1000),
+	RandomScenario("parallel_1000_arrays", "parallel_1000 with the fighters' per frame values in numpy arrays", frame_count=60, match_count=1000, use_fighter_arrays=True),
+	RandomScenario("ffa64_arrays", "64 fighter free for all with the fighters' per frame values in numpy arrays", frame_count=2000, fighter_count=64, use_fighter_arrays=True),
+	*(RandomScenario("scaling_{}".format(fighter_count), "{} fighter free for all with random inputs, to see how a frame's cost grows with fighters".format(fighter_count), frame_count=2000, fighter_count=fighter_count)
+		for fighter_count in SCALING_FIGHTER_COUNTS),
+)}
+
+def peak_rss_mib() -> float|None:
+	if resource == None:
+		return None
+	peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	# kilobytes on linux, bytes on mac
+	return peak / (1024*1024 if sys.platform == "darwin" else 1024)
+
+def run_scenario(name: str, scale: float = 1.0) -> dict:
+	"""
+		runs one scenario in this process.
+
+		### Parameters:
+			scale : multiplies the scenario's frame count, e.g. to make quick runs
+		### Returns:
+			the scenario's metrics
+	"""
+	scenario = SCENARIOS[name]
+	frame_count = max(int(scenario.frame_count * scale), 1)
+	setup_start = time.perf_counter()
+	if scenario.match_count == 1:
+		fighter_arrays = FighterArrays((scenario.fighter_count,)) if scenario.use_fighter_arrays else None
+		game_states = [GameState(fighter_count=scenario.fighter_count, fighter_arrays=fighter_arrays)]
+	else:
+		batch = BatchGameState(scenario.match_count, fighter_count=scenario.fighter_count, use_fighter_arrays=scenario.use_fighter_arrays)
+		game_states = batch.matches
+	setup_seconds = time.perf_counter() - setup_start
+
+	warmup_frames = min(WARMUP_FRAMES, frame_count)
+	scripts = scenario.scripts(game_states[0], warmup_frames + frame_count)
+	# frame major, so each step reads one row
+	frames_bits = [list(frame_bits) for frame_bits in zip(*scripts)]
+
+	if scenario.match_count == 1:
+		game_state = game_states[0]
+		fighter_inputs = [fighter.input for fighter in game_state.fighters]
+		def step(frame_bits: list[int]):
+			for (fighter_input, bits) in zip(fighter_inputs, frame_bits):
+				fighter_input.current_bits = bits
+			step_game(game_state)
+	else:
+		# every match gets the same inputs. BatchGameState takes them unpacked
+		unpacked = [numpy.array([input.unpack_input(bits) for bits in frame_bits], dtype=bool) for frame_bits in frames_bits]
+		frames_bits = [numpy.broadcast_to(frame_inputs, (scenario.match_count,) + frame_inputs.shape) for frame_inputs in unpacked]
+		def step(frame_inputs: numpy.ndarray):
+			batch.step(frame_inputs)
+
+	for frame_bits in frames_bits[:warmup_frames]:
+		step(frame_bits)
+
+	latencies_ns = numpy.zeros(frame_count, dtype=numpy.int64)
+	perf_counter_ns = time.perf_counter_ns
+	gc.collect()
+	gc_collections_before = gc.get_stats()[0]["collections"]
+	blocks_before = sys.getallocatedblocks()
+	start = time.perf_counter()
+	for (frame_idx, frame_bits) in enumerate(frames_bits[warmup_frames:]):
+		frame_start = perf_counter_ns()
+		step(frame_bits)
+		latencies_ns[frame_idx] = perf_counter_ns() - frame_start
+	elapsed = time.perf_counter() - start
+	blocks_after = sys.getallocatedblocks()
+	gc_collections = gc.get_stats()[0]["collections"] - gc_collections_before
+
+	match_frames = frame_count * scenario.match_count
+	hit_callbacks = sum(game_state.hit_callbacks for game_state in game_states)
+	hits_landed = sum(sum(game_state.hits_per_attack.values()) for game_state in game_states)
+	return {
+		"description": scenario.description,
+		"fighters": scenario.fighter_count,
+		"matches": scenario.match_count,
+		"frames": frame_count,
+		"setup_seconds": setup_seconds,
+		"frames_per_second": match_frames / elapsed,
+		# what a frame costs per fighter in it. stays flat as fighters are added as long as a frame's cost grows linearly with them
+		"us_per_fighter_frame": elapsed * 1e6 / (match_frames * scenario.fighter_count),
+		"p50_frame_us": float(numpy.percentile(latencies_ns, 50)) / 1000,
+		"p99_frame_us": float(numpy.percentile(latencies_ns, 99)) / 1000,
+		"max_frame_us": float(latencies_ns.max()) / 1000,
+		# live allocated blocks gained, net of the ones freed, so blocks allocated and freed within the window don't show up. steady state frames should not grow the heap
+		"net_allocated_blocks_per_frame": (blocks_after - blocks_before) / match_frames,
+		# young generation collections, which happen every few hundred container allocations, so they track allocation churn
+		"gc_collections_per_1000_frames": gc_collections * 1000 / match_frames,
+		"peak_rss_mib": peak_rss_mib(),
+		# hurtbox/hitbox overlaps that reached the hit callbacks, and how many of them landed a hit, over the whole run including warmup
+		"hit_callbacks_per_frame": hit_callbacks / (match_frames + warmup_frames * scenario.match_count),
+		"hits_per_frame": hits_landed / (match_frames + warmup_frames * scenario.match_count),
+		# overlaps between fighters of the same team. collision groups should keep this at zero
+		"friendly_hit_callbacks": sum(game_state.friendly_hit_callbacks for game_state in game_states),
+	}
+
+def run_scenario_isolated(name: str, scale: float = 1.0) -> dict:
+	"""
+		runs one scenario in a fresh process, so peak rss and garbage left around by other scenarios don't leak into its results
+	"""
+	with multiprocessing.get_context("spawn").Pool(1) as pool:
+		return pool.apply(run_scenario, (name, scale))
+
+def scaling_exponent(results: dict) -> float|None:
+	"""
+		slope of a least squares fit of log frame time against log fighter count, over the scaling scenarios that were run.
+		1 is linear in fighters, 2 would be every fighter doing work for every other fighter
+
+		### Parameters:
+			results : metrics of every scenario that was run, by name
+		### Returns:
+			the slope, or None when fewer than two scaling scenarios were run
+	"""
+	points = []
+	for fighter_count in SCALING_FIGHTER_COUNTS:
+		metrics = results.get("scaling_{}".format(fighter_count))
+		if metrics != None and "frames_per_second" in metrics:
+			points.append((numpy.log(fighter_count), numpy.log(1 / metrics["frames_per_second"])))
+	if len(points) < 2:
+		return None
+	(xs, ys) = zip(*points)
+	return float(numpy.polyfit(xs, ys, 1)[0])
+
+def run_benchmarks(names: list[str], scale: float = 1.0, isolate: bool = True, repeats: int = 1) -> dict:
+	"""
+		### Parameters:
+			repeats : runs of every scenario. the fastest one is kept, since anything else running on the machine only ever slows a run down
+	"""
+	results = {}
+	for name in names:
+		print("running {}".format(name), file=sys.stderr)
+		runs = [run_scenario_isolated(name, scale) if isolate else run_scenario(name, scale) for _ in range(repeats)]
+		results[name] = max(runs, key=lambda metrics: metrics.get("frames_per_second", 0))
+	return {
+		"scaling_exponent": scaling_exponent(results),
+		"engine_version": consts.ENGINE_VERSION,
+		"python": platform.python_version(),
+		"platform": platform.platform(),
+		"scale": scale,
+		"repeats": repeats,
+		"scenarios": results,
+	}
+
+# metric name -> whether a bigger value is better. metrics not listed here are reported but never fail a comparison
+GATED_METRICS = {
+	"frames_per_second": True,
+	"p50_frame_us": False,
+	"p99_frame_us": False,
+	"peak_rss_mib": False,
+}
+# allowed growth in net allocated blocks per frame before it counts as a regression. a ratio means little when the baseline is close to zero
+ALLOCATION_TOLERANCE_BLOCKS = 0.5
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+	"""
+		### Parameters:
+			threshold : allowed relative change for the worse, e.g. 0.1 for 10%
+		### Returns:
+			a description of every regression. empty if nothing regressed
+	"""
+	regressions = []
+	for (name, metrics) in results["scenarios"].items():
+		baseline_metrics = baseline["scenarios"].get(name)
+		if baseline_metrics == None:
+			continue
+		for (metric, is_higher_better) in GATED_METRICS.items():
+			value = metrics.get(metric)
+			baseline_value = baseline_metrics.get(metric)
+			if value == None or baseline_value == None or baseline_value == 0:
+				continue
+			change = (value - baseline_value) / baseline_value
+			if (is_higher_better and change < -threshold) or (not is_higher_better and change > threshold):
+				regressions.append("{} {}: {:.4g} -> {:.4g} ({:+.1%})".format(name, metric, baseline_value, value, change))
+		blocks = metrics.get("net_allocated_blocks_per_frame")
+		baseline_blocks = baseline_metrics.get("net_allocated_blocks_per_frame")
+		if blocks != None and baseline_blocks != None and blocks > baseline_blocks + ALLOCATION_TOLERANCE_BLOCKS:
+			regressions.append("{} net_allocated_blocks_per_frame: {:.4g} -> {:.4g}".format(name, baseline_blocks, blocks))
+	return regressions
+
+def main(argv: list[str]|None = None) -> int:
+	parser = argparse.ArgumentParser(description="run the headless benchmark scenarios and write the results as json")
+	parser.add_argument("--scenarios", nargs="*", default=list(SCENARIOS), choices=list(SCENARIOS))
+	parser.add_argument("--scale", type=float, default=1.0, help="multiplies every scenario's frame count")
+	parser.add_argument("--repeats", type=int, default=3, help="runs of every scenario, of which the fastest is kept")
+	parser.add_argument("--no-isolate", action="store_true", help="run every scenario in this process instead of a fresh one")
+	parser.add_argument("--out", type=str, default="-", help="file to write results to, or - for stdout")
+	parser.add_argument("--baseline", type=str, default=None, help="results of an earlier run to compare against")
+	parser.add_argument("--threshold", type=float, default=0.1, help="relative change for the worse that counts as a regression")
+	args = parser.parse_args(argv)
+
+	results = run_benchmarks(args.scenarios, args.scale, not args.no_isolate, args.repeats)
+	text = json.dumps(results, indent=1)
+	if args.out == "-":
+		print(text)
+	else:
+		with open(args.out, "w") as f:
+			f.write(text)
+
+	if args.baseline == None:
+		return 0
+	with open(args.baseline) as f:
+		baseline = json.load(f)
+	regressions = compare(results, baseline, args.threshold)
+	for regression in regressions:
+		print("regression: " + regression, file=sys.stderr)
+	return 1 if len(regressions) > 0 else 0
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,38 @@
+import unittest
+from benchmark import *
+import events
+
+class TestBenchmark(unittest.TestCase):
+
+	def test_attack_spam_uses_every_attack(self):
+		game_state = GameState()
+		reader = game_state.events.reader()
+		scenario = SCENARIOS["attack_spam"]
+		frame_count = AttackSpamScenario.SETTLE_FRAMES + len(game_state.fighters[0].attacks) * AttackSpamScenario.ATTACK_SPACING_FRAMES
+		scripts = scenario.scripts(game_state, frame_count)
+		# only the first fighter attacks, so it never gets stunned by the other fighter's attacks
+		fighter = game_state.fighters[0]
+		for bits in scripts[0]:
+			fighter.input.current_bits = bits
+			step_game(game_state)
+		recorded = reader.read()
+		activated = recorded[recorded["kind"] == events.EVENT_ATTACK_ACTIVATED]
+		self.assertEqual(activated["attack"].tolist(), list(range(len(fighter.attacks))))
+
+	def test_run_scenario(self):
+		metrics = run_scenario("idle", scale=0.01)
+		self.assertEqual(metrics["frames"], 200)
+		self.assertGreater(metrics["frames_per_second"], 0)
+		self.assertLessEqual(metrics["p50_frame_us"], metrics["p99_frame_us"])
+		self.assertLessEqual(metrics["p99_frame_us"], metrics["max_frame_us"])
+
+	def test_compare(self):
+		baseline = {"scenarios": {"idle": {"frames_per_second": 1000, "p50_frame_us": 10, "p99_frame_us": 20, "peak_rss_mib": 30, "net_allocated_blocks_per_frame": 0}}}
+		within = {"scenarios": {"idle": {"frames_per_second": 950, "p50_frame_us": 10.5, "p99_frame_us": 21, "peak_rss_mib": 30, "net_allocated_blocks_per_frame": 0.1}}}
+		self.assertEqual(compare(within, baseline, 0.1), [])
+		slower = {"scenarios": {"idle": {"frames_per_second": 800, "p50_frame_us": 10, "p99_frame_us": 30, "peak_rss_mib": 30, "net_allocated_blocks_per_frame": 2}}}
+		regressions = compare(slower, baseline, 0.1)
+		self.assertEqual(len(regressions), 3)
+
+if __name__ == '__main__':
+	unittest.main()
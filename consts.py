@@ -31,3 +31,31 @@ MOVE_DODGE_INVULN_FRAMES = 12
 DODGE_COOLDOWN_FRAMES = 70
 
 
+
+# bump whenever a change to the simulation makes a recorded match play out differently.
+# 2: capsules are a single rounded segment instead of two circles and a box
+# 3: the solver state is reset at the end of every frame
+# 4: that reset only happens with exact_restore
+ENGINE_VERSION = 4
+
+FRAMES_PER_SECOND = 60
+TIMESTEP = 1/FRAMES_PER_SECOND
+
+# most frames simulated for a single display refresh. if the game falls further behind than that, the rest of the backlog is dropped instead of being caught up on, so a slow frame can't snowball into ever slower ones
+MAX_CATCH_UP_FRAMES = 5
+
+TOTAL_MIDAIR_JUMPS_ALLOWED = 2
+
+JUMP_HEIGHT = 15
+
+# max speed a fighter can fall at
+FALL_VELOCITY = 80.0
+
+#world units
+FIGHTER_COLLIDER_WIDTH = 8
+#world units
+FIGHTER_COLLIDER_HEIGHT = 15
+
+HURTBOX_COLOR = (78, 0, 129, 255)
+HURTBOX_DODGE_COLOR = (154, 0, 255, 255)
+HITBOX_COLOR = (128, 0, 0, 255)
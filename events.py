@@ -0,0 +1,126 @@
+import numpy
+
+# structured events of what happens in a match, for replays, stats and debugging tools to consume.
+# events are written as records into a preallocated numpy ring buffer. nothing is written unless the stream is enabled, which happens as soon as anything reads from it, so the simulation only pays for a single attribute check per event site when nobody is listening.
+
+EVENT_ATTACK_ACTIVATED = 0
+EVENT_CAST_ACTIVE = 1
+EVENT_HIT = 2
+EVENT_JUMP = 3
+EVENT_DODGE = 4
+EVENT_RECOVER = 5
+
+EVENT_NAMES = ("attack_activated", "cast_active", "hit", "jump", "dodge", "recover")
+
+# what each field holds depends on the kind of event:
+#	attack_activated : fighter, attack, x = side facing
+#	cast_active : fighter, attack, power, cast
+#	hit : fighter is the victim, other the attacker, attack, power, cast, value = victim's damage points after the hit, x and y = knockback impulse
+#	jump : fighter, value = midair jumps left after the jump
+#	dodge : fighter, value = invulnerable frames
+#	recover : fighter, once its hitstun is over
+# fields that don't apply are -1 for indices and 0 for numbers
+EVENT_DTYPE = numpy.dtype([
+	("frame", numpy.uint32),
+	("kind", numpy.uint8),
+	("fighter", numpy.int16),
+	("other", numpy.int16),
+	("attack", numpy.int16),
+	("power", numpy.int8),
+	("cast", numpy.int8),
+	("value", numpy.float32),
+	("x", numpy.float32),
+	("y", numpy.float32),
+])
+
+DEFAULT_CAPACITY = 4096
+
+class EventStream():
+	def __init__(self, capacity: int = DEFAULT_CAPACITY):
+		self.records = numpy.zeros(capacity, dtype=EVENT_DTYPE)
+		self.capacity = capacity
+		# total number of events ever written. the next event goes into records[written % capacity]
+		self.written = 0
+		# checked by the simulation before building an event
+		self.is_enabled = False
+		self.readers: list["EventReader"] = []
+
+	def enable(self):
+		self.is_enabled = True
+
+	def disable(self):
+		"""
+			stops recording. does nothing while readers are attached
+		"""
+		self.is_enabled = len(self.readers) > 0
+
+	def clear(self):
+		self.written = 0
+		for reader in self.readers:
+			reader.cursor = 0
+
+	def reader(self) -> "EventReader":
+		"""
+			attaches a reader that sees every event written from now on, and enables the stream
+		"""
+		reader = EventReader(self)
+		self.readers.append(reader)
+		self.is_enabled = True
+		return reader
+
+	def detach(self, reader: "EventReader"):
+		self.readers.remove(reader)
+		self.disable()
+
+	def emit(self, frame: int, kind: int, fighter: int, other: int = -1, attack: int = -1, power: int = -1, cast: int = -1, value: float = 0, x: float = 0, y: float = 0):
+		self.records[self.written % self.capacity] = (frame, kind, fighter, other, attack, power, cast, value, x, y)
+		self.written += 1
+
+	def latest(self) -> numpy.ndarray:
+		"""
+			copy of the events still in the buffer, oldest first
+		"""
+		return self.read_since(max(self.written - self.capacity, 0))
+
+	def read_since(self, cursor: int) -> numpy.ndarray:
+		"""
+			copy of the events written at or after cursor, as counted by written. events that were already overwritten are left out
+		"""
+		cursor = max(cursor, self.written - self.capacity)
+		start = cursor % self.capacity
+		count = self.written - cursor
+		if start + count <= self.capacity:
+			return self.records[start:start+count].copy()
+		return numpy.concatenate((self.records[start:], self.records[:start + count - self.capacity]))
+
+class EventReader():
+	def __init__(self, stream: EventStream):
+		self.stream = stream
+		self.cursor = stream.written
+		# events that were overwritten before this reader got to them
+		self.missed = 0
+
+	def read(self) -> numpy.ndarray:
+		"""
+			every event written since the last read. read often enough to keep up with the ring buffer's capacity, or events get missed
+		"""
+		stream = self.stream
+		self.missed += max(stream.written - stream.capacity - self.cursor, 0)
+		events = stream.read_since(self.cursor)
+		self.cursor = stream.written
+		return events
+
+def format_event(record: numpy.void) -> str:
+	kind = int(record["kind"])
+	text = "frame {} fighter {} {}".format(int(record["frame"]), int(record["fighter"]), EVENT_NAMES[kind])
+	if kind == EVENT_ATTACK_ACTIVATED:
+		text += " attack {} facing {}".format(int(record["attack"]), int(record["x"]))
+	elif kind == EVENT_CAST_ACTIVE:
+		text += " attack {} power {} cast {}".format(int(record["attack"]), int(record["power"]), int(record["cast"]))
+	elif kind == EVENT_HIT:
+		text += " by fighter {} attack {}, now has {} damage points".format(int(record["other"]), int(record["attack"]), float(record["value"]))
+	elif kind == EVENT_JUMP:
+		text += " with {} midair jumps left".format(int(record["value"]))
+	elif kind == EVENT_DODGE:
+		text += " for {} frames".format(int(record["value"]))
+	return text
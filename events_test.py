@@ -0,0 +1,53 @@
+import unittest
+from events import *
+from game import GameState
+import input
+from test_helpers import RandomInputs
+
+class TestEvents(unittest.TestCase):
+
+	def test_ring_buffer_wraps(self):
+		stream = EventStream(capacity=4)
+		reader = stream.reader()
+		for frame in range(3):
+			stream.emit(frame, EVENT_JUMP, 0)
+		self.assertEqual(list(reader.read()["frame"]), [0, 1, 2])
+		for frame in range(3, 9):
+			stream.emit(frame, EVENT_JUMP, 0)
+		# frames 3 and 4 were overwritten before the reader got to them
+		self.assertEqual(list(reader.read()["frame"]), [5, 6, 7, 8])
+		self.assertEqual(reader.missed, 2)
+		self.assertEqual(len(reader.read()), 0)
+		self.assertEqual(list(stream.latest()["frame"]), [5, 6, 7, 8])
+
+	def test_disabled_until_read(self):
+		game_state = GameState()
+		game_state.step()
+		self.assertFalse(game_state.events.is_enabled)
+		reader = game_state.events.reader()
+		self.assertTrue(game_state.events.is_enabled)
+		game_state.events.detach(reader)
+		self.assertFalse(game_state.events.is_enabled)
+
+	def test_match_events(self):
+		game_state = GameState()
+		reader = game_state.events.reader()
+		inputs = RandomInputs(2, len(game_state.fighters))
+		recorded = []
+		for _ in range(6000):
+			game_state.step(inputs.next_inputs())
+			recorded.append(reader.read())
+		recorded = numpy.concatenate(recorded)
+		self.assertEqual(reader.missed, 0)
+
+		hits = recorded[recorded["kind"] == EVENT_HIT]
+		self.assertEqual(len(hits), sum(game_state.hits_per_attack.values()))
+		self.assertGreater(len(hits), 0)
+		for hit in hits:
+			self.assertNotEqual(hit["fighter"], hit["other"])
+		for kind in (EVENT_ATTACK_ACTIVATED, EVENT_CAST_ACTIVE, EVENT_JUMP, EVENT_DODGE):
+			self.assertGreater(numpy.count_nonzero(recorded["kind"] == kind), 0, EVENT_NAMES[kind])
+		self.assertTrue(numpy.all(numpy.diff(recorded["frame"].astype(numpy.int64)) >= 0))
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,198 @@
+import pymunk
+import utils
+from attack import *
+import attack_moves
+import input
+
+import consts
+
+def cancel_fighter_gravity_if_allowed(body: pymunk.Body, gravity: pymunk.Vec2d, damping: float, dt: float):
+	if body.is_gravity_cancelled_until_attacker_done or body.is_gravity_cancelled_due_to_attacking:
+		pymunk.Body.update_velocity(body, (0,0), damping, dt)
+	else:
+		pymunk.Body.update_velocity(body, gravity, damping, dt)
+
+class Fighter():
+	# names of the mutable values, used for taking and restoring snapshots. the body and input are snapshotted separately
+	STATE_FIELDS = (
+		"side_facing", "last_cast_id_hit", "dmg_points", "midair_jumps_left", "is_grounded", "is_touching_ground", "recover_timer", "is_hit",
+		"is_dodging", "dodge_timer", "gravity_cancel_timer", "dodge_cooldown_timer", "active_attack_idx",
+	)
+	BODY_STATE_FIELDS = ("position", "velocity", "is_gravity_cancelled_due_to_attacking", "is_gravity_cancelled_until_attacker_done")
+	__slots__ = (
+		"spawn_center", "spawn_side_facing", "input", "body", "moveset", "attacks", "hurtbox_shapes", "wall_collider", "attack_dispatch", "jump_attacks",
+		"wall_contacts", "ground_arbiter_func", "idx", "team",
+	) + STATE_FIELDS
+
+	def __init__(self, space: pymunk.Space, center: tuple[float, float], side_facing = consts.FIGHTER_SIDE_FACING_LEFT, team: int = 0):
+		"""
+			### Parameters:
+				team : fighters on the same team can't hit each other
+		"""
+		#hurtbox body is supposed to be the shape of a capsule: 2 circles and 1 rectangle
+		self.spawn_center = center
+		self.spawn_side_facing = side_facing
+		self.input = input.Input()
+		self.body = pymunk.Body(mass=5, moment=float("inf"))
+		self.body._set_position(center)
+		space.add(self.body)
+		space.damping = 0.9
+		self.attacks: list[Attack] = []
+		self.body._set_velocity_func(cancel_fighter_gravity_if_allowed)
+
+		hurtbox_filter = pymunk.ShapeFilter(
+			categories=0b1 << (consts.HURTBOX_COLLISION_TYPE-1),
+			mask=0b1 << (consts.HITBOX_COLLISION_TYPE-1))
+
+		wall_collider_filter = pymunk.ShapeFilter(
+			categories=0b1 << (consts.FIGHTER_WALL_COLLIDER_COLLISION_TYPE-1),
+			mask=0b1 << (consts.WALL_COLLISION_TYPE-1))
+
+		hurtbox_shapes = utils.add_capsule_shape(self.body, (0,0), (consts.HURTBOX_WIDTH, consts.HURTBOX_HEIGHT))
+		for shape in hurtbox_shapes:
+			shape.collision_type = consts.HURTBOX_COLLISION_TYPE
+			shape.color = consts.HURTBOX_COLOR
+			shape.filter = hurtbox_filter
+			shape.sensor = True
+			shape.fighter = self
+			space.add(shape)
+
+		self.hurtbox_shapes = hurtbox_shapes
+
+		self.wall_collider = utils.create_pymunk_box(self.body,
+			(-consts.FIGHTER_COLLIDER_WIDTH*0.5, -consts.FIGHTER_COLLIDER_HEIGHT*0.5-1),
+			(consts.FIGHTER_COLLIDER_WIDTH*0.5, consts.FIGHTER_COLLIDER_HEIGHT*0.5-1)
+		)
+		self.wall_collider.collision_type = consts.FIGHTER_WALL_COLLIDER_COLLISION_TYPE
+		self.wall_collider.filter = wall_collider_filter
+		self.wall_collider.friction = 1
+		self.wall_collider.color = (255, 233, 28, 100)
+		self.wall_collider.fighter = self
+
+		space.add(self.wall_collider)
+
+		#NOTE: add all attacks in here
+		# the moves' definitions are shared with every other fighter. only their mutable values and hitbox shapes are made per fighter
+		self.moveset = attack_moves.unarmed_moveset()
+		# hitboxes know who they belong to, the same as hurtboxes
+		self.attacks += self.moveset.make_attacks(self.body, self)
+		self.attack_dispatch = AttackDispatch(self.attacks, self.moveset.dispatch_candidates)
+		self.set_team(team)
+		# (index, attack) of every jump attack, in attack list order
+		self.jump_attacks = [(idx, attack) for (idx, attack) in enumerate(self.attacks) if attack.is_jump_attack]
+
+		# every wall shape the wall collider is touching, kept up to date by the space's begin and separate callbacks. see begin_fighter_wall in game.py.
+		# only the shapes are kept. the normals are read from the body's arbiters when they are needed, since a normal can turn while the shapes keep touching, e.g. when landing on a wall's corner
+		self.wall_contacts: set[pymunk.Shape] = set()
+		# the arbiter callback of read_ground_contact is bound once here, since binding a method allocates
+		self.ground_arbiter_func = self.check_ground_arbiter
+		# index in the game state's fighter list, which is what events refer to fighters by
+		self.idx = 0
+
+		self.reset()
+
+	def reset(self):
+		"""
+			puts the fighter back at its spawn point with idle attacks, cleared input, and no damage points
+		"""
+		self.side_facing = self.spawn_side_facing
+		self.input.clear()
+		# a position update over zero time throws away the bias velocity the last step left, without moving the body
+		pymunk.Body.update_position(self.body, 0)
+		self.body._set_position(self.spawn_center)
+		self.body._set_velocity((0,0))
+		self.body._set_force((0,0))
+		self.body.is_gravity_cancelled_due_to_attacking = False
+		self.body.is_gravity_cancelled_until_attacker_done = False
+		self.last_cast_id_hit: int = None
+		self.dmg_points = 0.0
+
+		for attack in self.attacks:
+			attack.reset()
+		# take out any hitboxes that were live when the fighter got reset
+		for shape in self.hitbox_shapes():
+			if shape.space != None:
+				shape.space.remove(shape)
+		# taking the fighter's own shapes out of the space and back drops every arbiter they were part of, so the next match starts without the last one's contacts
+		space = self.wall_collider.space
+		space.remove(self.wall_collider, *self.hurtbox_shapes)
+		space.add(self.wall_collider, *self.hurtbox_shapes)
+		self.wall_contacts.clear()
+
+		# index of the attack the fighter is doing, or -1. a fighter can only do one attack at a time
+		self.active_attack_idx = -1
+		self.midair_jumps_left = 0
+		self.is_grounded = False
+		# whether the wall collider stood on a wall after the last physics step. see read_ground_contact
+		self.is_touching_ground = False
+
+		#number of frames fighter must wait before attempting a new action (dodge, move, hit).
+		self.recover_timer = 0
+		#whether the player is currently getting hit by an action
+		self.is_hit = False
+
+		self.is_dodging = False
+		self.dodge_timer = 0
+		self.gravity_cancel_timer = 0
+		self.dodge_cooldown_timer = 0
+
+	def set_team(self, team: int):
+		"""
+			puts the fighter's hurtboxes and hitboxes in the collision group of the team. shapes in the same group never make a collision pair, so hitboxes never reach the hit callbacks for the fighter's own hurtboxes or a teammate's
+		"""
+		self.team = team
+		# group 0 means no group in chipmunk
+		group = team + 1
+		for attack in self.attacks:
+			attack.hitbox_group = group
+		for shape in self.hurtbox_shapes + self.hitbox_shapes():
+			shape.filter = pymunk.ShapeFilter(group=group, categories=shape.filter.categories, mask=shape.filter.mask)
+
+	def hitbox_shapes(self) -> list[pymunk.Shape]:
+		"""
+			every hitbox shape of every attack made so far, whether it's live or not
+		"""
+		shapes = []
+		for attack in self.attacks:
+			shapes += attack.hitbox_shapes()
+		return shapes
+
+	def check_ground_arbiter(self, arbiter: pymunk.Arbiter):
+		# the normal points from the fighter into whatever it is touching, so ground below the fighter has a negative y
+		if arbiter.normal.y < 0:
+			self.is_touching_ground = True
+
+	def read_ground_contact(self):
+		"""
+			finds out from the arbiters of the physics step that just ran whether the fighter is standing on a wall. step_world calls it after every step, and compute_grounding uses the result
+		"""
+		self.is_touching_ground = False
+		# a fighter touching no walls has no arbiters to walk. hurtboxes and hitboxes are sensors, whose arbiters are never kept on the body
+		if len(self.wall_contacts) > 0:
+			self.body.each_arbiter(self.ground_arbiter_func)
+
+	def compute_grounding(self):
+		# find out if player is standing on ground
+		self.is_grounded = self.is_touching_ground
+		if self.is_grounded:
+			self.midair_jumps_left = consts.TOTAL_MIDAIR_JUMPS_ALLOWED
+
+	def contact_details(self) -> list[dict]:
+		"""
+			the wall contacts of the last physics step, read from the body's arbiters. meant for debugging tools, the simulation only reads the normals
+
+			### Returns:
+				one dict per wall being touched, with the wall shape, the normal pointing from the fighter into it, the contact points with their penetration depths, and the total impulse of the last step
+		"""
+		details = []
+		def add_details(arbiter: pymunk.Arbiter):
+			# the body's own shape comes first
+			contact_set = arbiter.contact_point_set
+			details.append({
+				"wall": arbiter.shapes[1],
+				"normal": tuple(contact_set.normal),
+				"points": [(tuple(point.point_a), point.distance) for point in contact_set.points],
+				"impulse": tuple(arbiter.total_impulse),
+			})
+		self.body.each_arbiter(add_details)
+		return details
@@ -0,0 +1,91 @@
+import copy
+import numpy
+import pymunk
+import consts
+from fighter import Fighter
+
+# structure of arrays backend for the fighter values that step_game counts down or clamps every frame.
+# the values live in numpy arrays indexed by fighter, or by match and then fighter for a BatchGameState, and ArrayFighter's attributes are views into them, so the object api stays the same.
+# step_game leaves the end of frame bookkeeping to FighterArrays.step, which does each of the timer decrements, the fall velocity clamp and the dodge transitions as one numpy operation over every fighter.
+# that only pays off with many fighters, or many matches stepped together. a single two fighter match has nothing to gain from it.
+
+# (name, dtype) of every array. timers are 64 bit, since dodge_timer keeps counting down below zero for as long as the match goes on
+ARRAY_FIELDS = (
+	("recover_timer", numpy.int64),
+	("is_hit", bool),
+	("is_dodging", bool),
+	("dodge_timer", numpy.int64),
+	("dodge_cooldown_timer", numpy.int64),
+	# not state. the fighter loop writes the body's velocity and the attack's vertical velocity here for step to clamp, and the result is written back to the body
+	("velocity_x", numpy.float64),
+	("velocity_y", numpy.float64),
+	("attack_velocity_y", numpy.float64),
+)
+
+class FighterArrays():
+	def __init__(self, shape: tuple[int, ...]):
+		"""
+			### Parameters:
+				shape : (fighter_count,) for a single match, or (match_count, fighter_count) for matches stepped together
+		"""
+		self.shape = shape
+		for (name, dtype) in ARRAY_FIELDS:
+			setattr(self, name, numpy.zeros(shape, dtype=dtype))
+
+	def match_view(self, match_idx: int) -> "FighterArrays":
+		"""
+			### Returns:
+				arrays of a single match, sharing memory with these
+		"""
+		view = copy.copy(self)
+		view.shape = self.shape[1:]
+		for (name, _) in ARRAY_FIELDS:
+			setattr(view, name, getattr(self, name)[match_idx])
+		return view
+
+	def recovering(self) -> numpy.ndarray:
+		"""
+			### Returns:
+				mask of the fighters whose hitstun ends on this step
+		"""
+		return ~self.is_hit & (self.recover_timer == 1)
+
+	def step(self):
+		"""
+			the end of frame bookkeeping of every fighter, the same as step_game does per fighter with the scalar values
+		"""
+		numpy.maximum(self.velocity_y, -consts.FALL_VELOCITY, out=self.velocity_y)
+		self.velocity_y += self.attack_velocity_y
+
+		self.recover_timer -= ~self.is_hit & (self.recover_timer > 0)
+		self.is_hit.fill(False)
+
+		numpy.greater(self.dodge_timer, 0, out=self.is_dodging)
+		self.dodge_cooldown_timer -= ~self.is_dodging & (self.dodge_cooldown_timer > 0)
+		numpy.minimum(self.dodge_timer - 1, 0, out=self.dodge_timer)
+
+def array_view(name: str) -> property:
+	def get(fighter: "ArrayFighter"):
+		# item() hands back a python value without making a numpy scalar first
+		return getattr(fighter.arrays, name).item(fighter.array_idx)
+	def set(fighter: "ArrayFighter", value):
+		getattr(fighter.arrays, name)[fighter.array_idx] = value
+	return property(get, set)
+
+class ArrayFighter(Fighter):
+	__slots__ = ("arrays", "array_idx")
+
+	recover_timer = array_view("recover_timer")
+	is_hit = array_view("is_hit")
+	is_dodging = array_view("is_dodging")
+	dodge_timer = array_view("dodge_timer")
+	dodge_cooldown_timer = array_view("dodge_cooldown_timer")
+
+	def __init__(self, arrays: FighterArrays, array_idx: int, space: pymunk.Space, center: tuple[float, float], side_facing = consts.FIGHTER_SIDE_FACING_LEFT, team: int = 0):
+		"""
+			a fighter whose per frame values are kept in arrays, at array_idx
+		"""
+		# the constructor resets the fighter, which already writes to the arrays
+		self.arrays = arrays
+		self.array_idx = array_idx
+		super().__init__(space, center, side_facing, team)
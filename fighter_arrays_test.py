@@ -0,0 +1,73 @@
+import unittest
+import numpy
+from fighter_arrays import *
+from game import GameState, HIT_DETECTION_SOLVER, HIT_DETECTION_QUERY
+from batch import BatchGameState
+from snapshot import Snapshotter
+from test_helpers import RandomInputs, fighter_states
+
+class TestFighterArrays(unittest.TestCase):
+
+	def test_same_as_scalar_values(self):
+		for hit_detection in (HIT_DETECTION_SOLVER, HIT_DETECTION_QUERY):
+			with self.subTest(hit_detection=hit_detection):
+				scalar = GameState(hit_detection, fighter_count=4)
+				arrays = GameState(hit_detection, fighter_count=4, fighter_arrays=FighterArrays((4,)))
+				scalar.events.enable()
+				arrays.events.enable()
+				inputs = RandomInputs(4, len(scalar.fighters), 0.06)
+				for _ in range(1500):
+					frame_inputs = inputs.next_inputs()
+					scalar.step(frame_inputs)
+					arrays.step(frame_inputs)
+					self.assertEqual(fighter_states(arrays), fighter_states(scalar))
+				# recover events come out after the others of the same frame, so only the set of events is the same
+				written = scalar.events.written
+				self.assertEqual(arrays.events.written, written)
+				self.assertEqual(sorted(arrays.events.records[:written].tolist()), sorted(scalar.events.records[:written].tolist()))
+
+	def test_fighters_are_views(self):
+		fighter_arrays = FighterArrays((2,))
+		game_state = GameState(fighter_arrays=fighter_arrays)
+		fighter = game_state.fighters[1]
+		fighter.recover_timer = 7
+		self.assertEqual(fighter_arrays.recover_timer.tolist(), [0, 7])
+		fighter_arrays.dodge_timer[1] = 3
+		self.assertEqual(fighter.dodge_timer, 3)
+		self.assertIs(type(fighter.dodge_timer), int)
+		with self.assertRaises(ValueError):
+			GameState(fighter_count=3, fighter_arrays=fighter_arrays)
+
+	def test_snapshot_restore(self):
+		game_state = GameState(fighter_arrays=FighterArrays((2,)))
+		snapshotter = Snapshotter(game_state)
+		inputs = RandomInputs(1, len(game_state.fighters), 0.06)
+		for _ in range(200):
+			game_state.step(inputs.next_inputs())
+		frames_inputs = inputs.frames(300)
+		snapshot = snapshotter.take()
+		runs = []
+		for _ in range(2):
+			snapshotter.restore(snapshot)
+			run = []
+			for frame_inputs in frames_inputs:
+				game_state.step(frame_inputs)
+				run.append(fighter_states(game_state))
+			runs.append(run)
+		self.assertEqual(runs[0], runs[1])
+
+	def test_batch(self):
+		match_count = 3
+		scalar = BatchGameState(match_count, fighter_count=3)
+		arrays = BatchGameState(match_count, fighter_count=3, use_fighter_arrays=True)
+		self.assertEqual(arrays.fighter_arrays.shape, (match_count, 3))
+		rng = numpy.random.default_rng(2)
+		for _ in range(300):
+			inputs = rng.random((match_count, 3, 8)) < 0.1
+			scalar_observations = scalar.step(inputs)
+			arrays_observations = arrays.step(inputs)
+			for (name, values) in scalar_observations.items():
+				self.assertEqual(arrays_observations[name].tolist(), values.tolist(), name)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,452 @@
+import math
+import time
+import pymunk
+import utils
+from attack import *
+from fighter import Fighter
+from fighter_arrays import FighterArrays, ArrayFighter
+import input
+import events
+import profiler
+import hits
+
+import consts
+
+# pure simulation of a match. nothing in here should depend on pyglet or any other windowing/rendering library, so matches can be run on headless machines.
+
+wall_collision_filter = pymunk.ShapeFilter( \
+	categories=0b1 << (consts.WALL_COLLISION_TYPE-1), \
+	mask=0b1 << (consts.FIGHTER_WALL_COLLIDER_COLLISION_TYPE-1))
+
+GRAVITY = (0,-300)
+
+# name of the only stage there is so far, which is built in GameState.__init__
+STAGE_NAME = "walls"
+
+# fighters in a match when nothing else is asked for
+DEFAULT_FIGHTER_COUNT = 2
+# spawn points are laid out in columns across the stage floor. the first two are where the two fighters of a regular match have always spawned
+SPAWN_COLUMNS_X = (30, 70, 110, 50, 90)
+SPAWN_HEIGHT = 100
+# fighters don't collide with each other, so more fighters than columns are stacked above each other rather than squeezed in, to keep them apart while they fall
+SPAWN_ROW_HEIGHT = 20
+
+# ways of finding out which hitboxes overlap which hurtboxes
+# hitboxes are added to the space, and the solver calls pre_solve_hurtbox_hitbox on every overlap
+HIT_DETECTION_SOLVER = "solver"
+# hitboxes stay out of the space, and are queried against the hurtboxes after the physics step. see hits.py
+HIT_DETECTION_QUERY = "query"
+
+# function callback to used when a fighter hurtbox overlaps with hitbox. do stuff like knocking back fighter and applying damage points
+def pre_solve_hurtbox_hitbox(arbiter: pymunk.Arbiter, space: pymunk.Space, data) -> bool:
+	game_state: GameState = data["game_state"]
+	frame_profiler = game_state.profiler
+	start_ns = time.perf_counter_ns() if frame_profiler.is_enabled else 0
+	apply_hit(game_state, arbiter.shapes[0], arbiter.shapes[1])
+	if frame_profiler.is_enabled:
+		frame_profiler.add_collision(start_ns)
+	return True
+
+def apply_hit(game_state: "GameState", hurtbox: pymunk.Shape, hitbox: pymunk.Shape):
+	"""
+		applies damage and knockback to the fighter owning hurtbox, unless it was already hit this frame or the hitbox's power already landed
+	"""
+	victim: Fighter = hurtbox.fighter
+	victim_body: pymunk.Body = hurtbox.body
+	attacker_body: pymunk.Body = hitbox.body
+	game_state.hit_callbacks += 1
+	if victim.team == hitbox.fighter.team:
+		game_state.friendly_hit_callbacks += 1
+	if victim.is_hit == False:
+		victim.is_hit = True
+		# the cast and power are the shared definitions, the attack is the attacker's own
+		cast: Cast = hitbox.cast
+		power: Power = hitbox.power
+		attack: Attack = hitbox.attack
+		attack.has_hit = True
+		victim.recover_timer = power.stun_frames
+		# a hitbox can only be live during its own power, so the attack's current power is the hitbox's
+		if not attack.has_power_hit:
+			attack.has_power_hit = True
+			victim.dmg_points += cast.base_dmg
+			if cast.is_using_charged_dmg:
+				victim.dmg_points += attack.charged_dmg
+				attack.charged_dmg = 0
+			hits_per_attack = game_state.hits_per_attack
+			hits_per_attack[attack.name] = hits_per_attack.get(attack.name, 0) + 1
+
+			attacker_applied_velocity = cast.self_velocity_on_hit
+			if cast.should_cancel_victim_velocity_on_hit_until_next_hit_in_attack:
+				victim_body.is_gravity_cancelled_until_attacker_done = True
+				attack.is_victim_velocity_cancelled_until_next_hit = True
+				impulse = (-victim_body.mass * victim_body.velocity[0], -victim_body.mass * victim_body.velocity[1])
+				victim_body.apply_impulse_at_local_point(impulse)
+			elif attack.is_victim_velocity_cancelled_until_next_hit:
+				victim_body.is_gravity_cancelled_until_attacker_done = False
+				attack.is_victim_velocity_cancelled_until_next_hit = False
+
+			if attacker_applied_velocity != None:
+				attacker_body.is_gravity_cancelled_due_to_attacking = True
+				if attack.side_facing == consts.FIGHTER_SIDE_FACING_LEFT:
+					attacker_applied_velocity = -attacker_applied_velocity[0], attacker_applied_velocity[1]
+				applied_vel_y = attacker_applied_velocity[1] - attacker_body.velocity.y
+				impulse = (attacker_body.mass * attacker_applied_velocity[0], attacker_body.mass * applied_vel_y)
+				attacker_body.apply_impulse_at_local_point(impulse)
+
+			knockback_dir = cast.knockback_dir
+			if hitbox.side_facing == consts.FIGHTER_SIDE_FACING_LEFT:
+				knockback_dir = -knockback_dir[0], knockback_dir[1]
+			fixed_impulse_scale = 5
+			var_impulse_scale = 0.1
+			knockback_scale = (fixed_impulse_scale * cast.fixed_force + victim.dmg_points * cast.var_force * var_impulse_scale)
+			impulse = knockback_scale*knockback_dir[0], knockback_scale*knockback_dir[1]
+			victim.body.apply_impulse_at_local_point(impulse)
+			if game_state.events.is_enabled:
+				attacker: Fighter = hitbox.fighter
+				game_state.events.emit(game_state.frame, events.EVENT_HIT, victim.idx, attacker.idx, attack.idx, attack.power_idx, attack.cast_idx, victim.dmg_points, impulse[0], impulse[1])
+
+# a fighter's wall collider started touching a wall. pymunk only promises the arbiter is valid inside the callback, so just the wall is kept
+def begin_fighter_wall(arbiter: pymunk.Arbiter, space: pymunk.Space, data) -> bool:
+	(wall_collider, wall) = arbiter.shapes
+	wall_collider.fighter.wall_contacts.add(wall)
+	return True
+
+# also called when either shape leaves the space while touching, such as when Fighter.reset re-adds the fighter's shapes
+def separate_fighter_wall(arbiter: pymunk.Arbiter, space: pymunk.Space, data):
+	(wall_collider, wall) = arbiter.shapes
+	wall_collider.fighter.wall_contacts.discard(wall)
+
+def spawn_centers(fighter_count: int) -> list[tuple[float, float]]:
+	column_count = len(SPAWN_COLUMNS_X)
+	return [(SPAWN_COLUMNS_X[idx % column_count], SPAWN_HEIGHT + SPAWN_ROW_HEIGHT * (idx // column_count)) for idx in range(fighter_count)]
+
+def parse_teams(text: str) -> list[int]:
+	"""
+		### Parameters:
+			text : comma separated team of every fighter, e.g. "0,0,1,1"
+	"""
+	try:
+		return [int(team) for team in text.split(",")]
+	except ValueError:
+		raise ValueError("expected comma separated team numbers, got {}".format(text))
+
+class GameState():
+	def __init__(self, hit_detection: str = HIT_DETECTION_SOLVER, teams: list[int]|None = None, fighter_count: int|None = None, fighter_arrays: FighterArrays|None = None, exact_restore: bool = False):
+		"""
+			### Parameters:
+				hit_detection : HIT_DETECTION_SOLVER or HIT_DETECTION_QUERY. matches play out slightly differently in each, so it's part of what a replay records
+				teams : team of every fighter. by default every fighter is on a team of its own
+				fighter_count : fighters in the match. defaults to the number of teams given, or DEFAULT_FIGHTER_COUNT
+				fighter_arrays : arrays of shape (fighter_count,) to keep the fighters' per frame values in, see fighter_arrays.py. matches play out the same either way
+				exact_restore : end every frame without solver state that snapshots can't capture, so a restored snapshot goes on exactly like the match it was taken from. it costs time on every frame and changes how matches play out, so it's only for rollback sessions, see snapshot.py
+		"""
+		self.exact_restore = exact_restore
+		self.physics_sim = pymunk.Space()
+		self.hit_detection = hit_detection
+		# where step_attack adds and removes hitbox shapes: the space itself, or the hit query
+		self.hit_query: hits.HitQuery|None = None
+		self.hitbox_space: pymunk.Space|hits.HitQuery = self.physics_sim
+		if hit_detection == HIT_DETECTION_QUERY:
+			self.hit_query = hits.HitQuery()
+			self.hitbox_space = self.hit_query
+		elif hit_detection != HIT_DETECTION_SOLVER:
+			raise ValueError("unknown hit detection {}".format(hit_detection))
+		if fighter_count == None:
+			fighter_count = len(teams) if teams != None else DEFAULT_FIGHTER_COUNT
+		if fighter_count < 1:
+			raise ValueError("a match needs at least one fighter, got {}".format(fighter_count))
+		if teams == None:
+			teams = list(range(fighter_count))
+		if len(teams) != fighter_count:
+			raise ValueError("expected a team for each of the {} fighters, got {}".format(fighter_count, len(teams)))
+		self.fighter_arrays = fighter_arrays
+		if fighter_arrays == None:
+			self.fighters = [Fighter(self.physics_sim, center, team=team) for (center, team) in zip(spawn_centers(fighter_count), teams)]
+		else:
+			if fighter_arrays.shape != (fighter_count,):
+				raise ValueError("expected fighter arrays of shape {}, got {}".format((fighter_count,), fighter_arrays.shape))
+			self.fighters = [ArrayFighter(fighter_arrays, idx, self.physics_sim, center, team=team) for (idx, (center, team)) in enumerate(zip(spawn_centers(fighter_count), teams))]
+		for (idx, fighter) in enumerate(self.fighters):
+			fighter.idx = idx
+		# what happened during the match. only recorded while something reads from it
+		self.events = events.EventStream()
+		# per phase timing of step_game, off until enabled
+		self.profiler = profiler.FrameProfiler()
+
+		wall_body = pymunk.Body(body_type=pymunk.Body.STATIC)
+		p1 = utils.create_pymunk_box(wall_body, (10, 10), (140,30))
+		p1.collision_type = consts.WALL_COLLISION_TYPE
+		p1.filter = wall_collision_filter
+		p1.friction = 1
+		p2 = utils.create_pymunk_box(wall_body, (10, 10), (20,100))
+		p2.collision_type = consts.WALL_COLLISION_TYPE
+		p2.filter = wall_collision_filter
+		#p2.friction = 1
+		p3 = utils.create_pymunk_box(wall_body, (130, 30), (140,100))
+		p3.collision_type = consts.WALL_COLLISION_TYPE
+		p3.filter = wall_collision_filter
+		#p3.friction = 1
+		self.physics_sim.add(wall_body, p1, p2, p3)
+
+		hurtbox_hitbox_handler = self.physics_sim.add_collision_handler(consts.HURTBOX_COLLISION_TYPE, consts.HITBOX_COLLISION_TYPE)
+		hurtbox_hitbox_handler.pre_solve = pre_solve_hurtbox_hitbox
+		hurtbox_hitbox_handler.data["game_state"] = self
+
+		fighter_wall_handler = self.physics_sim.add_collision_handler(consts.FIGHTER_WALL_COLLIDER_COLLISION_TYPE, consts.WALL_COLLISION_TYPE)
+		fighter_wall_handler.begin = begin_fighter_wall
+		fighter_wall_handler.separate = separate_fighter_wall
+
+		self.reset()
+
+	def reset(self):
+		"""
+			puts the match back to how it was right after construction, without rebuilding the space or the fighters
+		"""
+		self.physics_sim._set_gravity(GRAVITY)
+		for fighter in self.fighters:
+			fighter.reset()
+		if self.hit_query != None:
+			self.hit_query.clear()
+		self.gravity_enabled = True
+		# number of frames simulated so far
+		self.frame = 0
+		# number of landed hits in this match, keyed by attack name
+		self.hits_per_attack: dict[str, int] = {}
+		# number of hurtbox/hitbox overlaps that reached apply_hit, whether they landed or not. a hitbox overlapping for several frames counts every frame
+		self.hit_callbacks = 0
+		# the ones where both fighters were on the same team. collision groups should keep this at zero
+		self.friendly_hit_callbacks = 0
+		self.events.clear()
+
+	def is_hitbox_live(self, shape: pymunk.Shape) -> bool:
+		if self.hit_query != None:
+			return shape in self.hit_query
+		return shape.space != None
+
+	def step(self, inputs: list[list[bool]]|None = None):
+		"""
+			advances the simulation by one frame.
+
+			### Parameters:
+				inputs : one entry per fighter, in the same layout as input.Input.current. if None, the fighters' current inputs are left as they are
+		"""
+		if inputs != None:
+			for fighter, fighter_input in zip(self.fighters, inputs):
+				fighter.input.current[:] = fighter_input
+		step_game(self)
+
+def step_attack_with_events(game_state: GameState, fighter: Fighter, attack: Attack) -> StepAttackResults:
+	"""
+		step_attack, plus a cast_active event when a cast's hitboxes come out. only used while events are recorded, so the usual path doesn't pay for the bookkeeping
+	"""
+	power_idx = attack.power_idx
+	cast_idx = attack.cast_idx
+	was_cast_active = attack.is_cast_active
+	results = step_attack(attack, game_state.hitbox_space, fighter.input, fighter.is_grounded)
+	if results.is_active and attack.is_cast_active:
+		if attack.power_idx != power_idx or attack.cast_idx != cast_idx or not was_cast_active:
+			game_state.events.emit(game_state.frame, events.EVENT_CAST_ACTIVE, fighter.idx, attack=fighter.active_attack_idx, power=attack.power_idx, cast=attack.cast_idx)
+	return results
+
+def step_game(game_state: GameState):
+	step_fighters(game_state)
+	fighter_arrays = game_state.fighter_arrays
+	if fighter_arrays != None:
+		begin_fighter_arrays_step(game_state)
+		fighter_arrays.step()
+		end_fighter_arrays_step(game_state)
+	step_world(game_state)
+
+def step_fighters(game_state: GameState):
+	"""
+		the first part of step_game: every fighter acting on its input. with fighter arrays, the end of frame bookkeeping is left to FighterArrays.step
+	"""
+	event_stream = game_state.events
+	frame_profiler = game_state.profiler
+	is_profiling = frame_profiler.is_enabled
+	if is_profiling:
+		frame_profiler.begin_frame(game_state.frame)
+	fighter_arrays = game_state.fighter_arrays
+	for fighter in game_state.fighters:
+		if is_profiling:
+			frame_profiler.begin_fighter(fighter.idx)
+		dx = 0
+		# nothing before the end of frame bookkeeping changes the recover timer, so it's read once
+		is_recovered = fighter.recover_timer == 0
+
+		# fighters in hitstun don't step their attacks, but the results are still read further down
+		attack_results = INACTIVE_STEP_RESULTS
+		is_doing_action = False
+		if is_recovered:
+			if fighter.active_attack_idx >= 0:
+				active_attack = fighter.attacks[fighter.active_attack_idx]
+				if event_stream.is_enabled:
+					attack_results = step_attack_with_events(game_state, fighter, active_attack)
+				else:
+					attack_results = step_attack(active_attack, game_state.hitbox_space, fighter.input, fighter.is_grounded)
+				if attack_results.is_active:
+					is_doing_action = True
+				else:
+					fighter.active_attack_idx = -1
+					active_attack.cooldown_end_frame = game_state.frame + 1 + active_attack.cooldown_timer
+			# idle attacks used to be stepped too, up to the active attack, only to refresh their jump attack use while grounded. only jump attacks ever read it
+			if fighter.is_grounded:
+				for (attack_idx, attack) in fighter.jump_attacks:
+					if fighter.active_attack_idx >= 0 and attack_idx > fighter.active_attack_idx:
+						break
+					attack.has_jump_attack_use = True
+		if is_profiling:
+			frame_profiler.lap(profiler.PHASE_ATTACKS)
+
+		# on input, move fighter to right
+		if is_doing_action == False and is_recovered and (fighter.side_facing != consts.FIGHTER_SIDE_FACING_LEFT or fighter.input.is_pressed(input.INPUT_MOVE_LEFT) == False) and fighter.input.is_pressed(input.INPUT_MOVE_RIGHT):
+			fighter.side_facing = consts.FIGHTER_SIDE_FACING_RIGHT
+			dx = 50
+
+		#on input, move fighter to the left
+		if is_doing_action == False and is_recovered and (fighter.side_facing != consts.FIGHTER_SIDE_FACING_RIGHT or fighter.input.is_pressed(input.INPUT_MOVE_RIGHT) == False) and fighter.input.is_pressed(input.INPUT_MOVE_LEFT):
+			fighter.side_facing = consts.FIGHTER_SIDE_FACING_LEFT
+			dx = -50
+
+		if is_profiling:
+			frame_profiler.lap(profiler.PHASE_MOVEMENT)
+		fighter.compute_grounding()
+		if is_profiling:
+			frame_profiler.lap(profiler.PHASE_GROUNDING)
+		if (fighter.input.is_tapped(input.INPUT_JUMP) and
+			(fighter.is_grounded or fighter.midair_jumps_left > 0)
+			):
+			#only subtract midair jumps if fighter is not grounded
+			fighter.midair_jumps_left -= int(not fighter.is_grounded)
+			if event_stream.is_enabled:
+				event_stream.emit(game_state.frame, events.EVENT_JUMP, fighter.idx, value=fighter.midair_jumps_left)
+			vel = fighter.body.velocity
+			fighter.body.velocity = (vel.x, 0)
+			jump_v = math.sqrt(2.0 * consts.JUMP_HEIGHT * abs(game_state.physics_sim.gravity.y))
+			y_force = fighter.body.mass * jump_v
+			fighter.body.apply_impulse_at_local_point((0, y_force))
+			is_doing_action = True
+
+		if is_recovered and is_doing_action == False:
+			attack = fighter.attack_dispatch.find_triggered(fighter.input, fighter.is_grounded, fighter.midair_jumps_left)
+			if attack != None:
+				if attack.is_jump_attack and not attack.has_jump_attack_use:
+					fighter.midair_jumps_left = fighter.midair_jumps_left - 1
+
+				attack.activate(fighter.side_facing)
+				fighter.active_attack_idx = attack.idx
+				if event_stream.is_enabled:
+					event_stream.emit(game_state.frame, events.EVENT_ATTACK_ACTIVATED, fighter.idx, attack=fighter.active_attack_idx, x=fighter.side_facing)
+				is_doing_action=True
+		if is_profiling:
+			frame_profiler.lap(profiler.PHASE_TRIGGERS)
+
+		attack_velocity = (0,0)
+		if is_doing_action and attack_results.is_active and attack_results.velocity != None:
+			attack_velocity = attack_results.velocity
+			if fighter.side_facing == consts.FIGHTER_SIDE_FACING_LEFT:
+				attack_velocity = -attack_velocity[0], attack_velocity[1]
+
+		if is_doing_action or is_recovered:
+			fighter.body.velocity = dx + attack_velocity[0], fighter.body._get_velocity().y
+
+		if fighter.dodge_cooldown_timer == 0 and is_doing_action == False and fighter.input.is_tapped(input.INPUT_DODGE):
+			fighter.is_dodging = True
+			fighter.dodge_cooldown_timer = consts.DODGE_COOLDOWN_FRAMES
+			any_moves_pressed = fighter.input.is_one_pressed(input.MOVE_ANY_MASK)
+			are_left_right_pressed = fighter.input.is_one_pressed(input.MOVE_LEFT_RIGHT_MASK)
+			if fighter.is_grounded:
+				if are_left_right_pressed:
+					fighter.dodge_timer = consts.MOVE_DODGE_INVULN_FRAMES
+				else:
+					fighter.dodge_timer = consts.NEUTRAL_DODGE_INVULN_FRAMES
+			else:
+				if any_moves_pressed:
+					fighter.dodge_timer = consts.MOVE_DODGE_INVULN_FRAMES
+				else:
+					fighter.dodge_timer = consts.AIR_NEUTRAL_DODGE_INVULN_FRAMES
+					fighter.gravity_cancel_timer = consts.GRAVITY_CANCEL_WINDOW_FRAMES
+			if event_stream.is_enabled:
+				event_stream.emit(game_state.frame, events.EVENT_DODGE, fighter.idx, value=fighter.dodge_timer)
+
+		is_doing_action = fighter.is_dodging
+
+		if fighter_arrays != None:
+			(vx, vy) = fighter.body._get_velocity()
+			fighter_arrays.velocity_x[fighter.array_idx] = vx
+			fighter_arrays.velocity_y[fighter.array_idx] = vy
+			fighter_arrays.attack_velocity_y[fighter.array_idx] = attack_velocity[1]
+		else:
+			fighter.body.velocity = fighter.body._get_velocity().x, max(fighter.body._get_velocity().y, -consts.FALL_VELOCITY) + attack_velocity[1]
+
+			if fighter.is_hit == False:
+				if fighter.recover_timer == 1 and event_stream.is_enabled:
+					event_stream.emit(game_state.frame, events.EVENT_RECOVER, fighter.idx)
+				fighter.recover_timer = max(fighter.recover_timer-1, 0)
+			fighter.is_hit = False
+
+			fighter.is_dodging = fighter.dodge_timer > 0
+			if fighter.is_dodging == False:
+				fighter.dodge_cooldown_timer = max(fighter.dodge_cooldown_timer-1, 0)
+			fighter.dodge_timer = min(fighter.dodge_timer - 1, 0)
+
+		fighter.body.is_gravity_cancelled_due_to_attacking = fighter.body.is_gravity_cancelled_due_to_attacking and attack_results.is_active
+		#current input should be copied into previous input AFTER all logic needing input has been processed
+		fighter.input.copy_current_to_previous()
+		if is_profiling:
+			frame_profiler.lap(profiler.PHASE_MOVEMENT)
+
+def begin_fighter_arrays_step(game_state: GameState):
+	if game_state.profiler.is_enabled:
+		game_state.profiler.begin_fighter(-1)
+	# with the scalar values these come out in between the other events of every fighter. here they come after all of them
+	if game_state.events.is_enabled:
+		for fighter_idx in game_state.fighter_arrays.recovering().nonzero()[0].tolist():
+			game_state.events.emit(game_state.frame, events.EVENT_RECOVER, fighter_idx)
+
+def end_fighter_arrays_step(game_state: GameState):
+	fighter_arrays = game_state.fighter_arrays
+	for (fighter, vx, vy) in zip(game_state.fighters, fighter_arrays.velocity_x.tolist(), fighter_arrays.velocity_y.tolist()):
+		fighter.body.velocity = vx, vy
+	if game_state.profiler.is_enabled:
+		game_state.profiler.lap(profiler.PHASE_MOVEMENT)
+
+def step_world(game_state: GameState):
+	"""
+		the last part of step_game: the physics step and hit resolution
+	"""
+	frame_profiler = game_state.profiler
+	is_profiling = frame_profiler.is_enabled
+	if is_profiling:
+		frame_profiler.begin_fighter(-1)
+	game_state.physics_sim.step(consts.TIMESTEP)
+	if is_profiling:
+		frame_profiler.lap(profiler.PHASE_PHYSICS)
+	# read while the step's arbiters are still around
+	for fighter in game_state.fighters:
+		fighter.read_ground_contact()
+	if is_profiling:
+		frame_profiler.lap(profiler.PHASE_GROUNDING)
+	if game_state.exact_restore:
+		# a body leaves the step with a bias velocity from pushing its wall contacts apart, and its collider's arbiters keep their contact impulses to warm start the next step with.
+		# snapshots can't read either, so the bias gets folded into the position and the arbiters are dropped by re-adding the collider. that leaves nothing between frames that a snapshot would miss.
+		# only fighters with wall contacts have any
+		space = game_state.physics_sim
+		for fighter in game_state.fighters:
+			if len(fighter.wall_contacts) > 0:
+				body = fighter.body
+				velocity = body.velocity
+				body.velocity = (0, 0)
+				pymunk.Body.update_position(body, consts.TIMESTEP)
+				body.velocity = velocity
+				space.remove(fighter.wall_collider)
+				space.add(fighter.wall_collider)
+	if game_state.hit_query != None:
+		# hits are applied in the order find_hits sorts them in, after every body has moved
+		for (hurtbox, hitbox) in game_state.hit_query.find_hits(game_state.physics_sim):
+			apply_hit(game_state, hurtbox, hitbox)
+		if is_profiling:
+			frame_profiler.lap(profiler.PHASE_COLLISIONS)
+	if is_profiling:
+		frame_profiler.end_frame()
+	game_state.frame += 1
@@ -0,0 +1,70 @@
+import consts
+from game import GameState, step_game
+
+# the fixed timestep loop between the display and the simulation.
+# the display calls advance() with however much real time passed since its last refresh. that time goes into an accumulator, and the simulation is stepped once for every whole TIMESTEP in it, so the simulation speed no longer depends on when ticks land.
+# what's left in the accumulator is how far real time is into the next frame, which is used to draw fighters between their last two simulated positions.
+
+class GameLoop():
+	def __init__(self, game_state: GameState, timestep: float = consts.TIMESTEP, max_catch_up_frames: int = consts.MAX_CATCH_UP_FRAMES):
+		"""
+			### Parameters:
+				max_catch_up_frames : most frames simulated in a single call to advance. time beyond that is dropped
+		"""
+		self.game_state = game_state
+		self.timestep = timestep
+		self.max_catch_up_frames = max_catch_up_frames
+		self.accumulator = 0.0
+		# real time that was thrown away because the simulation fell too far behind
+		self.dropped_seconds = 0.0
+		self.prev_positions = self.fighter_positions()
+
+	def fighter_positions(self) -> list[tuple[float, float]]:
+		return [tuple(fighter.body.position) for fighter in self.game_state.fighters]
+
+	def reset(self):
+		"""
+			call after the game state was reset or restored, so fighters aren't drawn sliding over from where they were
+		"""
+		self.accumulator = 0.0
+		self.prev_positions = self.fighter_positions()
+
+	def advance(self, dt: float) -> int:
+		"""
+			### Parameters:
+				dt : real seconds since the last call
+			### Returns:
+				the number of frames simulated, which can be zero
+		"""
+		self.accumulator += dt
+		frames = 0
+		while self.accumulator >= self.timestep:
+			if frames == self.max_catch_up_frames:
+				# keep the fraction into the next frame, so interpolation stays smooth, and drop the whole frames
+				dropped = self.accumulator - self.accumulator % self.timestep
+				self.dropped_seconds += dropped
+				self.accumulator -= dropped
+				break
+			self.prev_positions = self.fighter_positions()
+			step_game(self.game_state)
+			self.accumulator -= self.timestep
+			frames += 1
+		return frames
+
+	@property
+	def alpha(self) -> float:
+		"""
+			how far real time is between the last simulated frame and the next one, from 0 to 1
+		"""
+		return self.accumulator / self.timestep
+
+	def interpolated_positions(self) -> list[tuple[float, float]]:
+		"""
+			fighter positions to draw, blended between the previous and the latest simulated frame by alpha
+		"""
+		alpha = self.alpha
+		positions = []
+		for (prev, fighter) in zip(self.prev_positions, self.game_state.fighters):
+			current = fighter.body.position
+			positions.append((prev[0] + (current.x - prev[0]) * alpha, prev[1] + (current.y - prev[1]) * alpha))
+		return positions
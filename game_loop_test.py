@@ -0,0 +1,46 @@
+import unittest
+from game_loop import *
+
+class TestGameLoop(unittest.TestCase):
+
+	def test_steps_fixed_frames_regardless_of_refresh_rate(self):
+		for refresh_rate in (30, 60, 144, 240):
+			with self.subTest(refresh_rate=refresh_rate):
+				game_loop = GameLoop(GameState())
+				frames = 0
+				for _ in range(refresh_rate * 2):
+					frames += game_loop.advance(1/refresh_rate)
+				# two seconds of refreshes, give or take a frame of rounding left in the accumulator
+				self.assertIn(frames, (119, 120))
+				self.assertEqual(game_loop.game_state.frame, frames)
+				self.assertGreaterEqual(game_loop.alpha, 0)
+				self.assertLess(game_loop.alpha, 1)
+
+	def test_caps_catch_up(self):
+		game_loop = GameLoop(GameState(), max_catch_up_frames=4)
+		frames = game_loop.advance(10.5 * consts.TIMESTEP)
+		self.assertEqual(frames, 4)
+		self.assertAlmostEqual(game_loop.alpha, 0.5)
+		self.assertAlmostEqual(game_loop.dropped_seconds, 6 * consts.TIMESTEP)
+		# nothing was left behind to catch up on
+		self.assertEqual(game_loop.advance(0), 0)
+
+	def test_interpolates_between_frames(self):
+		game_state = GameState()
+		game_loop = GameLoop(game_state)
+		# fighters are falling, so they move every frame
+		game_loop.advance(3.25 * consts.TIMESTEP)
+		prev = game_loop.prev_positions
+		positions = game_loop.interpolated_positions()
+		for (fighter, prev_position, position) in zip(game_state.fighters, prev, positions):
+			self.assertNotEqual(prev_position, tuple(fighter.body.position))
+			for axis in range(2):
+				expected = prev_position[axis] + 0.25 * (fighter.body.position[axis] - prev_position[axis])
+				self.assertAlmostEqual(position[axis], expected)
+
+		game_state.reset()
+		game_loop.reset()
+		self.assertEqual(game_loop.interpolated_positions(), [tuple(fighter.body.position) for fighter in game_state.fighters])
+
+if __name__ == '__main__':
+	unittest.main()
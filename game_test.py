@@ -0,0 +1,163 @@
+import unittest
+import subprocess
+import sys
+import os
+import tracemalloc
+from game import *
+import input
+from test_helpers import RandomInputs, play_random_match
+
+class TestGame(unittest.TestCase):
+
+	def test_import_is_headless(self):
+		# run in a fresh interpreter, since other tests in the same process might have imported pyglet already
+		code = "import sys, game; game.GameState().step(); sys.exit(int('pyglet' in sys.modules))"
+		result = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)))
+		self.assertEqual(result.returncode, 0, "importing and stepping the game should not import pyglet")
+
+	def test_fighters_land_on_ground(self):
+		game_state = GameState()
+		for _ in range(120):
+			game_state.step()
+		self.assertEqual(game_state.frame, 120)
+		for fighter in game_state.fighters:
+			self.assertTrue(fighter.is_grounded)
+			self.assertEqual(fighter.midair_jumps_left, consts.TOTAL_MIDAIR_JUMPS_ALLOWED)
+
+	def test_many_fighters(self):
+		for hit_detection in (HIT_DETECTION_SOLVER, HIT_DETECTION_QUERY):
+			with self.subTest(hit_detection=hit_detection):
+				game_state = GameState(hit_detection, teams=[0, 1, 2, 3, 0, 1, 2, 3])
+				self.assertEqual([fighter.idx for fighter in game_state.fighters], list(range(8)))
+				self.assertEqual(len(set(fighter.spawn_center for fighter in game_state.fighters)), 8)
+				play_random_match(game_state, seed=3, frame_count=1200)
+				self.assertGreater(sum(game_state.hits_per_attack.values()), 0)
+				self.assertEqual(game_state.friendly_hit_callbacks, 0)
+
+	def test_fighter_count(self):
+		self.assertEqual(len(GameState().fighters), DEFAULT_FIGHTER_COUNT)
+		self.assertEqual(len(GameState(fighter_count=5).fighters), 5)
+		self.assertEqual(len(GameState(teams=[0, 0, 1]).fighters), 3)
+		with self.assertRaises(ValueError):
+			GameState(fighter_count=0)
+		with self.assertRaises(ValueError):
+			GameState(teams=[0, 1], fighter_count=3)
+		self.assertEqual(parse_teams("0,0,1,1"), [0, 0, 1, 1])
+		with self.assertRaises(ValueError):
+			parse_teams("red,blue")
+
+	def test_wall_contacts_match_arbiters(self):
+		# begin and separate keep the touching walls, and the ground is read from the arbiters the body has at the end of the physics step
+		game_state = GameState()
+		inputs = RandomInputs(1, len(game_state.fighters))
+		step_grounds = []
+		def read_arbiters(space: pymunk.Space, key):
+			step_grounds.clear()
+			for fighter in game_state.fighters:
+				arbiters = []
+				fighter.body.each_arbiter(arbiters.append)
+				self.assertEqual(fighter.wall_contacts, {arbiter.shapes[1] for arbiter in arbiters})
+				step_grounds.append(any(arbiter.normal.y < 0 for arbiter in arbiters))
+				self.assertEqual([details["wall"] for details in fighter.contact_details()], [arbiter.shapes[1] for arbiter in arbiters])
+		grounded_frames = 0
+		for _ in range(2000):
+			game_state.physics_sim.add_post_step_callback(read_arbiters, read_arbiters)
+			game_state.step(inputs.next_inputs())
+			self.assertEqual([fighter.is_touching_ground for fighter in game_state.fighters], step_grounds)
+			grounded_frames += sum(step_grounds)
+		self.assertGreater(grounded_frames, 0)
+
+	def test_exact_restore_leaves_no_arbiters(self):
+		# only exact_restore gives up warm starting the ground contacts between frames
+		for exact_restore in (False, True):
+			with self.subTest(exact_restore=exact_restore):
+				game_state = GameState(exact_restore=exact_restore)
+				for _ in range(120):
+					game_state.step()
+				for fighter in game_state.fighters:
+					self.assertTrue(fighter.is_grounded)
+					arbiters = []
+					fighter.body.each_arbiter(arbiters.append)
+					self.assertEqual(len(arbiters), 0 if exact_restore else 1)
+
+	def test_step_with_inputs(self):
+		game_state = GameState()
+		for _ in range(60):
+			game_state.step()
+		start_x = [fighter.body.position.x for fighter in game_state.fighters]
+
+		move_right = [False] * 8
+		move_right[input.INPUT_MOVE_RIGHT] = True
+		idle = [False] * 8
+		for _ in range(10):
+			game_state.step([move_right, idle])
+
+		self.assertGreater(game_state.fighters[0].body.position.x, start_x[0])
+		self.assertEqual(game_state.fighters[0].side_facing, consts.FIGHTER_SIDE_FACING_RIGHT)
+		self.assertAlmostEqual(game_state.fighters[1].body.position.x, start_x[1], places=3)
+
+	def test_tracks_active_attack(self):
+		game_state = GameState()
+		fighter = game_state.fighters[0]
+		for _ in range(60):
+			game_state.step()
+		self.assertEqual(fighter.active_attack_idx, -1)
+
+		neutral_light = [False] * 8
+		neutral_light[input.INPUT_LIGHT_HIT] = True
+		game_state.step([neutral_light, [False] * 8])
+		attack = fighter.attacks[fighter.active_attack_idx]
+		self.assertEqual(attack.name, "unarmed_neutral_light")
+		self.assertTrue(attack.is_active)
+
+		while fighter.active_attack_idx >= 0:
+			game_state.step()
+		self.assertFalse(attack.is_active)
+		self.assertEqual(attack.cooldown_frames_left(game_state.frame), attack.cooldown_timer)
+		for attack in fighter.attacks:
+			self.assertFalse(attack.is_active)
+
+	def test_steady_state_frames_allocate_nothing(self):
+		# a looping script of walking, jumping and attacking, fed through the input bitmasks
+		script = []
+		for frame in range(240):
+			bits = 0
+			if frame % 60 < 20:
+				bits |= input.input_mask(input.INPUT_MOVE_RIGHT)
+			elif frame % 60 < 40:
+				bits |= input.input_mask(input.INPUT_MOVE_LEFT)
+			if frame % 80 == 5:
+				bits |= input.input_mask(input.INPUT_JUMP)
+			if frame % 40 == 10:
+				bits |= input.input_mask(input.INPUT_LIGHT_HIT)
+			if frame % 120 == 30:
+				bits |= input.input_mask(input.INPUT_HEAVY_HIT)
+			script.append(bits)
+
+		game_state = GameState()
+		def run_script():
+			for bits in script:
+				for fighter in game_state.fighters:
+					fighter.input.current_bits = bits
+				step_game(game_state)
+
+		repo_files = tracemalloc.Filter(True, os.path.join(os.path.dirname(os.path.abspath(__file__)), "*"))
+		for _ in range(3):
+			run_script()
+		tracemalloc.start()
+		try:
+			# the first traced passes replace values that were allocated before tracing started, so only the last pass is measured
+			for _ in range(3):
+				run_script()
+			before = tracemalloc.take_snapshot().filter_traces([repo_files])
+			run_script()
+			after = tracemalloc.take_snapshot().filter_traces([repo_files])
+		finally:
+			tracemalloc.stop()
+
+		# every line of the simulation has to hold on to no more blocks and no more bytes than it did a pass earlier
+		grown = [stat for stat in after.compare_to(before, "lineno") if (stat.size_diff > 0 or stat.count_diff > 0) and not stat.traceback[0].filename.endswith("_test.py")]
+		self.assertEqual(grown, [], "memory allocated by the simulation grew over {} frames".format(len(script)))
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,45 @@
+import pymunk
+
+# hit detection by query, as an alternative to letting pymunk's solver find hurtbox/hitbox overlaps.
+# hitboxes never enter the space. step_attack adds and removes them here instead, with the same calls it uses on a space, so casts coming and going don't churn the space's spatial index.
+# after the physics step, every live hitbox is checked against the hurtboxes, which are in the space's index already, and the hits are handed back in a fixed order: by attacker, then by victim.
+# that is one index lookup per live hitbox, so the cost grows with the hitboxes out and the hurtboxes they actually reach, never with every pair of fighters.
+
+class HitQuery():
+	__slots__ = ("live_shapes",)
+
+	def __init__(self):
+		# live hitbox shapes, in the order they were added. the values are unused
+		self.live_shapes: dict[pymunk.Shape, None] = {}
+
+	def add(self, *shapes: pymunk.Shape):
+		for shape in shapes:
+			self.live_shapes[shape] = None
+
+	def remove(self, *shapes: pymunk.Shape):
+		for shape in shapes:
+			del self.live_shapes[shape]
+
+	def __contains__(self, shape: pymunk.Shape) -> bool:
+		return shape in self.live_shapes
+
+	def clear(self):
+		self.live_shapes.clear()
+
+	def find_hits(self, space: pymunk.Space) -> list[tuple[pymunk.Shape, pymunk.Shape]]:
+		"""
+			### Returns:
+				(hurtbox, hitbox) of every overlap, sorted by the attacking fighter and then the victim
+		"""
+		hits = []
+		if len(self.live_shapes) == 0:
+			return hits
+		for hitbox in self.live_shapes:
+			# shapes outside the space don't follow their body on their own
+			bb = hitbox.cache_bb()
+			# the hitbox's own filter only lets hurtboxes through, and its group keeps the fighter's own and its teammates' hurtboxes out, the same as it keeps them from making collision pairs in the space
+			for hurtbox in space.bb_query(bb, hitbox.filter):
+				if len(hitbox.shapes_collide(hurtbox).points) > 0:
+					hits.append((hurtbox, hitbox))
+		hits.sort(key=lambda hit: (hit[1].fighter.idx, hit[0].fighter.idx))
+		return hits
@@ -0,0 +1,87 @@
+import unittest
+from hits import *
+from game import *
+from snapshot import Snapshotter
+from test_helpers import play_random_match
+
+def hitbox_shapes(game_state: GameState) -> list[pymunk.Shape]:
+	shapes = []
+	for fighter in game_state.fighters:
+		shapes.extend(fighter.hitbox_shapes())
+	return shapes
+
+class TestHits(unittest.TestCase):
+
+	def test_hitboxes_stay_out_of_space(self):
+		game_state = GameState(HIT_DETECTION_QUERY)
+		live_frames = [0]
+		def check_shapes():
+			for shape in hitbox_shapes(game_state):
+				self.assertIsNone(shape.space)
+			live_frames[0] += len(game_state.hit_query.live_shapes) > 0
+		play_random_match(game_state, seed=2, frame_count=6000, on_frame=check_shapes)
+		self.assertGreater(live_frames[0], 0)
+		self.assertGreater(sum(game_state.hits_per_attack.values()), 0)
+
+	def test_same_hits_as_solver(self):
+		# not guaranteed in general, since impulses land at a different point of the step, but true of this match
+		results = []
+		for hit_detection in (HIT_DETECTION_SOLVER, HIT_DETECTION_QUERY):
+			game_state = GameState(hit_detection)
+			play_random_match(game_state, seed=3, frame_count=6000)
+			results.append((game_state.hits_per_attack, [fighter.dmg_points for fighter in game_state.fighters]))
+		self.assertEqual(results[0], results[1])
+
+	def test_snapshot_restores_live_hitboxes(self):
+		game_state = GameState(HIT_DETECTION_QUERY)
+		snapshotter = Snapshotter(game_state)
+		play_random_match(game_state, seed=2, frame_count=300)
+		while len(game_state.hit_query.live_shapes) == 0:
+			play_random_match(game_state, seed=game_state.frame, frame_count=1)
+		snapshot = snapshotter.take()
+		live_shapes = list(game_state.hit_query.live_shapes)
+		play_random_match(game_state, seed=5, frame_count=120)
+		snapshotter.restore(snapshot)
+		self.assertEqual(list(game_state.hit_query.live_shapes), live_shapes)
+		self.assertEqual(snapshotter.live_hitbox_shapes(), live_shapes)
+
+	def test_reset_clears_live_hitboxes(self):
+		game_state = GameState(HIT_DETECTION_QUERY)
+		play_random_match(game_state, seed=2, frame_count=300)
+		while len(game_state.hit_query.live_shapes) == 0:
+			play_random_match(game_state, seed=game_state.frame, frame_count=1)
+		game_state.reset()
+		self.assertEqual(len(game_state.hit_query.live_shapes), 0)
+
+	def test_teammates_never_collide(self):
+		for hit_detection in (HIT_DETECTION_SOLVER, HIT_DETECTION_QUERY):
+			with self.subTest(hit_detection=hit_detection):
+				# the same match lands hits between opponents
+				game_state = GameState(hit_detection, teams=[0, 1])
+				play_random_match(game_state, seed=2, frame_count=6000)
+				self.assertGreater(game_state.hit_callbacks, 0)
+				self.assertEqual(game_state.friendly_hit_callbacks, 0)
+
+				game_state = GameState(hit_detection, teams=[0, 0])
+				play_random_match(game_state, seed=2, frame_count=6000)
+				self.assertEqual(game_state.hit_callbacks, 0)
+				self.assertEqual(sum(game_state.hits_per_attack.values()), 0)
+				self.assertEqual([fighter.dmg_points for fighter in game_state.fighters], [0, 0])
+
+	def test_team_groups(self):
+		game_state = GameState(teams=[3, 3])
+		# hitbox shapes made after the team was set get its group too
+		play_random_match(game_state, seed=2, frame_count=600)
+		self.assertGreater(len(hitbox_shapes(game_state)), 0)
+		for fighter in game_state.fighters:
+			for shape in fighter.hurtbox_shapes + fighter.hitbox_shapes():
+				self.assertEqual(shape.filter.group, 4)
+		with self.assertRaises(ValueError):
+			GameState(teams=[0], fighter_count=2)
+
+	def test_unknown_mode(self):
+		with self.assertRaises(ValueError):
+			GameState("raycast")
+
+if __name__ == '__main__':
+	unittest.main()
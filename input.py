@@ -7,24 +7,129 @@ INPUT_HEAVY_HIT = 5
 INPUT_LIGHT_HIT = 6
 INPUT_THROW = 7
 
+INPUT_COUNT = 8
+
+def input_mask(*input_indices: int) -> int:
+	"""
+		the bitmask with the bit of every given input set, for use with the Input mask queries
+	"""
+	mask = 0
+	for idx in input_indices:
+		mask |= 1 << idx
+	return mask
+
+MOVE_LEFT_RIGHT_MASK = input_mask(INPUT_MOVE_LEFT, INPUT_MOVE_RIGHT)
+MOVE_ANY_MASK = input_mask(INPUT_JUMP, INPUT_MOVE_LEFT, INPUT_MOVE_RIGHT, INPUT_MOVE_DOWN)
+HIT_MASK = input_mask(INPUT_HEAVY_HIT, INPUT_LIGHT_HIT)
+
+def pack_input(values) -> int:
+	"""
+		packs the input flags into an integer, with bit i set when values[i] is pressed
+	"""
+	bits = 0
+	for (i, v) in enumerate(values):
+		if v:
+			bits |= 1 << i
+	return bits
+
+def unpack_input(bits: int) -> list[bool]:
+	return [(bits >> i) & 1 == 1 for i in range(INPUT_COUNT)]
+
+class InputFlags():
+	"""
+		list-like view over one of the bitmasks of an Input, so flags can still be read and written by index. assigning a whole list goes through the slice, e.g. flags[:] = values
+	"""
+	__slots__ = ("owner", "field")
+	def __init__(self, owner: "Input", field: str):
+		self.owner = owner
+		self.field = field
+	def __getitem__(self, idx):
+		bits = getattr(self.owner, self.field)
+		if isinstance(idx, slice):
+			return unpack_input(bits)[idx]
+		return (bits >> idx) & 1 == 1
+	def __setitem__(self, idx, value):
+		if isinstance(idx, slice):
+			if idx != slice(None):
+				raise IndexError("only the whole set of input flags can be assigned at once")
+			setattr(self.owner, self.field, pack_input(value))
+			return
+		bits = getattr(self.owner, self.field)
+		if value:
+			bits |= 1 << idx
+		else:
+			bits &= ~(1 << idx)
+		setattr(self.owner, self.field, bits)
+	def __len__(self) -> int:
+		return INPUT_COUNT
+	def __iter__(self):
+		return iter(unpack_input(getattr(self.owner, self.field)))
+	def __eq__(self, other) -> bool:
+		return list(self) == list(other)
+	def __repr__(self) -> str:
+		return repr(list(self))
+
 class Input():
-	def __init__(self):	
-		self.current = [False] * 8
-		self.prev = [False] * 8
+	"""
+		the input flags of this frame and the last one, stored as bitmasks with bit i for input i.
+		every query is a couple of integer operations, and rolling over to the next frame is a single assignment.
+	"""
+	# the only mutable values, for snapshotting
+	STATE_FIELDS = ("current_bits", "prev_bits")
+	__slots__ = STATE_FIELDS
+
+	def __init__(self, current_bits: int = 0, prev_bits: int = 0):
+		self.current_bits = current_bits
+		self.prev_bits = prev_bits
+
+	@staticmethod
+	def from_bits(bits) -> "Input":
+		"""
+			builds an input holding packed flags as current, e.g. a byte of a replay or an element of a uint8 numpy array
+		"""
+		return Input(int(bits))
+
+	@staticmethod
+	def from_values(values) -> "Input":
+		"""
+			builds an input holding a sequence of INPUT_COUNT flags as current, e.g. a list or a row of a boolean numpy array
+		"""
+		return Input(pack_input(values))
+
+	@property
+	def current(self) -> InputFlags:
+		return InputFlags(self, "current_bits")
+	@current.setter
+	def current(self, values):
+		self.current_bits = pack_input(values)
+
+	@property
+	def prev(self) -> InputFlags:
+		return InputFlags(self, "prev_bits")
+	@prev.setter
+	def prev(self, values):
+		self.prev_bits = pack_input(values)
+
 	def is_tapped(self, input_index) -> bool:
-		return self.current[input_index] and self.prev[input_index] == False
+		return (self.current_bits & ~self.prev_bits) >> input_index & 1 == 1
+	def is_released(self, input_index) -> bool:
+		return (self.prev_bits & ~self.current_bits) >> input_index & 1 == 1
 	def is_pressed(self, input_index) -> bool:
-		return self.current[input_index]
-	def is_one_pressed(self, input_indices) -> bool:
-		b = True
-		for idx in input_indices:
-			b = b or self.current[idx]
-		return b
-	def are_pressed(self, input_indices) -> bool:
-		b = True
-		for idx in input_indices:
-			b = b and self.current[idx]
-		return b
+		return self.current_bits >> input_index & 1 == 1
+	def is_one_pressed(self, mask: int) -> bool:
+		"""
+			### Parameters:
+				mask : inputs to check, built with input_mask
+		"""
+		return self.current_bits & mask != 0
+	def are_pressed(self, mask: int) -> bool:
+		"""
+			### Parameters:
+				mask : inputs to check, built with input_mask
+		"""
+		return self.current_bits & mask == mask
+	def clear(self):
+		self.current_bits = 0
+		self.prev_bits = 0
 	def copy_current_to_previous(self):
-		for i, v in enumerate(self.current):
-			self.prev[i] = v
\ No newline at end of file
+		self.prev_bits = self.current_bits
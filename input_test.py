@@ -0,0 +1,48 @@
+import unittest
+import numpy
+from input import *
+
+class TestInput(unittest.TestCase):
+
+	def test_tap_press_release(self):
+		fighter_input = Input()
+		fighter_input.current[INPUT_JUMP] = True
+		self.assertTrue(fighter_input.is_pressed(INPUT_JUMP))
+		self.assertTrue(fighter_input.is_tapped(INPUT_JUMP))
+		self.assertFalse(fighter_input.is_released(INPUT_JUMP))
+
+		fighter_input.copy_current_to_previous()
+		self.assertTrue(fighter_input.is_pressed(INPUT_JUMP))
+		self.assertFalse(fighter_input.is_tapped(INPUT_JUMP))
+
+		fighter_input.current[INPUT_JUMP] = False
+		self.assertTrue(fighter_input.is_released(INPUT_JUMP))
+		self.assertFalse(fighter_input.is_pressed(INPUT_JUMP))
+
+	def test_any_and_all_of(self):
+		fighter_input = Input.from_values([False] * INPUT_COUNT)
+		self.assertFalse(fighter_input.is_one_pressed(MOVE_LEFT_RIGHT_MASK))
+		fighter_input.current[INPUT_MOVE_RIGHT] = True
+		self.assertTrue(fighter_input.is_one_pressed(MOVE_LEFT_RIGHT_MASK))
+		self.assertFalse(fighter_input.are_pressed(MOVE_LEFT_RIGHT_MASK))
+		fighter_input.current[INPUT_MOVE_LEFT] = True
+		self.assertTrue(fighter_input.are_pressed(MOVE_LEFT_RIGHT_MASK))
+		self.assertFalse(fighter_input.is_one_pressed(input_mask(INPUT_DODGE, INPUT_THROW)))
+
+	def test_flags_view_and_constructors(self):
+		values = [True, False, False, True, False, False, True, False]
+		fighter_input = Input()
+		fighter_input.current[:] = values
+		self.assertEqual(fighter_input.current, values)
+		self.assertEqual(fighter_input.current_bits, pack_input(values))
+		self.assertEqual(unpack_input(fighter_input.current_bits), values)
+
+		replay_bytes = numpy.array([pack_input(values)], dtype=numpy.uint8)
+		self.assertEqual(Input.from_bits(replay_bytes[0]).current_bits, fighter_input.current_bits)
+		self.assertEqual(Input.from_values(numpy.array(values)).current_bits, fighter_input.current_bits)
+
+		with self.assertRaises(IndexError):
+			fighter_input.current[1:3] = [True, True]
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,313 @@
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sys
+from attack import *
+
+# movesets as data files, so moves can be added and rebalanced without touching code. a moveset file is utf-8 json:
+#	{"format_version": 1, "attacks": [attack, ...]}, with the attacks ordered on priority
+#	attack: the arguments of AttackDef. hit_input is "light" or "heavy", move_type is "neutral", "side" or "down", and powers is a list of powers
+#	power: the arguments of Power, with casts being a list of casts
+#	cast: the arguments of Cast. hitbox is a list of capsules {"offset": [x, y], "dims": [width, height]} facing right, or null
+# arguments that are left out take the constructor's default. pairs of numbers are written as lists.
+# files hold plain numbers only, so a value that came from a constant is written out and has to be updated by hand along with it.
+# unarmed.json's side light has a hitbox as wide as consts.HURTBOX_WIDTH, 14.4, and offset by half of that.
+#
+# parsing and validating a file, and compiling the timelines and dispatch table of its moves, only happens once per version of the file and of the compiler.
+# the compiled Moveset is pickled into a cache directory under the hash of the file's contents and of the compiler's sources, and any later load of the same contents by the same code unpickles that instead.
+# only cache directories that are as trusted as the code itself should be used, since unpickling can run arbitrary code.
+
+MOVESET_FORMAT_VERSION = 1
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+MOVESETS_DIR = os.path.join(SOURCE_DIR, "movesets")
+# the code a compiled Moveset comes out of, and is made of. a change to any of them gets a new cache key, so cache files pickled by older code are never loaded
+COMPILER_SOURCES = ("moveset_file.py", "attack.py", "consts.py")
+
+def default_cache_dir() -> str:
+	"""
+		### Returns:
+			the moveset cache under the user's cache directory, out of the source tree
+	"""
+	cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+	return os.path.join(cache_home, "botbrawl", "movesets")
+
+DEFAULT_CACHE_DIR = default_cache_dir()
+
+# kinds of values a field can hold
+FIELD_STRING = "string"
+FIELD_BOOL = "bool"
+# a whole number that is zero or more
+FIELD_COUNT = "count"
+FIELD_NUMBER = "number"
+FIELD_PAIR = "pair"
+FIELD_OPTIONAL_PAIR = "optional pair"
+# a pair of numbers above zero
+FIELD_SIZE = "size"
+FIELD_HIT_INPUT = "hit input"
+FIELD_MOVE_TYPE = "move type"
+FIELD_POWERS = "powers"
+FIELD_CASTS = "casts"
+FIELD_HITBOX = "hitbox"
+
+ATTACK_FIELDS = {
+	"name": FIELD_STRING,
+	"requires_fighter_grounding": FIELD_BOOL,
+	"hit_input": FIELD_HIT_INPUT,
+	"move_type": FIELD_MOVE_TYPE,
+	"is_jump_attack": FIELD_BOOL,
+	"powers": FIELD_POWERS,
+}
+POWER_FIELDS = {
+	"cooldown_frames": FIELD_COUNT,
+	"fixed_recovery_frames": FIELD_COUNT,
+	"recovery_frames": FIELD_COUNT,
+	"min_charge_frames": FIELD_COUNT,
+	"stun_frames": FIELD_COUNT,
+	"requires_hit": FIELD_BOOL,
+	"requires_no_hit": FIELD_BOOL,
+	"cancel_power_on_hit": FIELD_BOOL,
+	"cancel_power_on_ground": FIELD_BOOL,
+	"requires_grounding": FIELD_BOOL,
+	"requires_no_grounding": FIELD_BOOL,
+	"casts": FIELD_CASTS,
+}
+CAST_FIELDS = {
+	"startup_frames": FIELD_COUNT,
+	"active_frames": FIELD_COUNT,
+	"base_dmg": FIELD_NUMBER,
+	"var_force": FIELD_NUMBER,
+	"fixed_force": FIELD_NUMBER,
+	"velocity": FIELD_OPTIONAL_PAIR,
+	"is_velocity_on_active_frames_only": FIELD_BOOL,
+	"knockback_dir": FIELD_PAIR,
+	"self_velocity_on_hit": FIELD_OPTIONAL_PAIR,
+	"should_cancel_victim_velocity_on_hit_until_next_hit_in_attack": FIELD_BOOL,
+	"additional_startup_frames": FIELD_COUNT,
+	"extra_dmg_per_extra_startup_frame": FIELD_NUMBER,
+	"is_using_charged_dmg": FIELD_BOOL,
+	"is_active_until_cancelled": FIELD_BOOL,
+	"hitbox": FIELD_HITBOX,
+}
+CAPSULE_FIELDS = {
+	"offset": FIELD_PAIR,
+	"dims": FIELD_SIZE,
+}
+
+def constructor_defaults(cls: type) -> dict:
+	"""
+		### Returns:
+			the default of every argument of the class's constructor. arguments without one map to inspect.Parameter.empty
+	"""
+	parameters = list(inspect.signature(cls.__init__).parameters.values())[1:]
+	return {parameter.name: parameter.default for parameter in parameters}
+
+# looking up a signature is slow, so it's done once per class
+CONSTRUCTOR_DEFAULTS = {cls: constructor_defaults(cls) for cls in (AttackDef, Power, Cast, CapsuleParams)}
+
+def is_number(value) -> bool:
+	return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def parse_value(kind: str, value, path: str):
+	def fail(expected: str):
+		raise ValueError("{}: expected {}, got {}".format(path, expected, json.dumps(value)))
+
+	if kind == FIELD_STRING:
+		if not isinstance(value, str) or len(value) == 0:
+			fail("a non-empty string")
+		return value
+	if kind == FIELD_BOOL:
+		if not isinstance(value, bool):
+			fail("true or false")
+		return value
+	if kind == FIELD_COUNT:
+		if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+			fail("a whole number of zero or more")
+		return value
+	if kind == FIELD_NUMBER:
+		if not is_number(value):
+			fail("a number")
+		return value
+	if kind in (FIELD_PAIR, FIELD_OPTIONAL_PAIR, FIELD_SIZE):
+		if value == None and kind == FIELD_OPTIONAL_PAIR:
+			return None
+		if not isinstance(value, list) or len(value) != 2 or not all(is_number(x) for x in value):
+			fail("a pair of numbers")
+		if kind == FIELD_SIZE and not all(x > 0 for x in value):
+			fail("a pair of numbers above zero")
+		return tuple(value)
+	if kind == FIELD_HIT_INPUT:
+		if value not in ("light", "heavy"):
+			fail('"light" or "heavy"')
+		return AttackHitInput[value.upper()]
+	if kind == FIELD_MOVE_TYPE:
+		if value not in ("neutral", "side", "down"):
+			fail('"neutral", "side" or "down"')
+		return AttackMoveType[value.upper()]
+	if kind == FIELD_POWERS:
+		if not isinstance(value, list) or len(value) == 0:
+			fail("a non-empty list of powers")
+		return [parse_object(item, POWER_FIELDS, Power, "{}[{}]".format(path, idx)) for (idx, item) in enumerate(value)]
+	if kind == FIELD_CASTS:
+		if not isinstance(value, list) or len(value) == 0:
+			fail("a non-empty list of casts")
+		return [parse_object(item, CAST_FIELDS, Cast, "{}[{}]".format(path, idx)) for (idx, item) in enumerate(value)]
+	if kind == FIELD_HITBOX:
+		if value == None:
+			return None
+		if not isinstance(value, list) or len(value) == 0:
+			fail("a non-empty list of capsules, or null")
+		return Hitbox([parse_object(item, CAPSULE_FIELDS, CapsuleParams, "{}[{}]".format(path, idx)) for (idx, item) in enumerate(value)])
+	raise AssertionError("unknown field kind {}".format(kind))
+
+def parse_object(data, fields: dict[str, str], cls: type, path: str):
+	if not isinstance(data, dict):
+		raise ValueError("{}: expected an object, got {}".format(path, json.dumps(data)))
+	for name in data:
+		if name not in fields:
+			raise ValueError("{}: unknown field {}".format(path, json.dumps(name)))
+	kwargs = {}
+	for (name, default) in CONSTRUCTOR_DEFAULTS[cls].items():
+		if name in data:
+			kwargs[name] = parse_value(fields[name], data[name], "{}.{}".format(path, name))
+		elif default is inspect.Parameter.empty:
+			raise ValueError("{}: missing field {}".format(path, json.dumps(name)))
+	return cls(**kwargs)
+
+def parse_moveset(contents: str|bytes) -> Moveset:
+	"""
+		parses and validates the contents of a moveset file
+
+		### Returns:
+			the compiled moveset
+	"""
+	try:
+		data = json.loads(contents)
+	except json.JSONDecodeError as e:
+		raise ValueError("moveset is not valid json: {}".format(e))
+	if not isinstance(data, dict):
+		raise ValueError("moveset should be a json object")
+	if data.get("format_version") != MOVESET_FORMAT_VERSION:
+		raise ValueError("moveset format version {} isn't supported, expected {}".format(json.dumps(data.get("format_version")), MOVESET_FORMAT_VERSION))
+	for name in data:
+		if name not in ("format_version", "attacks"):
+			raise ValueError("moveset: unknown field {}".format(json.dumps(name)))
+	attacks_data = data.get("attacks")
+	if not isinstance(attacks_data, list) or len(attacks_data) == 0:
+		raise ValueError("moveset.attacks: expected a non-empty list of attacks")
+	attacks = [parse_object(item, ATTACK_FIELDS, AttackDef, "attacks[{}]".format(idx)) for (idx, item) in enumerate(attacks_data)]
+	# replays refer to attacks by name
+	names = [attack.name for attack in attacks]
+	for name in names:
+		if names.count(name) > 1:
+			raise ValueError("moveset: more than one attack is named {}".format(json.dumps(name)))
+	if isinstance(contents, str):
+		contents = contents.encode("utf-8")
+	return Moveset(attacks, hashlib.sha256(contents).hexdigest())
+
+# hashed on first use, and kept for the rest of the process
+_compiler_hash: bytes|None = None
+
+def compiler_hash() -> bytes:
+	"""
+		### Returns:
+			the hash of every file in COMPILER_SOURCES
+	"""
+	global _compiler_hash
+	if _compiler_hash == None:
+		hasher = hashlib.sha256()
+		for name in COMPILER_SOURCES:
+			with open(os.path.join(SOURCE_DIR, name), "rb") as f:
+				hasher.update(f.read())
+		_compiler_hash = hasher.digest()
+	return _compiler_hash
+
+def load_moveset(path: str, cache_dir: str|None = DEFAULT_CACHE_DIR) -> Moveset:
+	"""
+		loads a moveset file, from the cache if these exact contents were compiled before by the same code
+
+		### Parameters:
+			cache_dir : where compiled movesets are kept. None to always parse the file
+	"""
+	with open(path, "rb") as f:
+		contents = f.read()
+	if cache_dir == None:
+		return parse_moveset(contents)
+
+	key = hashlib.sha256(compiler_hash() + contents).hexdigest()
+	cache_path = os.path.join(cache_dir, key + ".pickle")
+	try:
+		with open(cache_path, "rb") as f:
+			moveset = pickle.load(f)
+		if isinstance(moveset, Moveset):
+			return moveset
+		print("moveset cache {} doesn't hold a moveset, compiling {} again".format(cache_path, path), file=sys.stderr)
+	except FileNotFoundError:
+		pass
+	except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, OSError) as e:
+		# a cache file that can't be read is compiled again and overwritten
+		print("moveset cache {} is unreadable ({}), compiling {} again".format(cache_path, e, path), file=sys.stderr)
+
+	moveset = parse_moveset(contents)
+	try:
+		os.makedirs(cache_dir, exist_ok=True)
+		# written under a temporary name and renamed, so other processes never see a partly written cache file
+		temp_path = "{}.{}.tmp".format(cache_path, os.getpid())
+		with open(temp_path, "wb") as f:
+			pickle.dump(moveset, f, protocol=pickle.HIGHEST_PROTOCOL)
+		os.replace(temp_path, cache_path)
+	except OSError:
+		# the moveset is still good without a cache, e.g. when installed somewhere read only
+		pass
+	return moveset
+
+def dump_value(kind: str, value):
+	if kind in (FIELD_PAIR, FIELD_OPTIONAL_PAIR, FIELD_SIZE):
+		return None if value == None else list(value)
+	if kind in (FIELD_HIT_INPUT, FIELD_MOVE_TYPE):
+		return value.name.lower()
+	if kind == FIELD_POWERS:
+		return [dump_object(power, POWER_FIELDS, Power) for power in value]
+	if kind == FIELD_CASTS:
+		return [dump_object(cast, CAST_FIELDS, Cast) for cast in value]
+	if kind == FIELD_HITBOX:
+		return None if value == None else [dump_object(capsule, CAPSULE_FIELDS, CapsuleParams) for capsule in value.capsules]
+	return value
+
+def dump_object(obj, fields: dict[str, str], cls: type) -> dict:
+	data = {}
+	defaults = CONSTRUCTOR_DEFAULTS[cls]
+	# in the order of the field tables, which keep the nested lists last
+	for name in fields:
+		default = defaults[name]
+		value = getattr(obj, name)
+		# tuples and lists of the same numbers compare unequal, so defaults are compared in their dumped form
+		if default is not inspect.Parameter.empty and dump_value(fields[name], value) == dump_value(fields[name], default):
+			continue
+		data[name] = dump_value(fields[name], value)
+	return data
+
+def dump_moveset(attacks: list[AttackDef]) -> dict:
+	"""
+		### Returns:
+			the json of a moveset file holding the attacks. arguments that are at their default are left out
+	"""
+	return {"format_version": MOVESET_FORMAT_VERSION, "attacks": [dump_object(attack, ATTACK_FIELDS, AttackDef) for attack in attacks]}
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="validates moveset files, and compiles them into the cache")
+	parser.add_argument("paths", nargs="+")
+	parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+	args = parser.parse_args()
+	is_valid = True
+	for path in args.paths:
+		try:
+			moveset = load_moveset(path, args.cache_dir)
+			print("{}: {} attacks".format(path, len(moveset.attacks)))
+		except (OSError, ValueError) as e:
+			print("{}: {}".format(path, e), file=sys.stderr)
+			is_valid = False
+	sys.exit(0 if is_valid else 1)
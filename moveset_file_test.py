@@ -0,0 +1,124 @@
+import unittest
+import os
+import json
+import copy
+import hashlib
+import tempfile
+from moveset_file import *
+import moveset_file
+import attack_moves
+
+class TestMovesetFile(unittest.TestCase):
+
+	def setUp(self):
+		self.tmp_dir = tempfile.TemporaryDirectory()
+		self.cache_dir = os.path.join(self.tmp_dir.name, "cache")
+		with open(attack_moves.UNARMED_MOVESET_PATH) as f:
+			self.unarmed = json.load(f)
+
+	def tearDown(self):
+		self.tmp_dir.cleanup()
+
+	def write_moveset(self, data: dict) -> str:
+		path = os.path.join(self.tmp_dir.name, "moveset.json")
+		with open(path, "w") as f:
+			json.dump(data, f)
+		return path
+
+	def test_unarmed_round_trip(self):
+		moveset = load_moveset(attack_moves.UNARMED_MOVESET_PATH, cache_dir=None)
+		self.assertEqual(dump_moveset(moveset.attacks), self.unarmed)
+		side_light = moveset.attacks[0]
+		self.assertEqual((side_light.hit_input, side_light.move_type), (AttackHitInput.LIGHT, AttackMoveType.SIDE))
+		self.assertEqual(side_light.powers[0].casts[0].velocity, (50, 0))
+		self.assertEqual(side_light.powers[0].casts[0].knockback_dir, (1, 0))
+
+	def test_cache(self):
+		path = self.write_moveset(self.unarmed)
+		parsed = load_moveset(path, self.cache_dir)
+		self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+		cached = load_moveset(path, self.cache_dir)
+		self.assertIsNot(cached, parsed)
+		self.assertEqual(dump_moveset(cached.attacks), dump_moveset(parsed.attacks))
+		self.assertEqual(cached.dispatch_candidates, parsed.dispatch_candidates)
+		with open(path, "rb") as f:
+			self.assertEqual(cached.content_hash, hashlib.sha256(f.read()).hexdigest())
+		self.assertEqual(cached.content_hash, parsed.content_hash)
+
+		# other contents get a cache file of their own
+		changed = copy.deepcopy(self.unarmed)
+		changed["attacks"][0]["powers"][0]["stun_frames"] += 1
+		self.write_moveset(changed)
+		self.assertEqual(load_moveset(path, self.cache_dir).attacks[0].powers[0].stun_frames, parsed.attacks[0].powers[0].stun_frames + 1)
+		self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+		self.assertNotEqual(load_moveset(path, self.cache_dir).content_hash, parsed.content_hash)
+
+	def test_cache_follows_compiler(self):
+		path = self.write_moveset(self.unarmed)
+		load_moveset(path, self.cache_dir)
+		# the same contents compiled by other code get a cache file of their own
+		real_hash = compiler_hash()
+		moveset_file._compiler_hash = hashlib.sha256(b"other compiler").digest()
+		try:
+			load_moveset(path, self.cache_dir)
+		finally:
+			moveset_file._compiler_hash = real_hash
+		self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+	def test_default_cache_dir(self):
+		real_cache_home = os.environ.get("XDG_CACHE_HOME")
+		os.environ["XDG_CACHE_HOME"] = self.tmp_dir.name
+		try:
+			self.assertEqual(default_cache_dir(), os.path.join(self.tmp_dir.name, "botbrawl", "movesets"))
+		finally:
+			if real_cache_home == None:
+				del os.environ["XDG_CACHE_HOME"]
+			else:
+				os.environ["XDG_CACHE_HOME"] = real_cache_home
+		# compiled movesets are never written into the source tree
+		self.assertFalse(os.path.abspath(DEFAULT_CACHE_DIR).startswith(SOURCE_DIR + os.sep))
+
+	def test_unarmed_values_from_constants(self):
+		# written out from consts.HURTBOX_WIDTH, see the note at the top of moveset_file.py
+		side_light = load_moveset(attack_moves.UNARMED_MOVESET_PATH, cache_dir=None).attacks[0]
+		(capsule,) = side_light.powers[0].casts[2].hitbox.capsules
+		self.assertEqual(capsule.offset[0], 0.5 * consts.HURTBOX_WIDTH)
+		self.assertEqual(capsule.dims[0], consts.HURTBOX_WIDTH)
+
+	def test_rebuilds_broken_cache(self):
+		path = self.write_moveset(self.unarmed)
+		load_moveset(path, self.cache_dir)
+		(cache_file,) = os.listdir(self.cache_dir)
+		with open(os.path.join(self.cache_dir, cache_file), "wb") as f:
+			f.write(b"not a pickle")
+		moveset = load_moveset(path, self.cache_dir)
+		self.assertEqual(dump_moveset(moveset.attacks), self.unarmed)
+		self.assertIsInstance(load_moveset(path, self.cache_dir), Moveset)
+
+	def test_rejects_bad_movesets(self):
+		def changed(change) -> dict:
+			data = copy.deepcopy(self.unarmed)
+			change(data)
+			return data
+		first_cast = lambda data: data["attacks"][0]["powers"][0]["casts"][0]
+		cases = {
+			"format version 2": changed(lambda data: data.update(format_version=2)),
+			"attacks[0].powers[0].casts[0]: missing field \"startup_frames\"": changed(lambda data: first_cast(data).pop("startup_frames")),
+			"attacks[0].powers[0].casts[0]: unknown field \"startup\"": changed(lambda data: first_cast(data).update(startup=3)),
+			"attacks[0].powers[0].casts[0].active_frames": changed(lambda data: first_cast(data).update(active_frames=-1)),
+			"attacks[0].powers[0].casts[0].velocity": changed(lambda data: first_cast(data).update(velocity=[1, 2, 3])),
+			"attacks[0].powers[0].casts[0].hitbox[0].dims": changed(lambda data: first_cast(data).update(hitbox=[{"offset": [0, 0], "dims": [0, 4]}])),
+			"attacks[0].hit_input": changed(lambda data: data["attacks"][0].update(hit_input="medium")),
+			"attacks[1].powers": changed(lambda data: data["attacks"][1].update(powers=[])),
+			"more than one attack": changed(lambda data: data["attacks"][1].update(name=data["attacks"][0]["name"])),
+		}
+		for (message, data) in cases.items():
+			with self.subTest(message):
+				with self.assertRaises(ValueError) as context:
+					load_moveset(self.write_moveset(data), self.cache_dir)
+				self.assertIn(message, str(context.exception))
+		with self.assertRaises(ValueError):
+			parse_moveset("{")
+
+if __name__ == '__main__':
+	unittest.main()
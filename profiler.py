@@ -0,0 +1,171 @@
+import bisect
+import json
+import time
+
+# per phase timing of step_game. the profiler stays attached to every GameState and can be switched on and off at any time.
+# while it's off, the simulation only checks a flag at every phase boundary and collision, so it can be left in on match servers.
+#
+# every frame, the time spent in each phase is summed over all fighters and added as one sample to that phase's histogram.
+# optionally, every timed span is also kept as a chrome trace event, to be opened in chrome://tracing or perfetto.
+
+# stepping the active attack
+PHASE_ATTACKS = 0
+# walking on input, and after the triggers, the velocity, dodge and timer updates
+PHASE_MOVEMENT = 1
+# Fighter.compute_grounding, and reading the ground contacts after the physics step
+PHASE_GROUNDING = 2
+# jumping and finding the attack the input triggers
+PHASE_TRIGGERS = 3
+# pymunk.Space.step
+PHASE_PHYSICS = 4
+# time spent in pre_solve_hurtbox_hitbox, which runs inside the physics step, so it's also counted as part of PHASE_PHYSICS.
+# with query hit detection, the hit query and resolution after the physics step instead
+PHASE_COLLISIONS = 5
+PHASE_FRAME = 6
+
+PHASE_NAMES = ("attacks", "movement", "grounding", "triggers", "physics", "collisions", "frame")
+
+# histogram buckets grow geometrically, 4 per doubling, from 250ns to about 1s. the last bucket takes everything beyond that
+BUCKETS_PER_DOUBLING = 4
+BUCKET_UPPER_BOUNDS_NS = [int(250 * 2**(i / BUCKETS_PER_DOUBLING)) for i in range(22 * BUCKETS_PER_DOUBLING)]
+
+# most spans kept for a chrome trace. about a minute of frames with two fighters
+DEFAULT_MAX_TRACE_EVENTS = 60*60*16
+
+class PhaseHistogram():
+	def __init__(self):
+		self.counts = [0] * (len(BUCKET_UPPER_BOUNDS_NS) + 1)
+		self.count = 0
+		self.total_ns = 0
+		self.max_ns = 0
+
+	def add(self, sample_ns: int):
+		self.counts[bisect.bisect_left(BUCKET_UPPER_BOUNDS_NS, sample_ns)] += 1
+		self.count += 1
+		self.total_ns += sample_ns
+		if sample_ns > self.max_ns:
+			self.max_ns = sample_ns
+
+	def percentile_ns(self, percentile: float) -> int:
+		"""
+			upper bound of the bucket the percentile falls in, so it's off by at most a bucket's width. never more than the largest sample
+		"""
+		if self.count == 0:
+			return 0
+		rank = percentile / 100 * self.count
+		seen = 0
+		for (bucket_idx, bucket_count) in enumerate(self.counts):
+			seen += bucket_count
+			if seen >= rank and bucket_count > 0:
+				if bucket_idx == len(BUCKET_UPPER_BOUNDS_NS):
+					return self.max_ns
+				return min(BUCKET_UPPER_BOUNDS_NS[bucket_idx], self.max_ns)
+		return self.max_ns
+
+	def to_dict(self) -> dict:
+		return {
+			"count": self.count,
+			"mean_us": self.total_ns / max(self.count, 1) / 1000,
+			"p50_us": self.percentile_ns(50) / 1000,
+			"p99_us": self.percentile_ns(99) / 1000,
+			"max_us": self.max_ns / 1000,
+			"bucket_upper_bounds_us": [bound / 1000 for bound in BUCKET_UPPER_BOUNDS_NS],
+			"bucket_counts": list(self.counts),
+		}
+
+class FrameProfiler():
+	def __init__(self):
+		self.is_enabled = False
+		self.histograms = [PhaseHistogram() for _ in PHASE_NAMES]
+		# time spent in each phase during the frame being profiled
+		self.frame_ns = [0] * len(PHASE_NAMES)
+		self.frame = 0
+		self.frame_start_ns = 0
+		self.lap_start_ns = 0
+		self.fighter_idx = 0
+		# (phase, fighter index or -1, start, duration) of every span, or None when not tracing
+		self.trace_events: list[tuple[int, int, int, int]]|None = None
+		self.max_trace_events = DEFAULT_MAX_TRACE_EVENTS
+
+	def enable(self, trace: bool = False):
+		"""
+			### Parameters:
+				trace : also keep every timed span, for write_chrome_trace
+		"""
+		self.is_enabled = True
+		if trace and self.trace_events == None:
+			self.trace_events = []
+
+	def disable(self):
+		self.is_enabled = False
+
+	def clear(self):
+		self.histograms = [PhaseHistogram() for _ in PHASE_NAMES]
+		if self.trace_events != None:
+			self.trace_events = []
+
+	def begin_frame(self, frame: int):
+		self.frame = frame
+		frame_ns = self.frame_ns
+		for phase in range(len(frame_ns)):
+			frame_ns[phase] = 0
+		now = time.perf_counter_ns()
+		self.frame_start_ns = now
+		self.lap_start_ns = now
+		self.fighter_idx = -1
+
+	def begin_fighter(self, fighter_idx: int):
+		self.fighter_idx = fighter_idx
+		self.lap_start_ns = time.perf_counter_ns()
+
+	def lap(self, phase: int):
+		"""
+			counts the time since the last lap towards phase
+		"""
+		now = time.perf_counter_ns()
+		self.frame_ns[phase] += now - self.lap_start_ns
+		if self.trace_events != None and len(self.trace_events) < self.max_trace_events:
+			self.trace_events.append((phase, self.fighter_idx, self.lap_start_ns, now - self.lap_start_ns))
+		self.lap_start_ns = now
+
+	def add_collision(self, start_ns: int):
+		now = time.perf_counter_ns()
+		self.frame_ns[PHASE_COLLISIONS] += now - start_ns
+		if self.trace_events != None and len(self.trace_events) < self.max_trace_events:
+			self.trace_events.append((PHASE_COLLISIONS, -1, start_ns, now - start_ns))
+
+	def end_frame(self):
+		now = time.perf_counter_ns()
+		frame_ns = self.frame_ns
+		frame_ns[PHASE_FRAME] = now - self.frame_start_ns
+		for (histogram, sample_ns) in zip(self.histograms, frame_ns):
+			histogram.add(sample_ns)
+		if self.trace_events != None and len(self.trace_events) < self.max_trace_events:
+			self.trace_events.append((PHASE_FRAME, -1, self.frame_start_ns, frame_ns[PHASE_FRAME]))
+
+	def to_dict(self) -> dict:
+		return {name: histogram.to_dict() for (name, histogram) in zip(PHASE_NAMES, self.histograms)}
+
+	def write_json(self, path: str):
+		with open(path, "w") as f:
+			json.dump(self.to_dict(), f, indent=1)
+
+	def chrome_trace(self) -> dict:
+		"""
+			the recorded spans in chrome's trace event format. every fighter gets its own thread, and the whole frame, physics and collisions go on thread 0
+		"""
+		trace = []
+		for (phase, fighter_idx, start_ns, duration_ns) in self.trace_events or []:
+			trace.append({
+				"name": PHASE_NAMES[phase],
+				"ph": "X",
+				"ts": start_ns / 1000,
+				"dur": duration_ns / 1000,
+				"pid": 0,
+				"tid": fighter_idx + 1,
+			})
+		return {"traceEvents": trace, "displayTimeUnit": "ns"}
+
+	def write_chrome_trace(self, path: str):
+		with open(path, "w") as f:
+			json.dump(self.chrome_trace(), f)
@@ -0,0 +1,64 @@
+import unittest
+import json
+import os
+import tempfile
+from profiler import *
+from game import GameState
+import input
+
+class TestProfiler(unittest.TestCase):
+
+	def test_histogram_percentiles(self):
+		histogram = PhaseHistogram()
+		for _ in range(98):
+			histogram.add(1000)
+		histogram.add(50000)
+		histogram.add(2000000)
+		# percentiles are bucket upper bounds, so within a bucket's width of the sample
+		self.assertGreaterEqual(histogram.percentile_ns(50), 1000)
+		self.assertLess(histogram.percentile_ns(50), 1000 * 2**(1/BUCKETS_PER_DOUBLING))
+		self.assertGreaterEqual(histogram.percentile_ns(99), 50000)
+		self.assertLess(histogram.percentile_ns(99), 50000 * 2**(1/BUCKETS_PER_DOUBLING))
+		self.assertEqual(histogram.percentile_ns(100), 2000000)
+		self.assertEqual(histogram.max_ns, 2000000)
+
+	def test_off_by_default(self):
+		game_state = GameState()
+		for _ in range(10):
+			game_state.step()
+		for histogram in game_state.profiler.histograms:
+			self.assertEqual(histogram.count, 0)
+
+	def test_profiles_every_phase(self):
+		game_state = GameState()
+		game_state.profiler.enable(trace=True)
+		light_hit = [False] * input.INPUT_COUNT
+		light_hit[input.INPUT_LIGHT_HIT] = True
+		for frame in range(120):
+			# keep tapping light hit, so attacks get triggered and stepped
+			game_state.step([light_hit if frame % 20 == 0 else [False] * input.INPUT_COUNT] * len(game_state.fighters))
+		game_state.profiler.disable()
+		game_state.step()
+
+		profile = game_state.profiler.to_dict()
+		self.assertEqual(set(profile), set(PHASE_NAMES))
+		for name in PHASE_NAMES:
+			self.assertEqual(profile[name]["count"], 120, name)
+			self.assertEqual(sum(profile[name]["bucket_counts"]), 120, name)
+			self.assertLessEqual(profile[name]["p50_us"], profile[name]["p99_us"])
+			self.assertLessEqual(profile[name]["p99_us"], profile[name]["max_us"])
+		self.assertGreater(profile["frame"]["max_us"], 0)
+
+		with tempfile.TemporaryDirectory() as directory:
+			path = os.path.join(directory, "trace.json")
+			game_state.profiler.write_chrome_trace(path)
+			with open(path) as f:
+				trace = json.load(f)
+		frames = [event for event in trace["traceEvents"] if event["name"] == "frame"]
+		self.assertEqual(len(frames), 120)
+		for event in trace["traceEvents"]:
+			self.assertEqual(event["ph"], "X")
+			self.assertGreaterEqual(event["dur"], 0)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,213 @@
+import pymunk
+import pyglet
+from pymunk import pyglet_util
+import consts
+from fighter import Fighter
+from game import GameState
+
+# retained mode drawing of a match. every pyglet shape and label is made once, up front, and after that only moved, recolored, shown or hidden when the game state actually changes.
+# fighter bodies never rotate, so following a body is just moving a shape to the body's position plus the pymunk shape's offset.
+
+WALL_COLOR = (110, 110, 120, 255)
+FACING_TRIANGLE_COLOR = (255, 255, 255, 255)
+# world units
+FACING_TRIANGLE_SIZE = 6
+# world units above the fighter's center
+LABEL_HEIGHT = 10
+
+# draw order, back to front
+WALL_LAYER = 0
+HURTBOX_LAYER = 1
+HITBOX_LAYER = 2
+HUD_LAYER = 3
+
+# pyglet shapes that are only ever moved with their position, or shown and hidden, have to be ones whose vertices don't depend on their position.
+# circles and polygons are like that. lines and triangles rebuild their vertices from the position when shown again, so those are made out of polygons instead.
+
+def make_polygon_part(points: list[tuple[float, float]], scale: float, color: tuple[int, int, int, int], batch: pyglet.graphics.Batch, group: pyglet.graphics.Group) -> tuple[pyglet.shapes.Polygon, tuple[float, float]]:
+	"""
+		### Returns:
+			the polygon, and the offset of its anchor from the origin of points, in world units
+	"""
+	polygon = pyglet.shapes.Polygon(*[(x*scale, y*scale) for (x, y) in points], color=color, batch=batch, group=group)
+	return polygon, points[0]
+
+class ShapeSprite():
+	def __init__(self, shape: pymunk.Shape, pixels_per_world_unit: float, color: tuple[int, int, int, int], batch: pyglet.graphics.Batch, group: pyglet.graphics.Group):
+		"""
+			pyglet shapes that mirror a pymunk shape. their vertices are made once relative to the shape's body, and update() only moves them
+		"""
+		scale = pixels_per_world_unit
+		self.scale = scale
+		# (pyglet shape, offset of the pyglet shape's position from the body's position in world units)
+		self.parts: list[tuple[pyglet.shapes.ShapeBase, tuple[float, float]]] = []
+		if isinstance(shape, pymunk.Circle):
+			self.parts.append((pyglet.shapes.Circle(0, 0, shape.radius*scale, color=color, batch=batch, group=group), tuple(shape.offset)))
+		elif isinstance(shape, pymunk.Segment):
+			# a segment with a radius is a capsule: a rectangle between the two ends, with a circle at each end
+			(a, b) = (shape.a, shape.b)
+			side = (b - a).perpendicular_normal() * max(shape.radius, 0.5/scale)
+			self.parts.append(make_polygon_part([tuple(a + side), tuple(b + side), tuple(b - side), tuple(a - side)], scale, color, batch, group))
+			for end in (a, b):
+				self.parts.append((pyglet.shapes.Circle(0, 0, shape.radius*scale, color=color, batch=batch, group=group), tuple(end)))
+		else:
+			self.parts.append(make_polygon_part([tuple(v) for v in shape.get_vertices()], scale, color, batch, group))
+		self.position: tuple[float, float]|None = None
+		self.color = color
+		self.visible = True
+
+	def update(self, body_position: tuple[float, float]):
+		if body_position == self.position:
+			return
+		self.position = body_position
+		scale = self.scale
+		for (drawable, offset) in self.parts:
+			drawable.position = ((body_position[0] + offset[0]) * scale, (body_position[1] + offset[1]) * scale)
+
+	def set_color(self, color: tuple[int, int, int, int]):
+		if color != self.color:
+			self.color = color
+			for (drawable, _) in self.parts:
+				drawable.color = color
+
+	def set_visible(self, visible: bool):
+		if visible != self.visible:
+			self.visible = visible
+			for (drawable, _) in self.parts:
+				drawable.visible = visible
+
+class FighterView():
+	def __init__(self, game_state: GameState, fighter: Fighter, pixels_per_world_unit: float, batch: pyglet.graphics.Batch, groups: list[pyglet.graphics.Group]):
+		self.game_state = game_state
+		self.fighter = fighter
+		self.scale = pixels_per_world_unit
+		self.batch = batch
+		self.groups = groups
+		self.hurtbox_sprites = [ShapeSprite(shape, pixels_per_world_unit, consts.HURTBOX_COLOR, batch, groups[HURTBOX_LAYER]) for shape in fighter.hurtbox_shapes]
+
+		# hitbox shapes are only made once their cast first goes active, so their sprites are made the first time they're live, and hidden after that until the shape is live again
+		self.hitbox_sprites: dict[pymunk.Shape, ShapeSprite] = {}
+		self.visible_hitbox_sprites: list[ShapeSprite] = []
+
+		# one triangle per side facing, pointing away from the fighter's center. only the one for the current side is shown
+		size = FACING_TRIANGLE_SIZE
+		self.facing_triangles: list[tuple[pyglet.shapes.Polygon, tuple[float, float]]] = []
+		for side_facing in (consts.FIGHTER_SIDE_FACING_LEFT, consts.FIGHTER_SIDE_FACING_RIGHT):
+			direction = -1 if side_facing == consts.FIGHTER_SIDE_FACING_LEFT else 1
+			points = [(-0.5*direction*size, -0.5*size), (-0.5*direction*size, 0.5*size), (0.5*direction*size, 0)]
+			(triangle, offset) = make_polygon_part(points, pixels_per_world_unit, FACING_TRIANGLE_COLOR, batch, groups[HUD_LAYER])
+			triangle.visible = side_facing == fighter.side_facing
+			self.facing_triangles.append((triangle, offset))
+		self.side_facing = fighter.side_facing
+
+		self.dmg_points = fighter.dmg_points
+		self.label = pyglet.text.Label(self.label_text(), font_name="Times New Roman", font_size=24, anchor_x="center", anchor_y="center", batch=batch, group=groups[HUD_LAYER])
+		self.is_dodging = False
+		self.position: tuple[float, float]|None = None
+
+	def label_text(self) -> str:
+		return "DP: {}".format(self.dmg_points)
+
+	def update(self, position: tuple[float, float]):
+		fighter = self.fighter
+		is_moved = position != self.position
+		self.position = position
+
+		if is_moved:
+			for sprite in self.hurtbox_sprites:
+				sprite.update(position)
+			self.label.position = (position[0] * self.scale, (position[1] + LABEL_HEIGHT) * self.scale)
+
+		if fighter.is_dodging != self.is_dodging:
+			self.is_dodging = fighter.is_dodging
+			color = consts.HURTBOX_DODGE_COLOR if fighter.is_dodging else consts.HURTBOX_COLOR
+			for sprite in self.hurtbox_sprites:
+				sprite.set_color(color)
+
+		if fighter.side_facing != self.side_facing:
+			self.facing_triangles[self.side_facing][0].visible = False
+			self.facing_triangles[fighter.side_facing][0].visible = True
+			self.side_facing = fighter.side_facing
+			is_moved = True
+		if is_moved:
+			(triangle, offset) = self.facing_triangles[self.side_facing]
+			triangle.position = ((position[0] + offset[0]) * self.scale, (position[1] + offset[1]) * self.scale)
+
+		if fighter.dmg_points != self.dmg_points:
+			self.dmg_points = fighter.dmg_points
+			self.label.text = self.label_text()
+
+		self.update_hitboxes(position)
+
+	def update_hitboxes(self, position: tuple[float, float]):
+		# only the current cast of the active attack can have live hitboxes
+		live_sprites = []
+		fighter = self.fighter
+		if fighter.active_attack_idx >= 0:
+			for shape in fighter.attacks[fighter.active_attack_idx].current_hitbox_shapes():
+				if self.game_state.is_hitbox_live(shape):
+					sprite = self.hitbox_sprites.get(shape)
+					if sprite == None:
+						sprite = ShapeSprite(shape, self.scale, getattr(shape, "color", consts.HITBOX_COLOR), self.batch, self.groups[HITBOX_LAYER])
+						self.hitbox_sprites[shape] = sprite
+					live_sprites.append(sprite)
+
+		for sprite in self.visible_hitbox_sprites:
+			if sprite not in live_sprites:
+				sprite.set_visible(False)
+		for sprite in live_sprites:
+			sprite.update(position)
+			sprite.set_visible(True)
+		self.visible_hitbox_sprites = live_sprites
+
+class DebugOverlay():
+	def __init__(self, game_state: GameState, pixels_per_world_unit: float):
+		"""
+			pymunk's debug drawing of every shape in the space, on top of the regular view. it rebuilds its draw objects on every draw, so it is meant to be switched on only while debugging
+		"""
+		self.game_state = game_state
+		self.transform = pymunk.Transform.scaling(pixels_per_world_unit)
+
+	def draw(self):
+		# a fresh batch every time, so the shapes drawn last frame don't pile up
+		batch = pyglet.graphics.Batch()
+		draw_options = pyglet_util.DrawOptions(batch=batch)
+		draw_options.transform = self.transform
+		self.game_state.physics_sim.debug_draw(draw_options)
+		batch.draw()
+
+class Renderer():
+	def __init__(self, game_state: GameState, pixels_per_world_unit: float, show_debug_overlay: bool = False):
+		self.game_state = game_state
+		self.batch = pyglet.graphics.Batch()
+		self.groups = [pyglet.graphics.Group(order=layer) for layer in (WALL_LAYER, HURTBOX_LAYER, HITBOX_LAYER, HUD_LAYER)]
+
+		# walls never move, so they are positioned once and never touched again
+		fighter_bodies = set(fighter.body for fighter in game_state.fighters)
+		self.wall_sprites = []
+		for shape in game_state.physics_sim.shapes:
+			if shape.body in fighter_bodies or shape.body.body_type != pymunk.Body.STATIC:
+				continue
+			sprite = ShapeSprite(shape, pixels_per_world_unit, WALL_COLOR, self.batch, self.groups[WALL_LAYER])
+			sprite.update(shape.body.position)
+			self.wall_sprites.append(sprite)
+
+		self.fighter_views = [FighterView(game_state, fighter, pixels_per_world_unit, self.batch, self.groups) for fighter in game_state.fighters]
+		self.debug_overlay = DebugOverlay(game_state, pixels_per_world_unit)
+		self.show_debug_overlay = show_debug_overlay
+
+	def toggle_debug_overlay(self):
+		self.show_debug_overlay = not self.show_debug_overlay
+
+	def draw(self, fighter_positions: list[tuple[float, float]]|None = None):
+		"""
+			### Parameters:
+				fighter_positions : where to draw every fighter, e.g. interpolated between frames. defaults to the bodies' positions
+		"""
+		if fighter_positions == None:
+			fighter_positions = [tuple(view.fighter.body.position) for view in self.fighter_views]
+		for (view, position) in zip(self.fighter_views, fighter_positions):
+			view.update(position)
+		self.batch.draw()
+		if self.show_debug_overlay:
+			self.debug_overlay.draw()
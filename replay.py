@@ -0,0 +1,225 @@
+import argparse
+import json
+import struct
+import sys
+import time
+import numpy
+import consts
+from game import GameState, STAGE_NAME, HIT_DETECTION_SOLVER, step_game
+
+# a replay is everything needed to play a match back: a header describing the setup, then one byte per fighter per frame holding the packed input flags.
+#
+# file layout, little endian:
+#	magic (4 bytes), format version (u16), engine version (u16), fighter count (u16), metadata length (u32), frame count (u32)
+#	metadata: utf-8 json with the stage name, every fighter's moveset and team, and the hit detection mode
+#	inputs: frame count * fighter count bytes, frame major. byte i of a frame is fighter i's Input.current_bits
+#
+# the inputs start at a known offset and are plain bytes, so a replay can be memory mapped instead of read.
+
+REPLAY_MAGIC = b"BBRP"
+REPLAY_FORMAT_VERSION = 1
+HEADER_STRUCT = struct.Struct("<4sHHHII")
+# offset of the frame count within the header, which gets patched in once recording is done
+FRAME_COUNT_OFFSET = HEADER_STRUCT.size - 4
+
+def fighter_movesets(game_state: GameState) -> list[list[str]]:
+	return [[attack.name for attack in fighter.attacks] for fighter in game_state.fighters]
+
+def fighter_moveset_hashes(game_state: GameState) -> list[str|None]:
+	return [fighter.moveset.content_hash for fighter in game_state.fighters]
+
+def fighter_teams(game_state: GameState) -> list[int]:
+	return [fighter.team for fighter in game_state.fighters]
+
+class ReplayHeader():
+	def __init__(self, engine_version: int, stage: str, movesets: list[list[str]], frame_count: int = 0, hit_detection: str = HIT_DETECTION_SOLVER, teams: list[int]|None = None, exact_restore: bool = False, moveset_hashes: list[str|None]|None = None):
+		"""
+			### Parameters:
+				movesets : attack names of every fighter, in the order of the fighter's attack list
+				hit_detection : the game state's hit detection mode
+				teams : team of every fighter. by default every fighter is on a team of its own
+				exact_restore : whether the game state was made with exact_restore, which changes how matches play out
+				moveset_hashes : content hash of every fighter's moveset file, so a balance edit that keeps the attack names is still caught
+		"""
+		self.engine_version = engine_version
+		self.stage = stage
+		self.movesets = movesets
+		self.frame_count = frame_count
+		self.hit_detection = hit_detection
+		self.teams = teams if teams != None else list(range(len(movesets)))
+		self.exact_restore = exact_restore
+		self.moveset_hashes = moveset_hashes
+
+	@property
+	def fighter_count(self) -> int:
+		return len(self.movesets)
+
+	def encode(self) -> bytes:
+		metadata = json.dumps({"stage": self.stage, "movesets": self.movesets, "hit_detection": self.hit_detection, "teams": self.teams, "exact_restore": self.exact_restore, "moveset_hashes": self.moveset_hashes}, separators=(",", ":")).encode("utf-8")
+		return HEADER_STRUCT.pack(REPLAY_MAGIC, REPLAY_FORMAT_VERSION, self.engine_version, self.fighter_count, len(metadata), self.frame_count) + metadata
+
+	@staticmethod
+	def decode(data: bytes) -> tuple["ReplayHeader", int]:
+		"""
+			### Returns:
+				the header, and the offset at which the inputs start
+		"""
+		if len(data) < HEADER_STRUCT.size:
+			raise ValueError("replay is too short to hold a header")
+		(magic, format_version, engine_version, fighter_count, metadata_length, frame_count) = HEADER_STRUCT.unpack_from(data)
+		if magic != REPLAY_MAGIC:
+			raise ValueError("not a replay file")
+		if format_version != REPLAY_FORMAT_VERSION:
+			raise ValueError("unsupported replay format version {}".format(format_version))
+		data_offset = HEADER_STRUCT.size + metadata_length
+		metadata = json.loads(bytes(data[HEADER_STRUCT.size:data_offset]).decode("utf-8"))
+		# replays from before hit detection, teams and exact restores could be chosen were all recorded with the solver, every fighter on its own team, and no exact restores.
+		# replays from before moveset hashes were recorded have none, and can't be checked against the moveset files
+		header = ReplayHeader(engine_version, metadata["stage"], metadata["movesets"], frame_count, metadata.get("hit_detection", HIT_DETECTION_SOLVER), metadata.get("teams"), metadata.get("exact_restore", False), metadata.get("moveset_hashes"))
+		if header.fighter_count != fighter_count:
+			raise ValueError("replay header has {} fighters but {} movesets".format(fighter_count, header.fighter_count))
+		return header, data_offset
+
+	def check_compatible(self, game_state: GameState):
+		"""
+			raises ValueError if the replay would not play out the same way it was recorded in game_state
+		"""
+		if self.engine_version != consts.ENGINE_VERSION:
+			raise ValueError("replay was recorded with engine version {}, running {}".format(self.engine_version, consts.ENGINE_VERSION))
+		if self.stage != STAGE_NAME:
+			raise ValueError("replay was recorded on stage {}".format(self.stage))
+		if self.movesets != fighter_movesets(game_state):
+			raise ValueError("replay fighters don't match the game state's fighters")
+		if self.moveset_hashes != fighter_moveset_hashes(game_state):
+			raise ValueError("replay was recorded with different moveset files")
+		if self.teams != fighter_teams(game_state):
+			raise ValueError("replay teams don't match the game state's teams")
+		if self.hit_detection != game_state.hit_detection:
+			raise ValueError("replay was recorded with {} hit detection".format(self.hit_detection))
+		if self.exact_restore != game_state.exact_restore:
+			raise ValueError("replay was recorded with exact_restore {}".format(self.exact_restore))
+
+class ReplayRecorder():
+	def __init__(self, path: str, game_state: GameState, buffer_frames: int = 4096):
+		"""
+			writes a replay of game_state to path. call record_frame once per frame, after the inputs are set and before the frame is stepped.
+			frames are buffered and written in batches of buffer_frames.
+		"""
+		self.game_state = game_state
+		self.header = ReplayHeader(consts.ENGINE_VERSION, STAGE_NAME, fighter_movesets(game_state), hit_detection=game_state.hit_detection, teams=fighter_teams(game_state), exact_restore=game_state.exact_restore, moveset_hashes=fighter_moveset_hashes(game_state))
+		self.inputs = [fighter.input for fighter in game_state.fighters]
+		self.buffer = bytearray()
+		self.buffer_size = buffer_frames * len(self.inputs)
+		self.frame_count = 0
+		self.file = open(path, "wb")
+		self.file.write(self.header.encode())
+
+	def record_frame(self):
+		buffer = self.buffer
+		for fighter_input in self.inputs:
+			buffer.append(fighter_input.current_bits)
+		self.frame_count += 1
+		if len(buffer) >= self.buffer_size:
+			self.flush()
+
+	def flush(self):
+		self.file.write(self.buffer)
+		self.buffer.clear()
+
+	def close(self):
+		if self.file.closed:
+			return
+		self.flush()
+		self.file.seek(FRAME_COUNT_OFFSET)
+		self.file.write(struct.pack("<I", self.frame_count))
+		self.file.close()
+		self.header.frame_count = self.frame_count
+
+	def __enter__(self) -> "ReplayRecorder":
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+
+class Replay():
+	def __init__(self, header: ReplayHeader, inputs: numpy.ndarray):
+		"""
+			### Parameters:
+				inputs : uint8 array of shape (frame count, fighter count) holding the packed inputs
+		"""
+		self.header = header
+		self.inputs = inputs
+
+	@staticmethod
+	def load(path: str) -> "Replay":
+		"""
+			memory maps the replay file, so only the frames that are played back get paged in
+		"""
+		with open(path, "rb") as f:
+			header_start = f.read(HEADER_STRUCT.size)
+			if len(header_start) == HEADER_STRUCT.size:
+				metadata_length = HEADER_STRUCT.unpack(header_start)[4]
+				header_start += f.read(metadata_length)
+		(header, data_offset) = ReplayHeader.decode(header_start)
+		shape = (header.frame_count, header.fighter_count)
+		if header.frame_count == 0:
+			inputs = numpy.zeros(shape, dtype=numpy.uint8)
+		else:
+			inputs = numpy.memmap(path, dtype=numpy.uint8, mode="r", offset=data_offset, shape=shape)
+		return Replay(header, inputs)
+
+	@staticmethod
+	def from_bytes(data: bytes) -> "Replay":
+		(header, data_offset) = ReplayHeader.decode(data)
+		inputs = numpy.frombuffer(data, dtype=numpy.uint8, count=header.frame_count * header.fighter_count, offset=data_offset)
+		return Replay(header, inputs.reshape(header.frame_count, header.fighter_count))
+
+	@property
+	def frame_count(self) -> int:
+		return self.header.frame_count
+
+def play_replay(replay: Replay, game_state: GameState|None = None, frame_count: int|None = None, chunk_frames: int = 4096) -> GameState:
+	"""
+		plays the replay back as fast as possible, with no window. game_state is reset first; a new one, with the replay's hit detection, teams and exact_restore, is made if not given.
+
+		### Parameters:
+			frame_count : stop after this many frames instead of playing the whole replay
+	"""
+	if game_state == None:
+		game_state = GameState(replay.header.hit_detection, replay.header.teams, exact_restore=replay.header.exact_restore)
+	replay.header.check_compatible(game_state)
+	game_state.reset()
+
+	end = replay.frame_count if frame_count == None else min(frame_count, replay.frame_count)
+	inputs = [fighter.input for fighter in game_state.fighters]
+	for chunk_start in range(0, end, chunk_frames):
+		# converting a chunk at a time keeps numpy scalars out of the hot loop, without loading the whole replay at once
+		for frame_bits in replay.inputs[chunk_start:min(chunk_start + chunk_frames, end)].tolist():
+			for (fighter_input, bits) in zip(inputs, frame_bits):
+				fighter_input.current_bits = bits
+			step_game(game_state)
+	return game_state
+
+def main(argv: list[str]|None = None):
+	parser = argparse.ArgumentParser(description="play a replay back headlessly and print how the match ended")
+	parser.add_argument("path")
+	parser.add_argument("--profile", type=str, default=None, help="time every phase of every frame, and write the histograms to PROFILE.json and a chrome trace to PROFILE.trace.json")
+	args = parser.parse_args(argv)
+
+	replay = Replay.load(args.path)
+	header = replay.header
+	print("engine version {}, stage {}, {} fighters, {} frames".format(header.engine_version, header.stage, header.fighter_count, header.frame_count), file=sys.stderr)
+	game_state = GameState(header.hit_detection, header.teams, exact_restore=header.exact_restore)
+	if args.profile != None:
+		game_state.profiler.enable(trace=True)
+	start = time.perf_counter()
+	play_replay(replay, game_state)
+	elapsed = time.perf_counter() - start
+	if args.profile != None:
+		game_state.profiler.write_json(args.profile + ".json")
+		game_state.profiler.write_chrome_trace(args.profile + ".trace.json")
+	print("played in {:.2f}s ({:.0f} frames/s)".format(elapsed, replay.frame_count / max(elapsed, 1e-9)), file=sys.stderr)
+	print(json.dumps({"frames": game_state.frame, "dmg_points": [fighter.dmg_points for fighter in game_state.fighters]}))
+
+if __name__ == "__main__":
+	main()
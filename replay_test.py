@@ -0,0 +1,123 @@
+import unittest
+import os
+import tempfile
+from replay import *
+from game import HIT_DETECTION_QUERY
+from test_helpers import RandomInputs, fighter_states
+
+class TestReplay(unittest.TestCase):
+
+	def setUp(self):
+		self.tmp_dir = tempfile.TemporaryDirectory()
+		self.path = os.path.join(self.tmp_dir.name, "match.bbrp")
+
+	def tearDown(self):
+		self.tmp_dir.cleanup()
+
+	def record_random_match(self, frame_count: int, hit_detection: str = HIT_DETECTION_SOLVER, teams: list[int]|None = None, exact_restore: bool = False) -> GameState:
+		game_state = GameState(hit_detection, teams, exact_restore=exact_restore)
+		inputs = RandomInputs(5, len(game_state.fighters), 0.06)
+		with ReplayRecorder(self.path, game_state, buffer_frames=64) as recorder:
+			for _ in range(frame_count):
+				for (fighter, fighter_input) in zip(game_state.fighters, inputs.next_inputs()):
+					fighter.input.current[:] = fighter_input
+				recorder.record_frame()
+				step_game(game_state)
+		return game_state
+
+	def test_playback_matches_recording(self):
+		recorded = self.record_random_match(500)
+		replay = Replay.load(self.path)
+		self.assertEqual(replay.frame_count, 500)
+		self.assertEqual(replay.inputs.shape, (500, 2))
+		self.assertEqual(replay.header.movesets, fighter_movesets(recorded))
+		# one byte per fighter per frame after the header
+		self.assertEqual(os.path.getsize(self.path), len(replay.header.encode()) + 500 * 2)
+
+		played = play_replay(replay)
+		self.assertEqual(played.frame, 500)
+		self.assertEqual(fighter_states(played), fighter_states(recorded))
+
+	def test_records_hit_detection(self):
+		recorded = self.record_random_match(300, HIT_DETECTION_QUERY)
+		replay = Replay.load(self.path)
+		self.assertEqual(replay.header.hit_detection, HIT_DETECTION_QUERY)
+		played = play_replay(replay)
+		self.assertEqual(played.hit_detection, HIT_DETECTION_QUERY)
+		self.assertEqual(fighter_states(played), fighter_states(recorded))
+		with self.assertRaises(ValueError):
+			play_replay(replay, GameState(HIT_DETECTION_SOLVER))
+
+	def test_records_exact_restore(self):
+		recorded = self.record_random_match(300, exact_restore=True)
+		replay = Replay.load(self.path)
+		self.assertTrue(replay.header.exact_restore)
+		played = play_replay(replay)
+		self.assertTrue(played.exact_restore)
+		self.assertEqual(fighter_states(played), fighter_states(recorded))
+		with self.assertRaises(ValueError):
+			play_replay(replay, GameState())
+
+	def test_records_teams(self):
+		recorded = self.record_random_match(300, teams=[1, 1])
+		replay = Replay.load(self.path)
+		self.assertEqual(replay.header.teams, [1, 1])
+		played = play_replay(replay)
+		self.assertEqual(fighter_teams(played), [1, 1])
+		self.assertEqual(fighter_states(played), fighter_states(recorded))
+		with self.assertRaises(ValueError):
+			play_replay(replay, GameState())
+
+	def test_records_fighter_count(self):
+		recorded = self.record_random_match(300, teams=[0, 0, 1, 1])
+		replay = Replay.load(self.path)
+		self.assertEqual(replay.header.fighter_count, 4)
+		played = play_replay(replay)
+		self.assertEqual(len(played.fighters), 4)
+		self.assertEqual(fighter_states(played), fighter_states(recorded))
+
+	def test_from_bytes_matches_load(self):
+		self.record_random_match(100)
+		with open(self.path, "rb") as f:
+			from_bytes = Replay.from_bytes(f.read())
+		self.assertEqual(from_bytes.inputs.tolist(), Replay.load(self.path).inputs.tolist())
+
+	def test_rejects_previous_engine_version(self):
+		# a replay from before the last change to the simulation would play out differently, so it has to be turned away instead of played
+		self.record_random_match(100)
+		replay = Replay.load(self.path)
+		header = replay.header
+		old_header = ReplayHeader(consts.ENGINE_VERSION - 1, header.stage, header.movesets, header.frame_count, header.hit_detection, header.teams, header.exact_restore, header.moveset_hashes)
+		old_replay = Replay.from_bytes(old_header.encode() + replay.inputs.tobytes())
+		self.assertEqual(old_replay.header.engine_version, consts.ENGINE_VERSION - 1)
+		self.assertEqual(old_replay.inputs.tolist(), replay.inputs.tolist())
+		with self.assertRaises(ValueError):
+			old_replay.header.check_compatible(GameState())
+		with self.assertRaises(ValueError):
+			play_replay(old_replay)
+
+	def test_rejects_edited_moveset(self):
+		# a balance edit to a moveset file keeps the attack names, so only the content hash tells the matches apart
+		self.record_random_match(100)
+		replay = Replay.load(self.path)
+		header = replay.header
+		self.assertEqual(header.moveset_hashes, fighter_moveset_hashes(GameState()))
+		self.assertTrue(all(moveset_hash != None for moveset_hash in header.moveset_hashes))
+		edited_hashes = ["0" * 64] + header.moveset_hashes[1:]
+		edited_header = ReplayHeader(header.engine_version, header.stage, header.movesets, header.frame_count, header.hit_detection, header.teams, header.exact_restore, edited_hashes)
+		edited_replay = Replay.from_bytes(edited_header.encode() + replay.inputs.tobytes())
+		self.assertEqual(edited_replay.header.moveset_hashes, edited_hashes)
+		with self.assertRaises(ValueError):
+			edited_replay.header.check_compatible(GameState())
+		with self.assertRaises(ValueError):
+			play_replay(edited_replay)
+
+	def test_rejects_bad_files(self):
+		with self.assertRaises(ValueError):
+			Replay.from_bytes(b"not a replay at all, just some bytes")
+		header = ReplayHeader(consts.ENGINE_VERSION + 1, STAGE_NAME, fighter_movesets(GameState()))
+		with self.assertRaises(ValueError):
+			play_replay(Replay.from_bytes(header.encode()))
+
+if __name__ == '__main__':
+	unittest.main()
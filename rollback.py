@@ -0,0 +1,224 @@
+import heapq
+import random
+import time
+import consts
+import input
+from game import GameState, step_game
+from snapshot import Snapshot, Snapshotter
+
+# rollback netcode. every peer runs the whole match, and only sends the inputs of the fighters it controls.
+# remote inputs that haven't arrived yet are predicted. when a remote input arrives that contradicts the prediction, the match is rolled back to that frame and re-simulated with the real input.
+# a snapshot is taken before every simulated frame. taking one never changes the match, and with a game state made with exact_restore, restoring one continues it exactly.
+# so every peer, and an exact_restore match that was never rolled back, end up in sync bit for bit. snapshot.py has the one exception, solver hit detection with more than two fighters.
+
+# time available for re-simulating frames, before it eats into the next frame
+FRAME_BUDGET_SECONDS = consts.TIMESTEP
+
+class Transport():
+	"""
+		carries packed inputs between peers. anything with the same send and receive methods can be used by RollbackSession
+	"""
+	def send(self, frame: int, fighter_idx: int, bits: int):
+		raise NotImplementedError
+	def receive(self) -> list[tuple[int, int, int]]:
+		"""
+			returns every (frame, fighter_idx, bits) message that arrived since the last call. called once per frame by the session
+		"""
+		raise NotImplementedError
+
+class LoopbackTransport(Transport):
+	def __init__(self, latency_frames: int = 0, jitter_frames: int = 0, seed: int = 0):
+		"""
+			an in-process transport for testing. a message sent now arrives latency_frames plus up to jitter_frames receive calls later on the peer, so jitter can reorder messages
+		"""
+		self.latency_frames = latency_frames
+		self.jitter_frames = jitter_frames
+		self.rng = random.Random(seed)
+		self.peer: LoopbackTransport|None = None
+		# counts receive calls, which happen once per frame
+		self.clock = 0
+		self.sent_count = 0
+		# heap of (delivery clock, send order, message)
+		self.in_flight: list[tuple[int, int, tuple[int, int, int]]] = []
+
+	@staticmethod
+	def create_pair(latency_frames: int = 0, jitter_frames: int = 0, seed: int = 0) -> tuple["LoopbackTransport", "LoopbackTransport"]:
+		a = LoopbackTransport(latency_frames, jitter_frames, seed)
+		b = LoopbackTransport(latency_frames, jitter_frames, seed + 1)
+		a.peer = b
+		b.peer = a
+		return a, b
+
+	def send(self, frame: int, fighter_idx: int, bits: int):
+		deliver_at = self.peer.clock + self.latency_frames + self.rng.randint(0, self.jitter_frames)
+		heapq.heappush(self.peer.in_flight, (deliver_at, self.sent_count, (frame, fighter_idx, bits)))
+		self.sent_count += 1
+
+	def receive(self) -> list[tuple[int, int, int]]:
+		self.clock += 1
+		messages = []
+		while len(self.in_flight) > 0 and self.in_flight[0][0] <= self.clock:
+			messages.append(heapq.heappop(self.in_flight)[2])
+		return messages
+
+class RollbackMetrics():
+	def __init__(self, max_rollback_frames: int):
+		self.frames_advanced = 0
+		self.rollbacks = 0
+		self.frames_resimulated = 0
+		self.max_rollback_depth = 0
+		# rollback_depths[d] is how many rollbacks went back d frames
+		self.rollback_depths = [0] * (max_rollback_frames + 1)
+		self.resimulation_seconds = 0.0
+		self.max_resimulation_seconds = 0.0
+		# rollbacks whose re-simulation took longer than FRAME_BUDGET_SECONDS
+		self.budget_overruns = 0
+		# frames that couldn't advance because the remote inputs were too far behind
+		self.stalls = 0
+
+	def to_dict(self) -> dict:
+		return dict(self.__dict__)
+
+class RollbackSession():
+	def __init__(self, game_state: GameState, local_fighters: list[int], transport: Transport, max_rollback_frames: int = 8):
+		"""
+			### Parameters:
+				game_state : has to be made with exact_restore, or peers would drift apart after rolling back
+				local_fighters : indices of the fighters whose inputs come from this peer. every other fighter is remote
+				max_rollback_frames : how far remote inputs can lag behind before the session stalls instead of predicting further ahead
+		"""
+		if not game_state.exact_restore:
+			raise ValueError("rollback needs a game state made with exact_restore")
+		self.game_state = game_state
+		self.local_fighters = local_fighters
+		self.remote_fighters = [idx for idx in range(len(game_state.fighters)) if idx not in local_fighters]
+		self.transport = transport
+		self.max_rollback_frames = max_rollback_frames
+		self.snapshotter = Snapshotter(game_state)
+		self.snapshots = [Snapshot() for _ in range(max_rollback_frames + 2)]
+		self.metrics = RollbackMetrics(max_rollback_frames)
+
+		fighter_count = len(game_state.fighters)
+		# inputs known for certain, keyed by frame. remote inputs can arrive ahead of the frame being simulated
+		self.confirmed_inputs: dict[int, list[int|None]] = {}
+		# inputs the simulation actually ran with, keyed by frame. these are what predictions get checked against
+		self.used_inputs: dict[int, list[int]] = {}
+		# the latest confirmed input of every fighter, which is what gets predicted for frames that haven't been confirmed
+		self.last_confirmed_bits = [0] * fighter_count
+		self.last_confirmed_frame = [-1] * fighter_count
+		# inputs confirmed in order without gaps, up to this frame
+		self.contiguous_confirmed_frame = [-1] * fighter_count
+
+	@property
+	def frame(self) -> int:
+		return self.game_state.frame
+
+	@property
+	def confirmed_frame(self) -> int:
+		"""
+			the latest frame for which every remote input has arrived. nothing at or before it can be rolled back anymore
+		"""
+		return min((self.contiguous_confirmed_frame[idx] for idx in self.remote_fighters), default=self.frame - 1)
+
+	def advance_frame(self, local_inputs: list[list[bool]]) -> bool:
+		"""
+			simulates one frame, after rolling back if a remote input contradicted a prediction.
+
+			### Parameters:
+				local_inputs : one entry per fighter in local_fighters, in the layout of input.Input.current
+			### Returns:
+				False if the session stalled, because remote inputs lag behind by more than max_rollback_frames. the caller should try again on the next tick
+		"""
+		rollback_frame = self._poll()
+		if rollback_frame != None:
+			self._rollback(rollback_frame)
+
+		if self.frame - self.confirmed_frame > self.max_rollback_frames:
+			self.metrics.stalls += 1
+			return False
+
+		frame = self.frame
+		for (fighter_idx, fighter_input) in zip(self.local_fighters, local_inputs):
+			bits = input.pack_input(fighter_input)
+			self._confirm(frame, fighter_idx, bits)
+			self.transport.send(frame, fighter_idx, bits)
+
+		self._simulate_frame(take_snapshot=True)
+		self.metrics.frames_advanced += 1
+
+		# frames older than the snapshot ring can never be rolled back to
+		oldest_frame = self.frame - len(self.snapshots)
+		for old_frame in [f for f in self.used_inputs if f < oldest_frame]:
+			del self.used_inputs[old_frame]
+			self.confirmed_inputs.pop(old_frame, None)
+		return True
+
+	def _confirmed_inputs_for(self, frame: int) -> list[int|None]:
+		frame_inputs = self.confirmed_inputs.get(frame)
+		if frame_inputs == None:
+			frame_inputs = [None] * len(self.game_state.fighters)
+			self.confirmed_inputs[frame] = frame_inputs
+		return frame_inputs
+
+	def _confirm(self, frame: int, fighter_idx: int, bits: int):
+		self._confirmed_inputs_for(frame)[fighter_idx] = bits
+		if frame > self.last_confirmed_frame[fighter_idx]:
+			self.last_confirmed_frame[fighter_idx] = frame
+			self.last_confirmed_bits[fighter_idx] = bits
+		contiguous = self.contiguous_confirmed_frame[fighter_idx]
+		while True:
+			next_inputs = self.confirmed_inputs.get(contiguous + 1)
+			if next_inputs == None or next_inputs[fighter_idx] == None:
+				break
+			contiguous += 1
+		self.contiguous_confirmed_frame[fighter_idx] = contiguous
+
+	def _poll(self) -> int|None:
+		"""
+			takes in remote inputs, and returns the earliest simulated frame whose prediction turned out to be wrong
+		"""
+		rollback_frame = None
+		for (frame, fighter_idx, bits) in self.transport.receive():
+			self._confirm(frame, fighter_idx, bits)
+			used = self.used_inputs.get(frame)
+			if frame < self.frame and used != None and used[fighter_idx] != bits:
+				if rollback_frame == None or frame < rollback_frame:
+					rollback_frame = frame
+		return rollback_frame
+
+	def _simulate_frame(self, take_snapshot: bool):
+		frame = self.frame
+		if take_snapshot:
+			self.snapshotter.take(self.snapshots[frame % len(self.snapshots)])
+
+		confirmed = self._confirmed_inputs_for(frame)
+		frame_inputs = []
+		for (fighter_idx, fighter) in enumerate(self.game_state.fighters):
+			bits = confirmed[fighter_idx]
+			if bits == None:
+				bits = self.last_confirmed_bits[fighter_idx]
+			frame_inputs.append(bits)
+			fighter.input.current_bits = bits
+		self.used_inputs[frame] = frame_inputs
+		step_game(self.game_state)
+
+	def _rollback(self, rollback_frame: int):
+		start = time.perf_counter()
+		current_frame = self.frame
+		depth = current_frame - rollback_frame
+		self.snapshotter.restore(self.snapshots[rollback_frame % len(self.snapshots)])
+		# the snapshot of the first frame was just restored, so it doesn't need to be taken again
+		self._simulate_frame(take_snapshot=False)
+		while self.frame < current_frame:
+			self._simulate_frame(take_snapshot=True)
+		elapsed = time.perf_counter() - start
+
+		metrics = self.metrics
+		metrics.rollbacks += 1
+		metrics.frames_resimulated += depth
+		metrics.max_rollback_depth = max(metrics.max_rollback_depth, depth)
+		metrics.rollback_depths[min(depth, len(metrics.rollback_depths)-1)] += 1
+		metrics.resimulation_seconds += elapsed
+		metrics.max_resimulation_seconds = max(metrics.max_resimulation_seconds, elapsed)
+		if elapsed > FRAME_BUDGET_SECONDS:
+			metrics.budget_overruns += 1
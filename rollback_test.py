@@ -0,0 +1,74 @@
+import unittest
+from rollback import *
+import input
+from test_helpers import RandomInputs, fighter_states
+
+class TestRollbackSession(unittest.TestCase):
+
+	def run_peers(self, latency_frames: int, jitter_frames: int, active_frames: int = 240, max_rollback_frames: int = 8):
+		"""
+			runs two peers over a loopback transport. each peer controls one fighter. after active_frames, both fighters stop pressing anything so every prediction at the end is right
+		"""
+		settle_frames = latency_frames + jitter_frames + 2
+		total_frames = active_frames + settle_frames
+		scripts = [[frame_inputs[0] for frame_inputs in RandomInputs(seed, 1, 0.08).frames(active_frames)] + [[False] * input.INPUT_COUNT] * settle_frames for seed in (11, 12)]
+
+		transport_a, transport_b = LoopbackTransport.create_pair(latency_frames, jitter_frames, seed=3)
+		peers = [
+			RollbackSession(GameState(exact_restore=True), [0], transport_a, max_rollback_frames),
+			RollbackSession(GameState(exact_restore=True), [1], transport_b, max_rollback_frames),
+		]
+		# frames each peer showed each fighter standing on something
+		self.grounded_frames = [[0] * len(scripts) for _ in peers]
+		while any(peer.frame < total_frames for peer in peers):
+			for (fighter_idx, peer) in enumerate(peers):
+				if peer.frame < total_frames:
+					peer.advance_frame([scripts[fighter_idx][peer.frame]])
+					for (idx, fighter) in enumerate(peer.game_state.fighters):
+						self.grounded_frames[fighter_idx][idx] += fighter.is_grounded
+
+		# rolling back has to end up the same as a match that never even took a snapshot
+		reference = GameState(exact_restore=True)
+		for frame in range(total_frames):
+			reference.step([scripts[0][frame], scripts[1][frame]])
+		return peers, reference
+
+	def assert_fighters_land(self):
+		# grounding comes from the wall contacts, which snapshots have to carry over
+		for peer_grounded_frames in self.grounded_frames:
+			for grounded_frames in peer_grounded_frames:
+				self.assertGreater(grounded_frames, 0)
+
+	def test_no_latency_never_rolls_back(self):
+		peers, reference = self.run_peers(latency_frames=0, jitter_frames=0)
+		# the second peer always has the first peer's input for the frame it is about to simulate. the first peer is still a frame ahead, so it has to predict
+		self.assertEqual(peers[1].metrics.rollbacks, 0)
+		self.assertLessEqual(peers[0].metrics.max_rollback_depth, 1)
+		for peer in peers:
+			self.assertEqual(fighter_states(peer.game_state), fighter_states(reference))
+		self.assert_fighters_land()
+
+	def test_peers_converge_after_rollbacks(self):
+		peers, reference = self.run_peers(latency_frames=4, jitter_frames=3)
+		for peer in peers:
+			self.assertGreater(peer.metrics.rollbacks, 0)
+			self.assertLessEqual(peer.metrics.max_rollback_depth, peer.max_rollback_frames)
+			self.assertEqual(peer.metrics.frames_resimulated, sum(depth * count for (depth, count) in enumerate(peer.metrics.rollback_depths)))
+			self.assertEqual(fighter_states(peer.game_state), fighter_states(reference))
+		self.assert_fighters_land()
+
+	def test_stalls_when_remote_lags_too_far(self):
+		peers, reference = self.run_peers(latency_frames=6, jitter_frames=0, active_frames=60, max_rollback_frames=3)
+		for peer in peers:
+			self.assertGreater(peer.metrics.stalls, 0)
+			self.assertLessEqual(peer.metrics.max_rollback_depth, 3)
+			self.assertEqual(fighter_states(peer.game_state), fighter_states(reference))
+		self.assert_fighters_land()
+
+	def test_needs_exact_restore(self):
+		(transport, _) = LoopbackTransport.create_pair()
+		with self.assertRaises(ValueError):
+			RollbackSession(GameState(), [0], transport)
+
+if __name__ == '__main__':
+	unittest.main()
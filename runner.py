@@ -0,0 +1,166 @@
+import argparse
+import gc
+import json
+import multiprocessing
+import random
+import sys
+from typing import Iterable, Iterator
+from game import GameState, DEFAULT_FIGHTER_COUNT, parse_teams, step_game
+
+# runs large numbers of headless matches across a pool of worker processes. every worker builds a GameState for each team layout it's handed, and resets it between matches.
+
+class InputSource():
+	"""
+		produces one fighter's input for every frame of a match. sources are pickled and sent to the worker processes, so they have to be defined at module level
+	"""
+	def reset(self, seed: int):
+		pass
+	def next_input(self, game_state: GameState, fighter_idx: int) -> list[bool]:
+		raise NotImplementedError
+
+class IdleInputSource(InputSource):
+	def next_input(self, game_state: GameState, fighter_idx: int) -> list[bool]:
+		return [False] * 8
+
+class ScriptedInputSource(InputSource):
+	def __init__(self, frames: list[list[bool]], loop: bool = True):
+		"""
+			plays back a fixed list of inputs, one entry per frame. once the script runs out it either starts over, or keeps every input released
+		"""
+		self.frames = frames
+		self.loop = loop
+		self.frame_idx = 0
+	def reset(self, seed: int):
+		self.frame_idx = 0
+	def next_input(self, game_state: GameState, fighter_idx: int) -> list[bool]:
+		if self.frame_idx >= len(self.frames):
+			if not self.loop or len(self.frames) == 0:
+				return [False] * 8
+			self.frame_idx = 0
+		fighter_input = self.frames[self.frame_idx]
+		self.frame_idx += 1
+		return fighter_input
+
+class RandomInputSource(InputSource):
+	def __init__(self, toggle_chance: float = 0.05):
+		"""
+			a bot that flips every input with a chance of toggle_chance each frame. seeded per match so sweeps are reproducible
+		"""
+		self.toggle_chance = toggle_chance
+		self.rng = random.Random()
+		self.held = [False] * 8
+	def reset(self, seed: int):
+		self.rng.seed(seed)
+		self.held = [False] * 8
+	def next_input(self, game_state: GameState, fighter_idx: int) -> list[bool]:
+		for i in range(len(self.held)):
+			if self.rng.random() < self.toggle_chance:
+				self.held[i] = not self.held[i]
+		return self.held
+
+class MatchSpec():
+	def __init__(self, match_id: int, input_sources: list[InputSource], frame_count: int, seed: int = 0, teams: list[int]|None = None):
+		"""
+			### Parameters:
+				input_sources : one per fighter, so also how many fighters the match has
+				teams : team of every fighter. by default every fighter is on a team of its own
+		"""
+		self.match_id = match_id
+		self.input_sources = input_sources
+		self.frame_count = frame_count
+		self.seed = seed
+		self.teams = teams if teams != None else list(range(len(input_sources)))
+
+class MatchResult():
+	def __init__(self, match_id: int, winner: int|None, dmg_points: list[float], hits_per_attack: dict[str, int], frames_simulated: int):
+		"""
+			### Parameters:
+				winner : index of the fighter with the fewest damage points, or None on a tie
+		"""
+		self.match_id = match_id
+		self.winner = winner
+		self.dmg_points = dmg_points
+		self.hits_per_attack = hits_per_attack
+		self.frames_simulated = frames_simulated
+	def to_dict(self) -> dict:
+		return {
+			"match_id": self.match_id,
+			"winner": self.winner,
+			"dmg_points": self.dmg_points,
+			"hits_per_attack": self.hits_per_attack,
+			"frames_simulated": self.frames_simulated,
+		}
+
+# every worker process keeps its own game state around for all the matches it gets handed, one per team layout it has seen
+_worker_game_states: dict[tuple[int, ...], GameState] = {}
+
+def _worker_game_state(teams: list[int]) -> GameState:
+	game_state = _worker_game_states.get(tuple(teams))
+	if game_state == None:
+		game_state = GameState(teams=teams)
+		_worker_game_states[tuple(teams)] = game_state
+		# the game state is reused for every match, so keep the garbage collector from walking it
+		gc.freeze()
+	return game_state
+
+def run_match(game_state: GameState, spec: MatchSpec) -> MatchResult:
+	if len(game_state.fighters) != len(spec.input_sources):
+		raise ValueError("match {} has {} input sources for {} fighters".format(spec.match_id, len(spec.input_sources), len(game_state.fighters)))
+	game_state.reset()
+	for (fighter_idx, source) in enumerate(spec.input_sources):
+		source.reset(spec.seed * len(spec.input_sources) + fighter_idx)
+
+	fighters = game_state.fighters
+	sources = spec.input_sources
+	for _ in range(spec.frame_count):
+		for (fighter_idx, source) in enumerate(sources):
+			fighters[fighter_idx].input.current[:] = source.next_input(game_state, fighter_idx)
+		step_game(game_state)
+
+	dmg_points = [fighter.dmg_points for fighter in fighters]
+	least_dmg = min(dmg_points)
+	winner = None
+	if dmg_points.count(least_dmg) == 1:
+		winner = dmg_points.index(least_dmg)
+	return MatchResult(spec.match_id, winner, dmg_points, dict(game_state.hits_per_attack), game_state.frame)
+
+def _run_match_in_worker(spec: MatchSpec) -> MatchResult:
+	return run_match(_worker_game_state(spec.teams), spec)
+
+def run_matches(specs: Iterable[MatchSpec], worker_count: int|None = None, chunksize: int = 16) -> Iterator[MatchResult]:
+	"""
+		shards the matches across a process pool. results are yielded as soon as a worker finishes them, in completion order rather than submission order
+	"""
+	with multiprocessing.Pool(processes=worker_count) as pool:
+		for result in pool.imap_unordered(_run_match_in_worker, specs, chunksize=chunksize):
+			yield result
+
+def main(argv: list[str]|None = None):
+	parser = argparse.ArgumentParser(description="run headless matches between random bots and stream the results as json lines")
+	parser.add_argument("--matches", type=int, default=100)
+	parser.add_argument("--frames", type=int, default=60*60, help="frames simulated per match")
+	parser.add_argument("--workers", type=int, default=None, help="defaults to the number of cpus")
+	parser.add_argument("--chunksize", type=int, default=16)
+	parser.add_argument("--seed", type=int, default=0)
+	parser.add_argument("--fighters", type=int, default=DEFAULT_FIGHTER_COUNT, help="fighters per match")
+	parser.add_argument("--teams", type=parse_teams, default=None, help="comma separated team of every fighter, e.g. 0,0,1,1. defaults to a free for all")
+	parser.add_argument("--toggle-chance", type=float, default=0.05)
+	parser.add_argument("--out", type=str, default="-", help="file to write results to, or - for stdout")
+	args = parser.parse_args(argv)
+	fighter_count = len(args.teams) if args.teams != None else args.fighters
+
+	specs = (
+		MatchSpec(match_id, [RandomInputSource(args.toggle_chance) for _ in range(fighter_count)], args.frames, seed=args.seed + match_id, teams=args.teams)
+		for match_id in range(args.matches)
+	)
+	out = sys.stdout if args.out == "-" else open(args.out, "w")
+	try:
+		for result in run_matches(specs, args.workers, args.chunksize):
+			out.write(json.dumps(result.to_dict()) + "\n")
+			out.flush()
+	finally:
+		if out is not sys.stdout:
+			out.close()
+
+if __name__ == "__main__":
+	main()
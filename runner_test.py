@@ -0,0 +1,43 @@
+import unittest
+from runner import *
+import input
+from test_helpers import fighter_states
+
+class TestRunner(unittest.TestCase):
+
+	def spec(self, match_id: int) -> MatchSpec:
+		return MatchSpec(match_id, [RandomInputSource(0.1), RandomInputSource(0.1)], frame_count=400, seed=match_id)
+
+	def test_reused_game_state_matches_fresh_one(self):
+		reused = GameState()
+		reused_results = [run_match(reused, self.spec(match_id)).to_dict() for match_id in range(3)]
+		fresh_results = [run_match(GameState(), self.spec(match_id)).to_dict() for match_id in range(3)]
+		self.assertEqual(reused_results, fresh_results)
+
+	def test_reset_after_match_that_ends_grounded(self):
+		# the fighters land early and jump again on the next match's first frames. a reset that left the last match's wall contacts behind would let them jump from the ground right away
+		grounded_spec = MatchSpec(0, [IdleInputSource(), IdleInputSource()], frame_count=200)
+		jump = [False] * 8
+		jump[input.INPUT_JUMP] = True
+		jump_script = [jump, [False] * 8] * 3
+		jump_spec = MatchSpec(1, [ScriptedInputSource(jump_script, loop=False), ScriptedInputSource(jump_script, loop=False)], frame_count=30)
+
+		reused = GameState()
+		run_match(reused, grounded_spec)
+		for fighter in reused.fighters:
+			self.assertTrue(fighter.is_grounded)
+		reused_result = run_match(reused, jump_spec).to_dict()
+		fresh = GameState()
+		fresh_result = run_match(fresh, jump_spec).to_dict()
+		self.assertEqual(reused_result, fresh_result)
+		self.assertEqual(fighter_states(reused), fighter_states(fresh))
+
+	def test_run_matches_streams_every_result(self):
+		results = list(run_matches((self.spec(match_id) for match_id in range(6)), worker_count=2, chunksize=1))
+		self.assertEqual(sorted(result.match_id for result in results), list(range(6)))
+		for result in results:
+			self.assertEqual(result.frames_simulated, 400)
+			self.assertEqual(len(result.dmg_points), 2)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,111 @@
+from operator import attrgetter
+import pymunk
+from attack import Attack
+from fighter import Fighter
+from input import Input
+from game import GameState
+
+# saving and restoring every mutable value of a GameState. only mutable values are captured; frame data, hitbox shapes, and other values that never change after construction are shared with the live game state.
+# a snapshot can only be restored into the game state that it was taken from.
+#
+# chipmunk keeps solver state that pymunk can't read or write: the contact impulses cached on arbiters, and the bias velocity each body carries into the next step to push overlapping shapes apart.
+# taking a snapshot only reads values, so it never changes how the simulation goes on. whether a fighter stands on the ground is kept as a plain value on the fighter, so it is captured with the rest.
+# restoring drops the solver state the space is left with, since it belongs to the frames being thrown away. restoring the same snapshot always goes on the same way,
+# but the match it was taken from had its solver state, so the two drift apart by rounding errors that grow over time.
+# for that not to happen, e.g. in a rollback session, the game state has to be made with exact_restore, which keeps step_game from leaving any solver state behind at the end of a frame.
+# then simulating from a restored snapshot gives the same results as simulating on from when it was taken, except with HIT_DETECTION_SOLVER and more than two fighters:
+# there, two attackers hitting the same fighter on the same frame are resolved in the order the space finds the pairs, which can differ after a restore.
+
+GAME_STATE_FIELDS = ("frame", "gravity_enabled", "hit_callbacks", "friendly_hit_callbacks")
+SPACE_FIELDS = ("gravity", "damping")
+
+class Snapshot():
+	def __init__(self):
+		self.values: list = []
+		# hitbox shapes that were live when the snapshot was taken
+		self.live_hitbox_shapes: list[pymunk.Shape] = []
+		self.hits_per_attack: dict[str, int] = {}
+
+	@property
+	def frame(self) -> int:
+		return self.values[0]
+
+class Snapshotter():
+	def __init__(self, game_state: GameState):
+		"""
+			precomputes the list of objects and fields to visit, so taking a snapshot is a flat walk over attribute getters
+		"""
+		self.game_state = game_state
+		# (object, field names, getter for all of those fields at once). the game state's entry has to come first, since Snapshot.frame reads the first value
+		self.targets: list[tuple[object, tuple[str, ...], attrgetter]] = []
+		self._add_target(game_state, GAME_STATE_FIELDS)
+		self._add_target(game_state.physics_sim, SPACE_FIELDS)
+		for fighter in game_state.fighters:
+			self._add_target(fighter, Fighter.STATE_FIELDS)
+			self._add_target(fighter.body, Fighter.BODY_STATE_FIELDS)
+			self._add_target(fighter.input, Input.STATE_FIELDS)
+			for attack in fighter.attacks:
+				self._add_target(attack, Attack.STATE_FIELDS)
+		self.bodies = [fighter.body for fighter in game_state.fighters]
+		self.wall_colliders = [fighter.wall_collider for fighter in game_state.fighters]
+
+	def _add_target(self, obj: object, fields: tuple[str, ...]):
+		# attrgetter only returns a tuple when given more than one name
+		assert len(fields) > 1
+		self.targets.append((obj, fields, attrgetter(*fields)))
+
+	def live_hitbox_shapes(self) -> list[pymunk.Shape]:
+		# hitboxes only ever get added to the space for the current cast of an active attack
+		shapes = []
+		for fighter in self.game_state.fighters:
+			for attack in fighter.attacks:
+				if not attack.is_active:
+					continue
+				for shape in attack.current_hitbox_shapes():
+					if self.game_state.is_hitbox_live(shape):
+						shapes.append(shape)
+		return shapes
+
+	def take(self, snapshot: Snapshot|None = None) -> Snapshot:
+		"""
+			captures the game state. if snapshot is given, its buffers are reused instead of allocating a new snapshot
+		"""
+		if snapshot == None:
+			snapshot = Snapshot()
+		values = snapshot.values
+		values.clear()
+		for (obj, _, getter) in self.targets:
+			values.extend(getter(obj))
+		live_shapes = self.live_hitbox_shapes()
+		snapshot.live_hitbox_shapes[:] = live_shapes
+		snapshot.hits_per_attack.clear()
+		snapshot.hits_per_attack.update(self.game_state.hits_per_attack)
+		return snapshot
+
+	def restore(self, snapshot: Snapshot):
+		"""
+			writes the snapshot back into the live game state in place
+		"""
+		# has to be found before the attack values are overwritten, since the current casts are used to find them
+		live_shapes = self.live_hitbox_shapes()
+
+		# a position update over zero time throws away the bias velocity without moving the body, and re-adding the colliders drops their arbiters
+		for body in self.bodies:
+			pymunk.Body.update_position(body, 0)
+		space = self.game_state.physics_sim
+		space.remove(*self.wall_colliders)
+		space.add(*self.wall_colliders)
+
+		values = snapshot.values
+		idx = 0
+		for (obj, fields, _) in self.targets:
+			for name in fields:
+				setattr(obj, name, values[idx])
+				idx += 1
+
+		hitbox_space = self.game_state.hitbox_space
+		hitbox_space.remove(*live_shapes)
+		hitbox_space.add(*snapshot.live_hitbox_shapes)
+
+		self.game_state.hits_per_attack.clear()
+		self.game_state.hits_per_attack.update(snapshot.hits_per_attack)
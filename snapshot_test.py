@@ -0,0 +1,132 @@
+import unittest
+from snapshot import *
+import input
+from test_helpers import RandomInputs, fighter_states
+
+class TestSnapshot(unittest.TestCase):
+
+	def test_restore_is_deterministic(self):
+		for seed in range(5):
+			with self.subTest(seed=seed):
+				game_state = GameState(exact_restore=True)
+				snapshotter = Snapshotter(game_state)
+				inputs = RandomInputs(seed, len(game_state.fighters), 0.06)
+				for _ in range(300):
+					game_state.step(inputs.next_inputs())
+				frames_inputs = inputs.frames(300)
+
+				snapshot = snapshotter.take()
+				first_run = []
+				for frame_inputs in frames_inputs:
+					game_state.step(frame_inputs)
+					first_run.append(fighter_states(game_state))
+
+				# restoring rolls back over frames that went differently
+				snapshotter.restore(snapshot)
+				for _ in range(30):
+					game_state.step(inputs.next_inputs())
+				snapshotter.restore(snapshot)
+				self.assertEqual(game_state.frame, snapshot.frame)
+				second_run = []
+				for frame_inputs in frames_inputs:
+					game_state.step(frame_inputs)
+					second_run.append(fighter_states(game_state))
+
+				self.assertEqual(first_run, second_run)
+
+	def test_restore_is_repeatable(self):
+		# without exact_restore, a restore can't bring back the solver state the snapshot was taken with, but it always starts from the same one
+		game_state = GameState()
+		snapshotter = Snapshotter(game_state)
+		inputs = RandomInputs(7, len(game_state.fighters), 0.06)
+		for _ in range(300):
+			game_state.step(inputs.next_inputs())
+		frames_inputs = inputs.frames(300)
+		snapshot = snapshotter.take()
+		runs = []
+		for _ in range(2):
+			snapshotter.restore(snapshot)
+			run = []
+			for frame_inputs in frames_inputs:
+				game_state.step(frame_inputs)
+				run.append(fighter_states(game_state))
+			runs.append(run)
+		self.assertEqual(runs[0], runs[1])
+
+	def test_take_has_no_effect(self):
+		game_state = GameState()
+		plain_game_state = GameState()
+		snapshotter = Snapshotter(game_state)
+		snapshot = Snapshot()
+		inputs = RandomInputs(0, len(game_state.fighters), 0.06)
+		grounded_frames = 0
+		for _ in range(600):
+			snapshotter.take(snapshot)
+			frame_inputs = inputs.next_inputs()
+			game_state.step(frame_inputs)
+			plain_game_state.step(frame_inputs)
+			self.assertEqual(fighter_states(game_state), fighter_states(plain_game_state))
+			grounded_frames += sum(fighter.is_grounded for fighter in game_state.fighters)
+		self.assertGreater(grounded_frames, 0)
+
+	def test_restores_grounding(self):
+		game_state = GameState()
+		snapshotter = Snapshotter(game_state)
+		for _ in range(120):
+			game_state.step()
+		for fighter in game_state.fighters:
+			self.assertTrue(fighter.is_touching_ground)
+			self.assertTrue(fighter.is_grounded)
+		snapshot = snapshotter.take()
+		# jumping leaves the ground
+		jump = [False] * 8
+		jump[input.INPUT_JUMP] = True
+		for _ in range(10):
+			game_state.step([jump, jump])
+		for fighter in game_state.fighters:
+			self.assertFalse(fighter.is_touching_ground)
+		snapshotter.restore(snapshot)
+		for fighter in game_state.fighters:
+			self.assertTrue(fighter.is_touching_ground)
+		game_state.step()
+		for fighter in game_state.fighters:
+			self.assertTrue(fighter.is_grounded)
+
+	def test_restores_live_hitboxes(self):
+		game_state = GameState()
+		snapshotter = Snapshotter(game_state)
+		fighter = game_state.fighters[0]
+		neutral_light = [False] * 8
+		neutral_light[input.INPUT_LIGHT_HIT] = True
+		for _ in range(60):
+			game_state.step()
+		# unarmed neutral light has its first hitbox out after 5 startup frames
+		game_state.step([neutral_light, [False] * 8])
+		while len(snapshotter.live_hitbox_shapes()) == 0:
+			game_state.step()
+		snapshot = snapshotter.take()
+		live_shapes = snapshotter.live_hitbox_shapes()
+		while fighter.attacks[2].is_active:
+			game_state.step()
+
+		self.assertEqual(snapshotter.live_hitbox_shapes(), [])
+		for shape in live_shapes:
+			self.assertIsNone(shape.space)
+
+		snapshotter.restore(snapshot)
+		self.assertEqual(snapshotter.live_hitbox_shapes(), live_shapes)
+		for shape in live_shapes:
+			self.assertIs(shape.space, game_state.physics_sim)
+
+	def test_take_reuses_snapshot(self):
+		game_state = GameState()
+		snapshotter = Snapshotter(game_state)
+		snapshot = snapshotter.take()
+		values = snapshot.values
+		game_state.step()
+		self.assertIs(snapshotter.take(snapshot), snapshot)
+		self.assertIs(snapshot.values, values)
+		self.assertEqual(snapshot.frame, 1)
+
+if __name__ == '__main__':
+	unittest.main()
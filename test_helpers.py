@@ -0,0 +1,46 @@
+import random
+from game import GameState
+import input
+
+# shared by the tests that play random matches and compare what the fighters end up doing
+
+class RandomInputs():
+	def __init__(self, seed: int, fighter_count: int, toggle_chance: float = 0.05):
+		"""
+			held inputs of every fighter, each flipped with a chance of toggle_chance every frame. seeded, so every test run sees the same match
+		"""
+		self.rng = random.Random(seed)
+		self.toggle_chance = toggle_chance
+		self.held = [[False] * input.INPUT_COUNT for _ in range(fighter_count)]
+
+	def next_inputs(self) -> list[list[bool]]:
+		"""
+			### Returns:
+				the inputs of every fighter for the next frame, as copies that later frames don't change
+		"""
+		for fighter_input in self.held:
+			for i in range(len(fighter_input)):
+				if self.rng.random() < self.toggle_chance:
+					fighter_input[i] = not fighter_input[i]
+		return [list(fighter_input) for fighter_input in self.held]
+
+	def frames(self, frame_count: int) -> list[list[list[bool]]]:
+		return [self.next_inputs() for _ in range(frame_count)]
+
+def play_random_match(game_state: GameState, seed: int, frame_count: int, toggle_chance: float = 0.05, on_frame=None):
+	inputs = RandomInputs(seed, len(game_state.fighters), toggle_chance)
+	for _ in range(frame_count):
+		game_state.step(inputs.next_inputs())
+		if on_frame != None:
+			on_frame()
+
+def fighter_states(game_state: GameState) -> list:
+	"""
+		what every fighter is doing, for comparing two runs of the same match
+	"""
+	return [
+		(tuple(fighter.body.position), tuple(fighter.body.velocity), fighter.dmg_points, fighter.recover_timer, fighter.is_hit, fighter.side_facing,
+			fighter.is_dodging, fighter.dodge_timer, fighter.dodge_cooldown_timer, fighter.is_grounded, fighter.is_touching_ground, fighter.midair_jumps_left,
+			[(attack.is_active, attack.power_idx, attack.cast_idx, attack.cast_frame) for attack in fighter.attacks])
+		for fighter in game_state.fighters
+	]
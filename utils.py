@@ -5,21 +5,21 @@ def create_pymunk_box(body: pymunk.Body, min: tuple[float,float], max: tuple[flo
 
 
 def add_capsule_shape(body: pymunk.Body, offset: tuple[float,float], dims: tuple[float,float]) -> list[pymunk.Shape] :
+	"""
+		a capsule is a single shape: a circle when both dimensions are the same, otherwise a segment along the long dimension, rounded by half of the short one.
+		one shape per capsule means a single collision pair, and a single arbiter, per capsule that overlaps something.
+		returned as a list so callers can treat every capsule as a group of shapes.
+	"""
 	if dims[0] == dims[1]:
 		return [pymunk.Circle(body, 0.5*dims[0], offset)]
 	if dims[0] > dims[1]:
-		stretch_length = dims[0] - dims[1]
-		c1 = pymunk.Circle(body, dims[1]*0.5, offset=(offset[0] - stretch_length*0.5, offset[1]))
-		c2 = pymunk.Circle(body, dims[1]*0.5, offset=(offset[0] + stretch_length*0.5, offset[1]))
-		box = create_pymunk_box(body, 
-			(offset[0] - stretch_length*0.5, offset[1] - dims[1]*0.5), 
-			(offset[0] + stretch_length*0.5, offset[1] + dims[1]*0.5))
-		return [c1,c2,box]
+		half_stretch = (dims[0] - dims[1]) * 0.5
+		a = (offset[0] - half_stretch, offset[1])
+		b = (offset[0] + half_stretch, offset[1])
+		radius = dims[1]*0.5
 	else:
-		stretch_length = dims[1] - dims[0]
-		c1 = pymunk.Circle(body, dims[0]*0.5, offset=(offset[0], offset[1] - stretch_length*0.5))
-		c2 = pymunk.Circle(body, dims[0]*0.5, offset=(offset[0], offset[1] + stretch_length*0.5))
-		box = create_pymunk_box(body, 
-			(offset[0] - dims[0]*0.5, offset[1] - stretch_length*0.5), 
-			(offset[0] + dims[0]*0.5, offset[1] + stretch_length*0.5))
-		return [c1, c2, box]
\ No newline at end of file
+		half_stretch = (dims[1] - dims[0]) * 0.5
+		a = (offset[0], offset[1] - half_stretch)
+		b = (offset[0], offset[1] + half_stretch)
+		radius = dims[0]*0.5
+	return [pymunk.Segment(body, a, b, radius)]